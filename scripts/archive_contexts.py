@@ -0,0 +1,70 @@
+"""
+Archive Contexts Script - 既存のコンテキストログを圧縮アーカイブへ移行するスクリプト
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# srcをPythonパスに追加
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from utils.context_archive import ContextArchive
+from utils.file_utils import list_context_files, ARCHIVE_DIRNAME
+
+
+def parse_arguments():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="Migrate context_*.json(l) files into the compressed archive")
+    parser.add_argument("--log-directory", type=str, default=os.environ.get("LOG_DIRECTORY", "logs"))
+    parser.add_argument("--archive-directory", type=str, help="Archive location (default: <log-directory>/archive)")
+    parser.add_argument("--keep", type=int, default=0, help="Keep the newest N files uncompressed")
+    parser.add_argument("--delete", action="store_true", help="Delete original files after archiving")
+    parser.add_argument("--verify", action="store_true", help="Read back every archived session")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """コンテキストファイルをアーカイブへ移行する"""
+    args = parse_arguments()
+    archive_directory = args.archive_directory or os.path.join(args.log_directory, ARCHIVE_DIRNAME)
+    archive = ContextArchive(archive_directory)
+
+    context_files = list_context_files(args.log_directory)[args.keep:]
+    print(f"Archiving {len(context_files)} files from {args.log_directory} into {archive_directory}")
+
+    archived = 0
+    for filename in context_files:
+        filepath = os.path.join(args.log_directory, filename)
+        try:
+            if not archive.contains(filename):
+                archive.archive_file(filename, args.log_directory)
+                archived += 1
+            if args.delete:
+                os.remove(filepath)
+        except (OSError, ValueError) as e:
+            print(f"Failed to archive {filename}: {e}")
+
+    if args.verify:
+        start = time.perf_counter()
+        for name in archive.list_sessions():
+            archive.get_session(name)
+        elapsed = time.perf_counter() - start
+        count = len(archive.list_sessions())
+        if count:
+            print(f"Verified {count} sessions ({elapsed / count * 1000:.2f} ms per session)")
+
+    stats = archive.get_stats()
+    print(f"Archived {archived} new sessions")
+    print(
+        f"Archive: {stats['sessions']} sessions in {stats['segments']} segments, "
+        f"{stats['raw_bytes']:,} -> {stats['stored_bytes']:,} bytes "
+        f"(ratio {stats['compression_ratio']:.1f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
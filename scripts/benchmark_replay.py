@@ -0,0 +1,83 @@
+"""
+Replay Benchmark Script - 記録済みフィクスチャを使ったオフラインのセッションベンチマーク
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import statistics
+import time
+from dotenv import load_dotenv
+
+# プロジェクトルートとsrcをPythonパスに追加
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import Settings
+from core.session_manager import SessionManager
+from utils.logging import setup_logging
+from utils.unicode_utils import ensure_utf8_encoding
+
+
+def parse_arguments():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="Run sessions offline against a recorded model fixture")
+    parser.add_argument("--task", type=str, required=True, help="Task used when the fixture was recorded")
+    parser.add_argument("--fixture", type=str, help="Path to the model fixture (default: MODEL_FIXTURE_PATH)")
+    parser.add_argument("--runs", type=int, default=3, help="Number of sessions to run")
+    parser.add_argument("--latency-scale", type=float, help="Multiplier for recorded latencies (0 disables)")
+    parser.add_argument("--fixed-latency", type=float, help="Fixed latency per call in seconds")
+    return parser.parse_args()
+
+
+async def run_benchmark(args) -> int:
+    """再生モードでセッションを繰り返し実行し、所要時間を表示する"""
+    os.environ["MODEL_CLIENT_MODE"] = "replay"
+    settings = Settings.from_env()
+    if args.fixture:
+        settings.model_fixture_path = args.fixture
+    if args.latency_scale is not None:
+        settings.replay_latency_scale = args.latency_scale
+    if args.fixed_latency is not None:
+        settings.replay_fixed_latency = args.fixed_latency
+    # ベンチマークでは外部サービスに接続しない
+    settings.cosmosdb_enabled = False
+    settings.validate()
+
+    setup_logging(log_directory=settings.log_directory, log_level="WARNING")
+
+    durations = []
+    for run in range(args.runs):
+        # 再生クライアントは記録を消費するため、実行ごとに作り直す
+        session_manager = SessionManager(settings)
+        session_manager.console_output = False
+
+        start = time.perf_counter()
+        await session_manager.run_session(args.task)
+        elapsed = time.perf_counter() - start
+        durations.append(elapsed)
+
+        stats = session_manager.get_session_stats()
+        replay_stats = stats.get("process_client_stats", {})
+        misses = sum(client.get("key_misses", 0) for client in replay_stats.values())
+        print(f"Run {run + 1}: {elapsed:.3f}s, {stats['total_messages']} messages, {misses} key misses")
+
+    print(
+        f"Runs: {len(durations)}, mean {statistics.mean(durations):.3f}s, "
+        f"min {min(durations):.3f}s, max {max(durations):.3f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    ensure_utf8_encoding()
+    load_dotenv(override=True)
+
+    try:
+        exit_code = asyncio.run(run_benchmark(parse_arguments()))
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        print("\nBenchmark interrupted")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+"""
+Startup Benchmark Script - エントリポイントの起動時間（インポート時間）の計測と回帰チェック
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+# プロジェクトルートとsrcをPythonパスに追加
+project_root = os.path.join(os.path.dirname(__file__), '..')
+src_directory = os.path.join(project_root, 'src')
+sys.path.insert(0, project_root)
+sys.path.insert(0, src_directory)
+
+from utils.lazy_imports import profile_imports, format_import_profile
+
+
+# シナリオ名と、新しいプロセスで実行するコード（src をカレントディレクトリとして実行）
+SCENARIOS = {
+    # CLIのモジュール読み込み（--health-check・--enqueue が処理を始めるまで）
+    "cli": "import main",
+    # Streamlitの履歴ビューアーが画面を表示するまで
+    "history_viewer": "import sys; sys.path.insert(0, 'web'); import cosmosdb_reader",
+    # Streamlitのライブページがランナーを取得するまで
+    "live_runner": "import sys; sys.path.insert(0, 'web'); import autogen_runner",
+    # セッションを実行するためのAutoGenスタック全体
+    "session": "import core.session_manager",
+}
+
+SCENARIO_MODULES = {
+    "cli": ["main"],
+    "history_viewer": ["web.cosmosdb_reader"],
+    "live_runner": ["web.autogen_runner"],
+    "session": ["core.session_manager"],
+}
+
+
+def parse_arguments():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="Measure entry point startup time and guard against regressions")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters per scenario")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--baseline", type=str, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", type=str, help="Write the measured medians to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--profile", action="store_true", help="Also print the slowest imports of each scenario")
+    return parser.parse_args()
+
+
+def measure(code: str, runs: int) -> list:
+    """新しいインタプリタでコードを実行し、プロセス全体の所要時間（ミリ秒）を runs 回計測する"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=src_directory, check=True, capture_output=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def run_benchmark(args) -> int:
+    """各シナリオの起動時間を計測し、ベースラインより遅くなったシナリオがあれば1を返す"""
+    scenarios = args.scenario or list(SCENARIOS)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    medians = {}
+    regressions = []
+    for name in scenarios:
+        durations = measure(SCENARIOS[name], args.runs)
+        medians[name] = statistics.median(durations)
+
+        line = f"{name:<16} median {medians[name]:8.1f} ms  (min {min(durations):.1f} / max {max(durations):.1f})"
+        if name in baseline:
+            limit = baseline[name] * (1 + args.tolerance)
+            line += f"  baseline {baseline[name]:.1f} ms"
+            if medians[name] > limit:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+        if args.profile:
+            print(format_import_profile(profile_imports(SCENARIO_MODULES[name], cwd=src_directory), top=10))
+            print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(medians, f, indent=2)
+        print(f"Baseline saved to: {args.save_baseline}")
+
+    if regressions:
+        print(f"Startup regressions (>{args.tolerance:.0%} slower than baseline): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(run_benchmark(parse_arguments()))
+    except KeyboardInterrupt:
+        sys.exit(1)
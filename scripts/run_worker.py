@@ -0,0 +1,85 @@
+"""
+Worker Run Script - ジョブキューのワーカーデーモン起動スクリプト
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import signal
+from dotenv import load_dotenv
+
+# プロジェクトルートとsrcをPythonパスに追加
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from config.settings import Settings
+from core.client_pool import close_client_pool
+from core.job_queue import JobQueue
+from core.job_worker import JobWorker
+from utils.logging import setup_logging
+from utils.unicode_utils import ensure_utf8_encoding
+
+
+def parse_arguments():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="AI Brainstorming job worker")
+    parser.add_argument("--concurrency", type=int, help="Number of concurrent sessions")
+    parser.add_argument("--queue", type=str, help="Path to the SQLite job queue file")
+    parser.add_argument("--worker-id", type=str, help="Worker identifier (default: hostname-pid)")
+    parser.add_argument("--drain", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--status", action="store_true", help="Print queue statistics and exit")
+    return parser.parse_args()
+
+
+async def run_worker(args) -> int:
+    """ワーカーを実行する"""
+    settings = Settings.from_env()
+    if args.queue:
+        settings.job_queue_path = args.queue
+    settings.validate()
+
+    setup_logging(log_directory=settings.log_directory, log_level=settings.log_level)
+
+    queue = JobQueue(settings.job_queue_path)
+    if args.status:
+        for status, count in queue.get_stats().items():
+            print(f"{status}: {count}")
+        return 0
+
+    worker = JobWorker(
+        settings,
+        queue=queue,
+        concurrency=args.concurrency,
+        worker_id=args.worker_id
+    )
+
+    # SIGINT/SIGTERMで新規取得を止め、実行中のジョブを完了させてから終了する
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windowsではadd_signal_handlerが使えない
+            pass
+
+    print(f"Worker {worker.worker_id} polling {settings.job_queue_path} (concurrency={worker.concurrency})")
+    try:
+        processed = await worker.run(drain=args.drain)
+    finally:
+        await close_client_pool()
+    print(f"Worker finished: {processed} jobs processed")
+    return 0
+
+
+if __name__ == "__main__":
+    ensure_utf8_encoding()
+    load_dotenv(override=True)
+
+    try:
+        exit_code = asyncio.run(run_worker(parse_arguments()))
+        sys.exit(exit_code)
+    except KeyboardInterrupt:
+        print("\nWorker interrupted")
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+Train Speaker Selector Script - 過去のセッションの発言順からローカルセレクターを学習するスクリプト
+"""
+
+import sys
+import os
+import argparse
+
+# srcをPythonパスに追加
+project_root = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from core.speaker_selector import LocalSpeakerSelector
+from web.cosmosdb_reader import CosmosDBReader
+
+AGENT_NAMES = [
+    "creative_planner", "market_analyst", "technical_validator",
+    "business_evaluator", "user_advocate", "reflection_agent"
+]
+
+
+def parse_arguments():
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="Train the local speaker selector from past CosmosDB sessions")
+    parser.add_argument("--limit", type=int, default=200, help="Number of recent sessions to read")
+    parser.add_argument("--output", type=str,
+                        default=os.environ.get("LOCAL_SELECTOR_MODEL_PATH", "data/speaker_model.json"))
+    parser.add_argument("--completed-only", action="store_true", help="Use completed sessions only")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """CosmosDBのセッションから発言者の遷移を学習して保存する"""
+    args = parse_arguments()
+    reader = CosmosDBReader()
+    if not reader.is_available():
+        print("CosmosDB is not available. Set COSMOSDB_ENABLED, COSMOSDB_ENDPOINT and COSMOSDB_KEY.")
+        return 1
+
+    sessions = reader.get_sessions(limit=args.limit)
+    if args.completed_only:
+        sessions = [session for session in sessions if session['status'] == 'completed']
+
+    sequences = []
+    for session in sessions:
+        messages = reader.get_session_messages(session['session_id'])
+        sequences.append([message['source'] for message in messages])
+
+    selector = LocalSpeakerSelector(AGENT_NAMES)
+    trained = selector.train(sequences)
+    selector.save(args.output)
+
+    transitions = sum(sum(row.values()) for row in selector.transitions.values())
+    print(f"Trained on {trained} sessions ({transitions} transitions), saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,8 @@ Base Agent - 全エージェントの基底クラス
 
 from abc import ABC, abstractmethod
 from autogen_agentchat.agents import AssistantAgent
-from typing import Dict, Any
+from autogen_core.model_context import ChatCompletionContext
+from typing import Dict, Any, Optional
 
 
 class BaseAgent(ABC):
@@ -13,6 +14,8 @@ class BaseAgent(ABC):
     def __init__(self, model_client):
         self.model_client = model_client
         self._agent = None
+        self._agent_stream = False
+        self._agent_context: Optional[ChatCompletionContext] = None
     
     @property
     @abstractmethod
@@ -32,15 +35,41 @@ class BaseAgent(ABC):
         """システムメッセージを返す"""
         pass
     
-    def create_agent(self) -> AssistantAgent:
-        """AutoGenのAssistantAgentを作成する"""
-        if self._agent is None:
+    def create_agent(
+        self,
+        model_client_stream: bool = False,
+        model_context: Optional[ChatCompletionContext] = None
+    ) -> AssistantAgent:
+        """AutoGenのAssistantAgentを作成する
+
+        model_client_stream=True の場合、生成中のトークンを
+        ModelClientStreamingChunkEvent として逐次出力する。
+        model_context を省略すると全履歴をモデルに送る。
+        前回と同じ引数（同一の model_context）なら作成済みのエージェントを返し、
+        異なる場合は指定された引数でエージェントを作り直す。
+        """
+        if (
+            self._agent is None
+            or self._agent_stream != model_client_stream
+            or self._agent_context is not model_context
+        ):
             self._agent = AssistantAgent(
                 self.agent_name,
                 description=self.description,
                 model_client=self.model_client,
-                system_message=self.system_message
+                system_message=self.system_message,
+                model_client_stream=model_client_stream,
+                model_context=model_context
             )
+            self._agent_stream = model_client_stream
+            self._agent_context = model_context
+        return self._agent
+    
+    @property
+    def agent(self) -> AssistantAgent:
+        """作成済みのAssistantAgentを返す（未作成なら既定の引数で作成する）"""
+        if self._agent is None:
+            return self.create_agent()
         return self._agent
     
     def get_common_guidelines(self) -> str:
@@ -25,7 +25,27 @@ class Settings:
     # 会話設定
     max_messages: int = 100
     reflection_agent_max_count: int = 3
+    session_token_budget: int = 0  # エージェントの応答の累計トークン数の上限（0で無効）
+    session_deadline_seconds: float = 0.0  # セッションの制限時間（秒、0で無効）
+    convergence_enabled: bool = False  # 似た発言が続いて議論が収束したら終了する
+    convergence_novelty_threshold: float = 0.2
+    convergence_window: int = 6
+    convergence_patience: int = 3
     allow_repeated_speaker: bool = False
+    stream_tokens: bool = False  # エージェントの応答をトークン単位で逐次表示する
+    team_mode: str = "selector"  # selector: 1人ずつ選択 / parallel: 専門家がラウンドごとに並列に発言
+    
+    # エージェントのモデルコンテキスト設定（直近K件＋古い発言の要約、0で全履歴を送る）
+    agent_context_window: int = 0
+    agent_context_summary_chars: int = 1500
+    agent_context_window_overrides: str = ""  # "agent_name=K,..." 形式でエージェントごとに上書き
+    local_selector_enabled: bool = False  # ルールで決められる場合はLLMを呼ばずに次の発言者を選ぶ
+    local_selector_min_confidence: float = 0.2
+    local_selector_model_path: str = "data/speaker_model.json"
+    speculation_enabled: bool = False  # セレクターの判定と並行して候補エージェントの応答を先行生成する
+    speculation_top_k: int = 2
+    speculation_max_wasted_tokens: int = 20000  # 選ばれなかった先行生成に使ってよいトークン数（セッションごと）
+    selector_history_turns: int = 0  # スピーカー選択に送る直近の発言数（古い発言は立場のダイジェストに要約、0で全履歴）
     
     # ログ設定
     log_directory: str = "logs"
@@ -38,37 +58,173 @@ class Settings:
     cosmosdb_database_name: str = "ai_brainstorming"
     cosmosdb_container_name: str = "chat_sessions"
     
+    # 応答キャッシュ設定
+    response_cache_enabled: bool = False
+    response_cache_path: str = "data/response_cache.db"
+    response_cache_max_mb: int = 512
+    
+    # チェックポイント設定（0で無効）
+    checkpoint_interval: int = 0
+    checkpoint_to_cosmosdb: bool = False
+    
+    # ジョブキュー設定
+    job_queue_path: str = "data/job_queue.db"
+    job_lease_seconds: int = 60
+    job_max_attempts: int = 3
+    worker_concurrency: int = 2
+    
+    # モデルクライアントのモード（live / record / replay）
+    model_client_mode: str = "live"
+    model_fixture_path: str = "data/model_fixture.jsonl"
+    replay_latency_scale: float = 1.0
+    replay_fixed_latency: float = -1.0  # 0以上なら記録値の代わりに固定の待ち時間を使う
+    
+    # レート制限設定（デプロイメントのクォータ、0で無効）
+    rate_limit_rpm: int = 0
+    rate_limit_tpm: int = 0
+    rate_limit_state_directory: str = ""  # 指定するとファイルロックでプロセス間でも共有する
+    
+    # モデル呼び出しの耐障害性設定
+    resilient_client_enabled: bool = True
+    model_call_timeout: float = 120.0  # 0で無効
+    model_max_retries: int = 3
+    model_retry_backoff: float = 1.0
+    model_retry_backoff_max: float = 30.0
+    circuit_breaker_threshold: int = 5  # 0で無効
+    circuit_breaker_reset_seconds: float = 30.0
+    
+    # チームプール設定（構築済みのチームをリセットして再利用、待機させる最大数）
+    team_pool_size: int = 4
+    
+    # フック配信設定（購読者ごとのキューの長さ、満杯時の方針 drop / block / coalesce、遅れとみなす配信遅延秒数）
+    hook_queue_size: int = 1000
+    hook_backpressure: str = "block"
+    hook_lag_seconds: float = 1.0
+    
+    # ヘルスチェック設定（準備完了確認の結果のキャッシュ秒数、各チェックの期限秒数）
+    health_cache_ttl: float = 30.0
+    health_check_timeout: float = 5.0
+    
+    # HTTP接続プール設定（プロセス内の全セッションでクライアントと接続を共有）
+    http_pool_enabled: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    
     @classmethod
     def from_env(cls) -> 'Settings':
         """環境変数から設定を読み込む"""
+        model_client_mode = os.environ.get("MODEL_CLIENT_MODE", "live").lower()
+        
+        def azure_env(name: str) -> str:
+            # 再生モードではAzureへ接続しないため未設定を許容する
+            if model_client_mode == "replay":
+                return os.environ.get(name, "")
+            return os.environ[name]
+        
         return cls(
-            azure_deployment_chat=os.environ["AOAI_DEPLOYMENT_CHAT"],
-            azure_deployment_reasoning=os.environ["AOAI_DEPLOYMENT_REASONING"],
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            azure_api_key=os.environ["AZURE_OPENAI_API_KEY"],
+            azure_deployment_chat=azure_env("AOAI_DEPLOYMENT_CHAT"),
+            azure_deployment_reasoning=azure_env("AOAI_DEPLOYMENT_REASONING"),
+            azure_endpoint=azure_env("AZURE_OPENAI_ENDPOINT"),
+            azure_api_key=azure_env("AZURE_OPENAI_API_KEY"),
             azure_api_version=os.environ.get("AZURE_API_VERSION", "2025-04-01-preview"),
             max_tokens_chat=int(os.environ.get("MAX_TOKENS_CHAT", "500")),
             max_tokens_reasoning=int(os.environ.get("MAX_TOKENS_REASONING", "2000")),
             max_messages=int(os.environ.get("MAX_MESSAGES", "100")),
             reflection_agent_max_count=int(os.environ.get("REFLECTION_AGENT_MAX_COUNT", "3")),
+            session_token_budget=int(os.environ.get("SESSION_TOKEN_BUDGET", "0")),
+            session_deadline_seconds=float(os.environ.get("SESSION_DEADLINE_SECONDS", "0")),
+            convergence_enabled=os.environ.get("CONVERGENCE_ENABLED", "false").lower() == "true",
+            convergence_novelty_threshold=float(os.environ.get("CONVERGENCE_NOVELTY_THRESHOLD", "0.2")),
+            convergence_window=int(os.environ.get("CONVERGENCE_WINDOW", "6")),
+            convergence_patience=int(os.environ.get("CONVERGENCE_PATIENCE", "3")),
             allow_repeated_speaker=os.environ.get("ALLOW_REPEATED_SPEAKER", "false").lower() == "true",
+            stream_tokens=os.environ.get("STREAM_TOKENS", "false").lower() == "true",
+            team_mode=os.environ.get("TEAM_MODE", "selector").lower(),
+            agent_context_window=int(os.environ.get("AGENT_CONTEXT_WINDOW", "0")),
+            agent_context_summary_chars=int(os.environ.get("AGENT_CONTEXT_SUMMARY_CHARS", "1500")),
+            agent_context_window_overrides=os.environ.get("AGENT_CONTEXT_WINDOW_OVERRIDES", ""),
+            local_selector_enabled=os.environ.get("LOCAL_SELECTOR_ENABLED", "false").lower() == "true",
+            local_selector_min_confidence=float(os.environ.get("LOCAL_SELECTOR_MIN_CONFIDENCE", "0.2")),
+            local_selector_model_path=os.environ.get("LOCAL_SELECTOR_MODEL_PATH", "data/speaker_model.json"),
+            speculation_enabled=os.environ.get("SPECULATION_ENABLED", "false").lower() == "true",
+            speculation_top_k=int(os.environ.get("SPECULATION_TOP_K", "2")),
+            speculation_max_wasted_tokens=int(os.environ.get("SPECULATION_MAX_WASTED_TOKENS", "20000")),
+            selector_history_turns=int(os.environ.get("SELECTOR_HISTORY_TURNS", "0")),
             log_directory=os.environ.get("LOG_DIRECTORY", "logs"),
             log_level=os.environ.get("LOG_LEVEL", "INFO"),
             cosmosdb_enabled=os.environ.get("COSMOSDB_ENABLED", "false").lower() == "true",
             cosmosdb_endpoint=os.environ.get("COSMOSDB_ENDPOINT", ""),
             cosmosdb_key=os.environ.get("COSMOSDB_KEY", ""),
             cosmosdb_database_name=os.environ.get("COSMOSDB_DATABASE_NAME", "ai_brainstorming"),
-            cosmosdb_container_name=os.environ.get("COSMOSDB_CONTAINER_NAME", "chat_sessions")
+            cosmosdb_container_name=os.environ.get("COSMOSDB_CONTAINER_NAME", "chat_sessions"),
+            response_cache_enabled=os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() == "true",
+            response_cache_path=os.environ.get("RESPONSE_CACHE_PATH", "data/response_cache.db"),
+            response_cache_max_mb=int(os.environ.get("RESPONSE_CACHE_MAX_MB", "512")),
+            checkpoint_interval=int(os.environ.get("CHECKPOINT_INTERVAL", "0")),
+            checkpoint_to_cosmosdb=os.environ.get("CHECKPOINT_TO_COSMOSDB", "false").lower() == "true",
+            job_queue_path=os.environ.get("JOB_QUEUE_PATH", "data/job_queue.db"),
+            job_lease_seconds=int(os.environ.get("JOB_LEASE_SECONDS", "60")),
+            job_max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", "3")),
+            worker_concurrency=int(os.environ.get("WORKER_CONCURRENCY", "2")),
+            model_client_mode=model_client_mode,
+            model_fixture_path=os.environ.get("MODEL_FIXTURE_PATH", "data/model_fixture.jsonl"),
+            replay_latency_scale=float(os.environ.get("REPLAY_LATENCY_SCALE", "1.0")),
+            replay_fixed_latency=float(os.environ.get("REPLAY_FIXED_LATENCY", "-1")),
+            rate_limit_rpm=int(os.environ.get("RATE_LIMIT_RPM", "0")),
+            rate_limit_tpm=int(os.environ.get("RATE_LIMIT_TPM", "0")),
+            rate_limit_state_directory=os.environ.get("RATE_LIMIT_STATE_DIRECTORY", ""),
+            resilient_client_enabled=os.environ.get("RESILIENT_CLIENT_ENABLED", "true").lower() == "true",
+            model_call_timeout=float(os.environ.get("MODEL_CALL_TIMEOUT", "120")),
+            model_max_retries=int(os.environ.get("MODEL_MAX_RETRIES", "3")),
+            model_retry_backoff=float(os.environ.get("MODEL_RETRY_BACKOFF", "1.0")),
+            model_retry_backoff_max=float(os.environ.get("MODEL_RETRY_BACKOFF_MAX", "30")),
+            circuit_breaker_threshold=int(os.environ.get("CIRCUIT_BREAKER_THRESHOLD", "5")),
+            circuit_breaker_reset_seconds=float(os.environ.get("CIRCUIT_BREAKER_RESET_SECONDS", "30")),
+            team_pool_size=int(os.environ.get("TEAM_POOL_SIZE", "4")),
+            hook_queue_size=int(os.environ.get("HOOK_QUEUE_SIZE", "1000")),
+            hook_backpressure=os.environ.get("HOOK_BACKPRESSURE", "block"),
+            hook_lag_seconds=float(os.environ.get("HOOK_LAG_SECONDS", "1.0")),
+            health_cache_ttl=float(os.environ.get("HEALTH_CACHE_TTL", "30")),
+            health_check_timeout=float(os.environ.get("HEALTH_CHECK_TIMEOUT", "5")),
+            http_pool_enabled=os.environ.get("HTTP_POOL_ENABLED", "true").lower() == "true",
+            http_max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "100")),
+            http_max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            http_keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
         )
     
+    def get_agent_context_window(self, agent_name: str) -> int:
+        """エージェントのコンテキストウィンドウ（0で無制限）を取得する"""
+        for item in self.agent_context_window_overrides.split(","):
+            name, _, value = item.partition("=")
+            if name.strip() == agent_name and value.strip():
+                return int(value)
+        return self.agent_context_window
+    
+    def get_cosmosdb_settings(self) -> Dict[str, Any]:
+        """CosmosDBManager用の設定辞書を取得する"""
+        return {
+            'enabled': self.cosmosdb_enabled,
+            'endpoint': self.cosmosdb_endpoint,
+            'key': self.cosmosdb_key,
+            'database_name': self.cosmosdb_database_name,
+            'container_name': self.cosmosdb_container_name
+        }
+    
     def validate(self) -> None:
         """設定の妥当性をチェック"""
+        if self.model_client_mode not in ("live", "record", "replay"):
+            raise ValueError("model_client_mode must be one of: live, record, replay")
+        
         required_fields = [
             "azure_deployment_chat",
             "azure_deployment_reasoning", 
             "azure_endpoint",
             "azure_api_key"
         ]
+        if self.model_client_mode == "replay":
+            # 再生モードではAzureへの接続情報は不要
+            required_fields = []
         
         for field in required_fields:
             if not getattr(self, field):
@@ -86,6 +242,104 @@ class Settings:
         if self.reflection_agent_max_count <= 0:
             raise ValueError("reflection_agent_max_count must be greater than 0")
         
+        if self.session_token_budget < 0:
+            raise ValueError("session_token_budget must be 0 or greater")
+        
+        if self.session_deadline_seconds < 0:
+            raise ValueError("session_deadline_seconds must be 0 or greater")
+        
+        if not 0 <= self.convergence_novelty_threshold <= 1:
+            raise ValueError("convergence_novelty_threshold must be between 0 and 1")
+        
+        if self.convergence_window <= 0 or self.convergence_patience <= 0:
+            raise ValueError("convergence_window and convergence_patience must be greater than 0")
+        
+        if self.team_mode not in ("selector", "parallel"):
+            raise ValueError("team_mode must be one of: selector, parallel")
+        
+        if self.agent_context_window < 0:
+            raise ValueError("agent_context_window must be 0 or greater")
+        
+        if self.agent_context_summary_chars <= 0:
+            raise ValueError("agent_context_summary_chars must be greater than 0")
+        
+        for item in filter(None, (item.strip() for item in self.agent_context_window_overrides.split(","))):
+            name, separator, value = item.partition("=")
+            if not separator or not name.strip() or not value.strip().isdigit():
+                raise ValueError("agent_context_window_overrides must be in the form 'agent_name=K,...'")
+        
+        if not 0 <= self.local_selector_min_confidence <= 1:
+            raise ValueError("local_selector_min_confidence must be between 0 and 1")
+        
+        if self.speculation_top_k <= 0:
+            raise ValueError("speculation_top_k must be greater than 0")
+        
+        if self.speculation_max_wasted_tokens < 0:
+            raise ValueError("speculation_max_wasted_tokens must be 0 or greater")
+        
+        if self.selector_history_turns < 0:
+            raise ValueError("selector_history_turns must be 0 or greater")
+        
+        if self.response_cache_max_mb <= 0:
+            raise ValueError("response_cache_max_mb must be greater than 0")
+        
+        if self.checkpoint_interval < 0:
+            raise ValueError("checkpoint_interval must be 0 or greater")
+        
+        if self.job_lease_seconds <= 0:
+            raise ValueError("job_lease_seconds must be greater than 0")
+        
+        if self.job_max_attempts <= 0:
+            raise ValueError("job_max_attempts must be greater than 0")
+        
+        if self.worker_concurrency <= 0:
+            raise ValueError("worker_concurrency must be greater than 0")
+        
+        if self.replay_latency_scale < 0:
+            raise ValueError("replay_latency_scale must be 0 or greater")
+        
+        if self.rate_limit_rpm < 0 or self.rate_limit_tpm < 0:
+            raise ValueError("rate_limit_rpm and rate_limit_tpm must be 0 or greater")
+        
+        if bool(self.rate_limit_rpm) != bool(self.rate_limit_tpm):
+            raise ValueError("rate_limit_rpm and rate_limit_tpm must be set together")
+        
+        if self.model_call_timeout < 0:
+            raise ValueError("model_call_timeout must be 0 or greater")
+        
+        if self.model_max_retries < 0:
+            raise ValueError("model_max_retries must be 0 or greater")
+        
+        if self.model_retry_backoff < 0 or self.model_retry_backoff_max < 0:
+            raise ValueError("model_retry_backoff and model_retry_backoff_max must be 0 or greater")
+        
+        if self.circuit_breaker_threshold < 0:
+            raise ValueError("circuit_breaker_threshold must be 0 or greater")
+        
+        if self.team_pool_size < 0:
+            raise ValueError("team_pool_size must be 0 or greater")
+        
+        if self.hook_queue_size <= 0:
+            raise ValueError("hook_queue_size must be greater than 0")
+        
+        if self.hook_backpressure not in ("drop", "block", "coalesce"):
+            raise ValueError("hook_backpressure must be 'drop', 'block' or 'coalesce'")
+        
+        if self.hook_lag_seconds <= 0:
+            raise ValueError("hook_lag_seconds must be greater than 0")
+        
+        if self.health_cache_ttl < 0:
+            raise ValueError("health_cache_ttl must be 0 or greater")
+        
+        if self.health_check_timeout <= 0:
+            raise ValueError("health_check_timeout must be greater than 0")
+        
+        if self.http_max_connections <= 0:
+            raise ValueError("http_max_connections must be greater than 0")
+        
+        if self.http_max_keepalive_connections < 0:
+            raise ValueError("http_max_keepalive_connections must be 0 or greater")
+        
         # CosmosDB設定の検証
         if self.cosmosdb_enabled:
             if not self.cosmosdb_endpoint:
@@ -2,14 +2,38 @@
 Core module - 核となるビジネスロジック
 """
 
-from .client_manager import ClientManager
-from .team_manager import TeamManager
-from .session_manager import SessionManager
-from .cosmosdb_manager import CosmosDBManager
+from typing import TYPE_CHECKING
+
+from utils.lazy_imports import lazy_getattr
+
+# SDKの読み込みを初回利用時まで遅らせるため、各クラスは属性にアクセスした時点でインポートする
+_EXPORTS = {
+    "ClientManager": ".client_manager",
+    "TeamManager": ".team_manager",
+    "SessionManager": ".session_manager",
+    "CosmosDBManager": ".cosmosdb_manager",
+    "BatchRunner": ".batch_runner",
+    "JobQueue": ".job_queue",
+    "JobWorker": ".job_worker"
+}
+
+if TYPE_CHECKING:
+    from .client_manager import ClientManager
+    from .team_manager import TeamManager
+    from .session_manager import SessionManager
+    from .cosmosdb_manager import CosmosDBManager
+    from .batch_runner import BatchRunner
+    from .job_queue import JobQueue
+    from .job_worker import JobWorker
+
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
 
 __all__ = [
     "ClientManager",
     "TeamManager",
     "SessionManager",
-    "CosmosDBManager"
+    "CosmosDBManager",
+    "BatchRunner",
+    "JobQueue",
+    "JobWorker"
 ]
\ No newline at end of file
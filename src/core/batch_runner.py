@@ -0,0 +1,231 @@
+"""
+Batch Runner - 複数タスクの並行バッチ実行
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from config.settings import Settings
+from core.client_manager import ClientManager
+from core.cosmosdb_manager import CosmosDBManager
+from core.session_manager import SessionManager
+from core.team_pool import TeamPool
+from utils.logging import get_logger
+from utils.file_utils import create_logs_dir
+from utils.unicode_utils import safe_print
+
+
+def load_batch_tasks(path: str) -> List[Dict[str, str]]:
+    """JSONLファイルからバッチタスクを読み込む
+
+    各行は {"id": "...", "task": "..."} 形式のオブジェクト、またはタスク文字列そのもの。
+    """
+    tasks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                entry = {"task": entry}
+            if not isinstance(entry, dict) or not entry.get("task"):
+                raise ValueError(f"Invalid batch task at line {line_number}: 'task' is required")
+
+            tasks.append({
+                "id": str(entry.get("id") or f"task_{len(tasks) + 1:04d}"),
+                "task": entry["task"]
+            })
+
+    return tasks
+
+
+class BatchRunner:
+    """1つのイベントループ上で複数セッションを並行実行するクラス"""
+
+    def __init__(
+        self,
+        settings: Settings,
+        concurrency: int = 4,
+        client_manager: Optional[ClientManager] = None
+    ):
+        if concurrency <= 0:
+            raise ValueError("concurrency must be greater than 0")
+
+        self.settings = settings
+        self.concurrency = concurrency
+        self.logger = get_logger(__name__)
+        # モデルクライアントは全セッションで共有する
+        self.client_manager = client_manager or ClientManager(settings)
+        # エージェントとチームはセッションごとに作り直さず、リセットして再利用する
+        self.team_pool = TeamPool(settings, self.client_manager, max_size=settings.team_pool_size)
+        self.output_directory = os.path.join(
+            settings.log_directory,
+            datetime.now().strftime("batch_%Y%m%d_%H%M%S")
+        )
+
+    async def run(self, tasks: List[Dict[str, str]]) -> Dict[str, Any]:
+        """全タスクを実行し、集計レポートを返す"""
+        create_logs_dir(self.output_directory)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cosmos_client = CosmosDBManager.create_shared_client(self.settings.get_cosmosdb_settings())
+
+        self.logger.info(f"Starting batch: {len(tasks)} tasks, concurrency={self.concurrency}")
+        batch_start = time.time()
+        self.team_pool.prewarm(min(self.concurrency, len(tasks)))
+
+        # 1つのSessionManagerで全タスクを並行実行する（実行ごとの状態はSessionContextに分離される）
+        session_manager = SessionManager(
+            self.settings,
+            client_manager=self.client_manager,
+            cosmos_client=cosmos_client,
+            team_pool=self.team_pool
+        )
+        session_manager.console_output = False
+        # 各セッションのトランスクリプトはバッチ用ディレクトリにストリーミングされる
+        session_manager.transcript_directory = self.output_directory
+
+        try:
+            results = await asyncio.gather(*[
+                self._run_task(entry, semaphore, session_manager, index, len(tasks))
+                for index, entry in enumerate(tasks, start=1)
+            ])
+        finally:
+            if cosmos_client is not None:
+                await cosmos_client.close()
+
+        wall_time = time.time() - batch_start
+        return self._build_report(results, wall_time)
+
+    async def _run_task(
+        self,
+        entry: Dict[str, str],
+        semaphore: asyncio.Semaphore,
+        session_manager: SessionManager,
+        index: int,
+        total: int
+    ) -> Dict[str, Any]:
+        """1タスクを実行し、結果を返す"""
+        async with semaphore:
+            result = {
+                "id": entry["id"],
+                "status": "failed",
+                "latency": 0.0,
+                "total_messages": 0,
+                "first_message_latency": None,
+                "transcript": None,
+                "error": None
+            }
+
+            context = session_manager.new_context()
+            start_time = time.time()
+            try:
+                async for event in session_manager.stream_session(entry["task"], context=context):
+                    if event.type == "message" and event.source != "user" and result["first_message_latency"] is None:
+                        result["first_message_latency"] = time.time() - start_time
+                    elif event.type == "session_completed":
+                        result["status"] = "completed"
+            except Exception as e:
+                self.logger.error(f"Batch task {entry['id']} failed: {e}")
+                result["error"] = str(e)
+
+            result["latency"] = time.time() - start_time
+            result["total_messages"] = len(context.chat_contexts)
+            if context.transcript_writer is not None:
+                result["transcript"] = context.transcript_writer.filepath
+
+            safe_print(
+                f"[{index}/{total}] {entry['id']} {result['status']} "
+                f"in {result['latency']:.2f}s ({result['total_messages']} messages)"
+            )
+            return result
+
+    def _build_report(self, results: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        """スループットとレイテンシの集計レポートを作成する"""
+        completed = [r for r in results if r["status"] == "completed"]
+        latencies = sorted(r["latency"] for r in completed)
+        first_message_latencies = sorted(
+            r["first_message_latency"] for r in results if r["first_message_latency"] is not None
+        )
+        total_messages = sum(r["total_messages"] for r in results)
+
+        report = {
+            "total_tasks": len(results),
+            "completed": len(completed),
+            "failed": len(results) - len(completed),
+            "concurrency": self.concurrency,
+            "wall_time": wall_time,
+            "sessions_per_minute": len(completed) / wall_time * 60 if wall_time > 0 else 0.0,
+            "total_messages": total_messages,
+            "messages_per_second": total_messages / wall_time if wall_time > 0 else 0.0,
+            "latency": {},
+            "first_message_latency": {},
+            "team_pool": self.team_pool.get_stats(),
+            "output_directory": self.output_directory,
+            "results": results
+        }
+
+        if latencies:
+            report["latency"] = {
+                "min": latencies[0],
+                "mean": statistics.mean(latencies),
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "max": latencies[-1]
+            }
+        
+        if first_message_latencies:
+            report["first_message_latency"] = {
+                "mean": statistics.mean(first_message_latencies),
+                "p50": _percentile(first_message_latencies, 50),
+                "p95": _percentile(first_message_latencies, 95)
+            }
+
+        return report
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """ソート済みリストからパーセンタイル値を取得する（最近傍法）"""
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def format_batch_report(report: Dict[str, Any]) -> str:
+    """バッチレポートを表示用の文字列に整形する"""
+    lines = [
+        f"Tasks: {report['completed']}/{report['total_tasks']} completed, "
+        f"{report['failed']} failed (concurrency={report['concurrency']})",
+        f"Wall time: {report['wall_time']:.2f} seconds",
+        f"Throughput: {report['sessions_per_minute']:.2f} sessions/min, "
+        f"{report['messages_per_second']:.2f} messages/sec",
+    ]
+
+    latency = report.get("latency")
+    if latency:
+        lines.append(
+            f"Session latency: min {latency['min']:.2f}s / mean {latency['mean']:.2f}s / "
+            f"p50 {latency['p50']:.2f}s / p95 {latency['p95']:.2f}s / max {latency['max']:.2f}s"
+        )
+
+    first_message = report.get("first_message_latency")
+    if first_message:
+        lines.append(
+            f"Time to first message: mean {first_message['mean']:.2f}s / "
+            f"p50 {first_message['p50']:.2f}s / p95 {first_message['p95']:.2f}s"
+        )
+
+    team_pool = report.get("team_pool")
+    if team_pool:
+        lines.append(
+            f"Team pool: {team_pool['created']} built, {team_pool['reused']} reused, "
+            f"{team_pool['discarded']} discarded"
+        )
+
+    lines.append(f"Transcripts saved to: {report['output_directory']}")
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""
+Checkpoint Manager - セッションのチェックポイント保存と復元
+"""
+
+import asyncio
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+from utils.logging import get_logger
+from utils.file_utils import create_logs_dir, format_timestamp
+
+
+class CheckpointManager:
+    """AutoGenのチーム状態とチャットコンテキストをチェックポイントとして管理するクラス"""
+
+    def __init__(self, directory: str, cosmosdb_manager=None, save_to_cosmosdb: bool = False):
+        self.directory = directory
+        self.cosmosdb_manager = cosmosdb_manager
+        self.save_to_cosmosdb = save_to_cosmosdb
+        self.logger = get_logger(__name__)
+
+    def _path(self, session_id: str) -> str:
+        """チェックポイントファイルのパスを返す"""
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    async def save(
+        self,
+        session_id: str,
+        task: str,
+        team_state: Dict[str, Any],
+        chat_contexts: List[Dict[str, Any]],
+        elapsed_time: float,
+        transcript_file: Optional[str] = None
+    ) -> bool:
+        """チェックポイントをディスク（と任意でCosmosDB）に保存する"""
+        checkpoint = {
+            "session_id": session_id,
+            "task": task,
+            "saved_at": format_timestamp(),
+            "elapsed_time": elapsed_time,
+            "message_count": len(chat_contexts),
+            "chat_contexts": list(chat_contexts),
+            "transcript_file": transcript_file,
+            "team_state": team_state
+        }
+
+        try:
+            await asyncio.to_thread(self._write_file, session_id, checkpoint)
+        except Exception as e:
+            self.logger.error(f"Failed to write checkpoint for {session_id}: {e}")
+            return False
+
+        if self.save_to_cosmosdb and self.cosmosdb_manager and self.cosmosdb_manager.container:
+            await self.cosmosdb_manager.save_checkpoint(checkpoint)
+
+        self.logger.debug(f"Checkpoint saved: {session_id} ({len(chat_contexts)} messages)")
+        return True
+
+    def _write_file(self, session_id: str, checkpoint: Dict[str, Any]) -> None:
+        """一時ファイルに書き込んでから置き換え、書き込み途中の破損を防ぐ"""
+        create_logs_dir(self.directory)
+        path = self._path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """チェックポイントを読み込む（ディスクになければCosmosDBから取得する）"""
+        path = self._path(session_id)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        if self.cosmosdb_manager and self.cosmosdb_manager.container:
+            return await self.cosmosdb_manager.load_checkpoint(session_id)
+
+        return None
+
+    async def delete(self, session_id: str) -> None:
+        """完了したセッションのチェックポイントを削除する
+
+        load はディスクになければCosmosDBから取得するため、CosmosDB上のチェックポイントも削除する。
+        """
+        path = self._path(session_id)
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Failed to remove checkpoint {path}: {e}")
+
+        if self.cosmosdb_manager and self.cosmosdb_manager.container:
+            await self.cosmosdb_manager.delete_checkpoint(session_id)
+
+    def list_checkpoints(self) -> List[str]:
+        """再開可能なセッションIDの一覧を取得する"""
+        if not os.path.exists(self.directory):
+            return []
+
+        files = [f for f in os.listdir(self.directory) if f.endswith(".json")]
+        return sorted((os.path.splitext(f)[0] for f in files), reverse=True)
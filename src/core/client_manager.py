@@ -2,10 +2,18 @@
 Client Manager - AIクライアントの管理
 """
 
+from autogen_core.models import ChatCompletionClient, UserMessage
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 from config.settings import Settings
+from core.client_pool import get_client_pool
+from core.client_wrappers import iter_wrappers
+from core.record_replay import ModelFixture, RecordingChatCompletionClient, ReplayModelClient
+from core.rate_limiter import RateLimitedChatCompletionClient, TokenBucketRateLimiter, get_rate_limiter
+from core.resilient_client import ResilientChatCompletionClient, get_circuit_breaker
+from core.response_cache import ResponseCache, CachingChatCompletionClient
+from core.usage_tracker import UsageTrackingChatCompletionClient
 from utils.logging import get_logger
-from typing import Optional
+from typing import Optional, Dict, Any
 
 
 class ClientManager:
@@ -14,47 +22,184 @@ class ClientManager:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.logger = get_logger(__name__)
-        self._chat_client: Optional[AzureOpenAIChatCompletionClient] = None
-        self._reasoning_client: Optional[AzureOpenAIChatCompletionClient] = None
+        self._chat_client: Optional[ChatCompletionClient] = None
+        self._reasoning_client: Optional[ChatCompletionClient] = None
+        self._response_cache: Optional[ResponseCache] = None
+        self._fixture: Optional[ModelFixture] = None
     
     @property
-    def chat_client(self) -> AzureOpenAIChatCompletionClient:
+    def chat_client(self) -> ChatCompletionClient:
         """チャット用クライアントを取得する"""
         if self._chat_client is None:
-            self._chat_client = self._create_chat_client()
+            self._chat_client = self._wrap_client(
+                self._build_client("chat", self._create_chat_client),
+                self.settings.azure_deployment_chat,
+                self.settings.max_tokens_chat
+            )
         return self._chat_client
     
     @property
-    def reasoning_client(self) -> AzureOpenAIChatCompletionClient:
+    def reasoning_client(self) -> ChatCompletionClient:
         """推論用クライアントを取得する"""
         if self._reasoning_client is None:
-            self._reasoning_client = self._create_reasoning_client()
+            client = self._wrap_client(
+                self._build_client("reasoning", self._create_reasoning_client),
+                self.settings.azure_deployment_reasoning,
+                self.settings.max_tokens_reasoning
+            )
+            # 推論用クライアントはセレクターが使うため、呼び出しごとの使用量をセッションに記録する
+            self._reasoning_client = UsageTrackingChatCompletionClient(
+                client,
+                self.settings.azure_deployment_reasoning
+            )
         return self._reasoning_client
     
+    def _build_client(self, client_name: str, factory) -> ChatCompletionClient:
+        """モデルクライアントのモード（live / record / replay）に応じて基底クライアントを作成する"""
+        mode = self.settings.model_client_mode
+        if client_name == "chat":
+            model_name, max_tokens = self.settings.azure_deployment_chat, self.settings.max_tokens_chat
+        else:
+            model_name, max_tokens = self.settings.azure_deployment_reasoning, self.settings.max_tokens_reasoning
+        
+        if mode == "replay":
+            if self._fixture is None:
+                self._fixture = ModelFixture(self.settings.model_fixture_path)
+            self.logger.info(f"Creating {client_name} replay client from {self._fixture.path}")
+            fixed_latency = self.settings.replay_fixed_latency
+            return ReplayModelClient(
+                self._fixture,
+                client_name,
+                model_name,
+                client_params={"max_tokens": max_tokens},
+                latency_scale=self.settings.replay_latency_scale,
+                fixed_latency=fixed_latency if fixed_latency >= 0 else None
+            )
+        
+        client = factory()
+        if mode == "record":
+            if self._fixture is None:
+                self._fixture = ModelFixture(self.settings.model_fixture_path)
+            self.logger.info(f"Recording {client_name} client calls to {self._fixture.path}")
+            client = RecordingChatCompletionClient(
+                client,
+                self._fixture,
+                client_name,
+                model_name,
+                client_params={"max_tokens": max_tokens}
+            )
+        
+        # 再試行も含めて試行ごとにレート制限の容量を確保する（記録するレイテンシや期限に待ち時間を含めない）
+        deployment = self._deployment_for(client_name)
+        limiter = self._rate_limiter(deployment)
+        if self.settings.resilient_client_enabled:
+            return self._make_resilient(client, model_name, deployment, limiter, max_tokens)
+        if limiter is not None:
+            return RateLimitedChatCompletionClient(client, limiter, model_name, max_tokens)
+        return client
+    
+    def _deployment_for(self, client_name: str) -> str:
+        """クライアントが実際にリクエストを送るAzureデプロイメント
+
+        推論用クライアントも azure_deployment にはチャット用デプロイメントを指定しているため、
+        レート制限とサーキットブレーカーはモデル名ではなくこのデプロイメント単位で共有する。
+        """
+        return self.settings.azure_deployment_chat
+    
+    def _make_resilient(
+        self,
+        client: ChatCompletionClient,
+        model_name: str,
+        deployment: str,
+        limiter: Optional[TokenBucketRateLimiter],
+        max_tokens: int
+    ) -> ChatCompletionClient:
+        """呼び出しごとの期限・リトライ・サーキットブレーカーを適用する（リミッターは試行ごとに使う）"""
+        breaker = None
+        if self.settings.circuit_breaker_threshold:
+            breaker = get_circuit_breaker(
+                self.settings.azure_endpoint,
+                deployment,
+                self.settings.circuit_breaker_threshold,
+                self.settings.circuit_breaker_reset_seconds
+            )
+        return ResilientChatCompletionClient(
+            client,
+            model_name,
+            timeout=self.settings.model_call_timeout,
+            max_retries=self.settings.model_max_retries,
+            backoff_base=self.settings.model_retry_backoff,
+            backoff_max=self.settings.model_retry_backoff_max,
+            breaker=breaker,
+            limiter=limiter,
+            max_tokens=max_tokens
+        )
+    
+    def _rate_limiter(self, deployment: str) -> Optional[TokenBucketRateLimiter]:
+        """レート制限が設定されていれば、デプロイメント単位で共有するリミッターを取得する"""
+        if not self.settings.rate_limit_rpm:
+            return None
+        
+        return get_rate_limiter(
+            self.settings.azure_endpoint,
+            deployment,
+            self.settings.rate_limit_rpm,
+            self.settings.rate_limit_tpm,
+            state_directory=self.settings.rate_limit_state_directory or None
+        )
+    
+    def _wrap_client(self, client: ChatCompletionClient, model_name: str, max_tokens: int) -> ChatCompletionClient:
+        """設定に応じてクライアントをラッパーで包む"""
+        if self.settings.response_cache_enabled:
+            if self._response_cache is None:
+                self._response_cache = ResponseCache(
+                    self.settings.response_cache_path,
+                    max_bytes=self.settings.response_cache_max_mb * 1024 * 1024
+                )
+            client = CachingChatCompletionClient(
+                client,
+                self._response_cache,
+                model_name,
+                client_params={"max_tokens": max_tokens}
+            )
+        return client
+    
     def _create_chat_client(self) -> AzureOpenAIChatCompletionClient:
         """チャット用クライアントを作成する"""
         self.logger.info("Creating chat client")
-        return AzureOpenAIChatCompletionClient(
-            azure_deployment=self.settings.azure_deployment_chat,
+        return self._new_azure_client(
+            azure_deployment=self._deployment_for("chat"),
             model=self.settings.azure_deployment_chat,
             api_version=self.settings.azure_api_version,
             azure_endpoint=self.settings.azure_endpoint,
             api_key=self.settings.azure_api_key,
-            max_tokens=self.settings.max_tokens_chat
+            max_tokens=self.settings.max_tokens_chat,
+            max_retries=self._sdk_max_retries()
         )
     
     def _create_reasoning_client(self) -> AzureOpenAIChatCompletionClient:
         """推論用クライアントを作成する"""
         self.logger.info("Creating reasoning client")
-        return AzureOpenAIChatCompletionClient(
-            azure_deployment=self.settings.azure_deployment_chat,
+        return self._new_azure_client(
+            azure_deployment=self._deployment_for("reasoning"),
             model=self.settings.azure_deployment_reasoning,
             api_version=self.settings.azure_api_version,
             azure_endpoint=self.settings.azure_endpoint,
             api_key=self.settings.azure_api_key,
-            max_tokens=self.settings.max_tokens_reasoning
+            max_tokens=self.settings.max_tokens_reasoning,
+            max_retries=self._sdk_max_retries()
         )
     
+    def _new_azure_client(self, **config) -> AzureOpenAIChatCompletionClient:
+        """Azure OpenAIクライアントを作成する（有効な場合はプロセス共通のプールから取得）"""
+        if self.settings.http_pool_enabled:
+            return get_client_pool(self.settings).get_client(**config)
+        return AzureOpenAIChatCompletionClient(**config)
+    
+    def _sdk_max_retries(self) -> int:
+        """SDK側のリトライ回数（ラッパーでリトライする場合は二重にならないよう無効化する）"""
+        return 0 if self.settings.resilient_client_enabled else 2
+    
     def health_check(self) -> bool:
         """クライアントの健全性をチェックする"""
         try:
@@ -73,6 +218,38 @@ class ClientManager:
             self.logger.error(f"Client health check failed: {e}")
             return False
     
+    async def ping(self) -> None:
+        """チャット用デプロイメントに1トークンだけの呼び出しを行い、到達性と認証を確認する
+
+        キャッシュ・リトライ・使用量の記録を通さないよう、ラッパーのない基底クライアントで呼び出す。
+        """
+        client = self._create_chat_client()
+        try:
+            await client.create(
+                [UserMessage(content="ping", source="health_check")],
+                extra_create_args={"max_tokens": 1}
+            )
+        finally:
+            # プールのクライアントは共有しているため閉じない
+            if not self.settings.http_pool_enabled:
+                await client.close()
+    
+    def get_client_stats(self) -> Dict[str, Any]:
+        """クライアントラッパーの統計（キャッシュヒット率など）をクライアント別に取得する"""
+        stats: Dict[str, Any] = {}
+        for name, client in (("chat", self._chat_client), ("reasoning", self._reasoning_client)):
+            if client is None:
+                continue
+            client_stats: Dict[str, Any] = {}
+            for wrapper in iter_wrappers(client):
+                client_stats.update(wrapper.get_stats())
+                client = wrapper.inner
+            if isinstance(client, ReplayModelClient):
+                client_stats.update(client.get_stats())
+            if client_stats:
+                stats[name] = client_stats
+        return stats
+    
     def reset_clients(self) -> None:
         """クライアントをリセットする"""
         self.logger.info("Resetting clients")
@@ -0,0 +1,110 @@
+"""
+Client Pool - プロセス内で共有するモデルクライアントとHTTP接続プール
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import openai
+from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+
+from config.settings import Settings
+from utils.logging import get_logger
+
+
+class ModelClientPool:
+    """デプロイメント・エンドポイントごとのモデルクライアントをプロセス内で共有するプール
+
+    全てのクライアントは1つのキープアライブHTTPクライアントを共有するため、
+    セッションをまたいでもTLS接続を張り直さない。
+    共有HTTPクライアントは個々のモデルクライアントではなく close() でまとめて閉じる
+    （モデルクライアントの close() は共有HTTPクライアントも閉じてしまうため呼ばないこと）。
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+        self._http_client: Optional[openai.DefaultAsyncHttpxClient] = None
+        self._clients: Dict[Tuple, AzureOpenAIChatCompletionClient] = {}
+        self.created = 0
+        self.reused = 0
+
+    def _get_http_client(self) -> openai.DefaultAsyncHttpxClient:
+        """共有HTTPクライアントを取得する（OpenAI SDKの既定値を引き継ぐ）"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = openai.DefaultAsyncHttpxClient(limits=self.limits)
+        return self._http_client
+
+    def get_client(self, **config: Any) -> AzureOpenAIChatCompletionClient:
+        """設定が同じクライアントがあれば再利用し、なければ共有HTTPクライアントで作成する"""
+        key = tuple(sorted(config.items()))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+
+            self.logger.info(f"Creating pooled client for deployment {config.get('azure_deployment')}")
+            client = AzureOpenAIChatCompletionClient(http_client=self._get_http_client(), **config)
+            self._clients[key] = client
+            self.created += 1
+            return client
+
+    async def close(self) -> None:
+        """共有HTTPクライアントを閉じ、プールを空にする"""
+        with self._lock:
+            http_client = self._http_client
+            self._http_client = None
+            self._clients.clear()
+        if http_client is not None and not http_client.is_closed:
+            await http_client.aclose()
+            self.logger.info("Shared HTTP client closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの統計を取得する"""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "created": self.created,
+                "reused": self.reused,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections
+            }
+
+
+_pool: Optional[ModelClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool(settings: Settings) -> ModelClientPool:
+    """プロセス共通のクライアントプールを取得する（初回の設定で作成）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelClientPool(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            )
+        return _pool
+
+
+async def close_client_pool() -> None:
+    """プロセス終了時にクライアントプールを閉じる"""
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        await pool.close()
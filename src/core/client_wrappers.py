@@ -0,0 +1,130 @@
+"""
+Client Wrappers - モデルクライアントのラッパー共通基盤
+"""
+
+import hashlib
+import json
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+
+class ChatCompletionClientWrapper(ChatCompletionClient):
+    """別のモデルクライアントに処理を委譲するラッパーの基底クラス
+
+    サブクラスは create / create_stream のみを必要に応じて上書きする。
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model_name: str = ""):
+        self.inner = inner
+        self.model_name = model_name
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        return await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        return self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.inner.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.inner.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.inner.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.inner.capabilities  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.inner.model_info
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ラッパー固有の統計を返す（サブクラスで上書きする）"""
+        return {}
+
+
+def iter_wrappers(client: ChatCompletionClient):
+    """ラッパーチェーンを外側から順にたどる"""
+    while isinstance(client, ChatCompletionClientWrapper):
+        yield client
+        client = client.inner
+
+
+def request_key(
+    model_name: str,
+    messages: Sequence[LLMMessage],
+    tools: Sequence[Tool | ToolSchema] = [],
+    json_output: Optional[bool | type[BaseModel]] = None,
+    extra_create_args: Mapping[str, Any] = {},
+) -> str:
+    """モデル名・メッセージ・パラメータから決定的なリクエストキー（SHA-256）を計算する"""
+    tool_schemas = []
+    for tool in tools:
+        tool_schemas.append(tool.schema if isinstance(tool, Tool) else tool)
+
+    if isinstance(json_output, type):
+        json_output_key: Any = json_output.__name__
+    else:
+        json_output_key = json_output
+
+    payload = {
+        "model": model_name,
+        "messages": [message.model_dump(mode="json") for message in messages],
+        "tools": tool_schemas,
+        "json_output": json_output_key,
+        "extra_create_args": dict(extra_create_args),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
@@ -5,28 +5,32 @@ CosmosDB Manager - CosmosDBとのリアルタイム連携管理
 import asyncio
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from azure.cosmos import CosmosClient, exceptions
-from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 
 from utils.logging import get_logger
 from utils.file_utils import format_timestamp
 
+# Azure SDKの読み込みは重いため、CosmosDBを有効にして初めて使う時点でインポートする
+if TYPE_CHECKING:
+    from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+
 
 class CosmosDBManager:
     """CosmosDBとのリアルタイム連携を管理するクラス"""
     
-    def __init__(self, settings: Dict[str, Any]):
+    def __init__(self, settings: Dict[str, Any], client: Optional["AsyncCosmosClient"] = None):
         self.settings = settings
         self.logger = get_logger(__name__)
-        self.client: Optional[AsyncCosmosClient] = None
+        self.client: Optional["AsyncCosmosClient"] = client
+        # 外部から共有クライアントを渡された場合はclose()で閉じない
+        self._owns_client = client is None
         self.database = None
         self.container = None
         self.session_id: Optional[str] = None
         self.session_document_id: Optional[str] = None
         
-    async def initialize(self) -> bool:
-        """CosmosDBクライアントを初期化する"""
+    async def initialize(self, session_id: Optional[str] = None) -> bool:
+        """CosmosDBクライアントを初期化する（session_idを指定した場合はそのIDを使う）"""
         try:
             if not self.settings.get('enabled', False):
                 self.logger.info("CosmosDB integration is disabled")
@@ -37,12 +41,15 @@ class CosmosDBManager:
             database_name = self.settings['database_name']
             container_name = self.settings['container_name']
             
-            self.client = AsyncCosmosClient(endpoint, key)
+            if self.client is None:
+                from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+                self.client = AsyncCosmosClient(endpoint, key)
+                self._owns_client = True
             self.database = self.client.get_database_client(database_name)
             self.container = self.database.get_container_client(container_name)
             
             # セッションIDを生成
-            self.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(self)}"
+            self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(self)}"
             
             self.logger.info(f"CosmosDB initialized - Session ID: {self.session_id}")
             return True
@@ -87,6 +94,35 @@ class CosmosDBManager:
             self.logger.error(f"Failed to create session document: {e}")
             return False
     
+    async def resume_session_document(self, task: str, team_info: Dict[str, Any]) -> bool:
+        """再開するセッションの文書を実行中に戻す（存在しなければ新規作成する）"""
+        try:
+            if not self.container:
+                return False
+            
+            from azure.cosmos import exceptions
+            
+            try:
+                session_doc = await self.container.read_item(
+                    item=self.session_id,
+                    partition_key=self.session_id
+                )
+            except exceptions.CosmosResourceNotFoundError:
+                return await self.create_session_document(task, team_info)
+            
+            session_doc["status"] = "running"
+            session_doc["resumed_at"] = format_timestamp()
+            session_doc["updated_at"] = format_timestamp()
+            await self.container.replace_item(item=session_doc["id"], body=session_doc)
+            self.session_document_id = self.session_id
+            
+            self.logger.info(f"Session document resumed: {self.session_id}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to resume session document: {e}")
+            return False
+    
     async def save_message_realtime(self, message_data: Dict[str, Any]) -> bool:
         """メッセージをリアルタイムでCosmosDBに保存する"""
         try:
@@ -112,6 +148,8 @@ class CosmosDBManager:
                 "created_at": format_timestamp(),
                 "ttl": -1
             }
+            if "usage" in message_data:
+                message_doc["usage"] = message_data["usage"]
             
             # メッセージドキュメントを作成
             await self.container.create_item(message_doc)
@@ -194,6 +232,7 @@ class CosmosDBManager:
             session_doc["end_time"] = format_timestamp()
             session_doc["execution_time"] = execution_time
             session_doc["final_statistics"] = final_stats
+            session_doc["stop_reason"] = final_stats.get("stop_reason")
             session_doc["updated_at"] = format_timestamp()
             
             # ドキュメントを更新
@@ -209,6 +248,85 @@ class CosmosDBManager:
             self.logger.error(f"Failed to complete session in CosmosDB: {e}")
             return False
     
+    async def save_checkpoint(self, checkpoint: Dict[str, Any]) -> bool:
+        """セッションのチェックポイントを保存する（セッションごとに1文書を上書き）"""
+        try:
+            if not self.container:
+                return False
+            
+            checkpoint_doc = dict(checkpoint)
+            checkpoint_doc.update({
+                "id": f"{self.session_id}_checkpoint",
+                "session_id": self.session_id,  # パーティションキー
+                "type": "checkpoint",
+                "ttl": -1
+            })
+            await self.container.upsert_item(checkpoint_doc)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to save checkpoint to CosmosDB: {e}")
+            return False
+    
+    async def load_checkpoint(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """セッションのチェックポイントを取得する"""
+        from azure.cosmos import exceptions
+        
+        try:
+            if not self.container:
+                return None
+            
+            return await self.container.read_item(
+                item=f"{session_id}_checkpoint",
+                partition_key=session_id
+            )
+            
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Failed to load checkpoint from CosmosDB: {e}")
+            return None
+    
+    async def delete_checkpoint(self, session_id: str) -> bool:
+        """セッションのチェックポイントを削除する（完了したセッションを再開できないようにする）"""
+        from azure.cosmos import exceptions
+        
+        try:
+            if not self.container:
+                return False
+            
+            await self.container.delete_item(
+                item=f"{session_id}_checkpoint",
+                partition_key=session_id
+            )
+            return True
+            
+        except exceptions.CosmosResourceNotFoundError:
+            return False
+        except Exception as e:
+            self.logger.error(f"Failed to delete checkpoint from CosmosDB: {e}")
+            return False
+    
+    async def get_session_status(self, session_id: str) -> Optional[str]:
+        """セッション文書の状態（running / completed）を取得する（文書がなければNone）"""
+        from azure.cosmos import exceptions
+        
+        try:
+            if not self.container:
+                return None
+            
+            session_doc = await self.container.read_item(
+                item=session_id,
+                partition_key=session_id
+            )
+            return session_doc.get("status")
+            
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Failed to read session status from CosmosDB: {e}")
+            return None
+    
     async def get_session_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """過去のセッション履歴を取得する"""
         try:
@@ -246,8 +364,17 @@ class CosmosDBManager:
             self.logger.error(f"CosmosDB health check failed: {e}")
             return False
     
+    @staticmethod
+    def create_shared_client(settings: Dict[str, Any]) -> Optional["AsyncCosmosClient"]:
+        """複数のセッションで共有するCosmosDBクライアントを作成する"""
+        if not settings.get('enabled', False):
+            return None
+        from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+        return AsyncCosmosClient(settings['endpoint'], settings['key'])
+    
     async def close(self):
         """CosmosDBクライアントを閉じる"""
-        if self.client:
+        if self.client and self._owns_client:
             await self.client.close()
+            self.client = None
             self.logger.info("CosmosDB client closed")
\ No newline at end of file
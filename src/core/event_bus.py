@@ -0,0 +1,238 @@
+"""
+Event Bus - フック（購読者）へのイベント配信をイベントループから切り離すバス
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.logging import get_logger
+
+
+BACKPRESSURE_DROP = "drop"          # キューが満杯なら新しいイベントを捨てる
+BACKPRESSURE_BLOCK = "block"        # キューが空くまで発行側を待たせる
+BACKPRESSURE_COALESCE = "coalesce"  # キューが満杯なら最も古いイベントを捨てて新しいイベントを入れる
+BACKPRESSURE_POLICIES = (BACKPRESSURE_DROP, BACKPRESSURE_BLOCK, BACKPRESSURE_COALESCE)
+
+
+class Subscription:
+    """購読者1件分のキューと配信ワーカー、統計"""
+
+    def __init__(self, hook: Callable, policy: str, queue_size: int, lag_seconds: float):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy} (expected one of {BACKPRESSURE_POLICIES})")
+        self.hook = hook
+        self.name = getattr(hook, "__qualname__", repr(hook))
+        self.policy = policy
+        self.queue_size = queue_size
+        self.lag_seconds = lag_seconds
+        # __call__ が async の呼び出し可能オブジェクトも非同期フックとして扱う
+        self.is_async = inspect.iscoroutinefunction(hook) or inspect.iscoroutinefunction(getattr(hook, "__call__", None))
+        self.logger = get_logger(__name__)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # キー（セッションIDなど）ごとの未配信件数と、その配信完了を待つイベント
+        self._pending_by_key: Dict[Any, int] = {}
+        self._key_waiters: Dict[Any, List[asyncio.Event]] = {}
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_pending = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.lagging = False
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """現在のイベントループで配信ワーカーを起動する（別のループで使われていた場合は作り直す）"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = loop.create_task(self._run())
+            # 以前のキューのイベントは配信されないため、キーごとの件数も引き継がない
+            self._release_key_waiters()
+        return self._queue
+
+    async def put(self, event: Any, key: Any = None) -> None:
+        """バックプレッシャーの方針に従ってイベントをキューに入れる"""
+        queue = self._ensure_worker()
+        item: Tuple[float, Any, Any] = (time.monotonic(), key, event)
+        if self.policy == BACKPRESSURE_BLOCK:
+            await queue.put(item)
+        elif queue.full():
+            if self.policy == BACKPRESSURE_DROP:
+                self.dropped += 1
+                self._mark_lagging("queue full, dropping events")
+                return
+            _, old_key, _ = queue.get_nowait()
+            queue.task_done()
+            self._untrack(old_key)
+            self.coalesced += 1
+            self._mark_lagging("queue full, coalescing events")
+            queue.put_nowait(item)
+        else:
+            queue.put_nowait(item)
+        if key is not None:
+            self._pending_by_key[key] = self._pending_by_key.get(key, 0) + 1
+        self.max_pending = max(self.max_pending, queue.qsize())
+
+    def _untrack(self, key: Any) -> None:
+        """キーの未配信件数を1減らし、0になったらそのキーの配信完了を待つ呼び出し元を起こす"""
+        if key is None:
+            return
+        remaining = self._pending_by_key.get(key, 0) - 1
+        if remaining > 0:
+            self._pending_by_key[key] = remaining
+            return
+        self._pending_by_key.pop(key, None)
+        for waiter in self._key_waiters.pop(key, []):
+            waiter.set()
+
+    def _release_key_waiters(self) -> None:
+        self._pending_by_key.clear()
+        for waiters in self._key_waiters.values():
+            for waiter in waiters:
+                waiter.set()
+        self._key_waiters.clear()
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            published_at, key, event = await queue.get()
+            try:
+                if self.is_async:
+                    await self.hook(event)
+                else:
+                    # 同期フックはイベントループを止めないよう別スレッドで実行する
+                    await asyncio.to_thread(self.hook, event)
+                self.delivered += 1
+            except Exception as e:
+                self.failed += 1
+                self.logger.warning(f"Hook {self.name} failed: {e}")
+            finally:
+                queue.task_done()
+                self._untrack(key)
+
+            latency = time.monotonic() - published_at
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if latency > self.lag_seconds:
+                self._mark_lagging(f"delivery latency {latency:.2f}s")
+            elif queue.empty():
+                self.lagging = False
+
+    def _mark_lagging(self, reason: str) -> None:
+        if not self.lagging:
+            self.logger.warning(f"Hook {self.name} is falling behind: {reason}")
+        self.lagging = True
+
+    async def drain(self, key: Any = None) -> None:
+        """キューに残っているイベント（key を指定した場合はそのキーのイベントのみ）の配信完了を待つ"""
+        if self._queue is None or self._worker is None or self._worker.done():
+            return
+        if key is None:
+            await self._queue.join()
+            return
+        if not self._pending_by_key.get(key):
+            return
+        waiter = asyncio.Event()
+        self._key_waiters.setdefault(key, []).append(waiter)
+        await waiter.wait()
+
+    def cancel(self) -> None:
+        """配信ワーカーを止める（未配信のイベントは破棄する）"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._release_key_waiters()
+
+    def get_stats(self) -> Dict[str, Any]:
+        handled = self.delivered + self.failed
+        return {
+            "hook": self.name,
+            "policy": self.policy,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "avg_latency_ms": self.total_latency / handled * 1000 if handled else 0.0,
+            "max_latency_ms": self.max_latency * 1000,
+            "lagging": self.lagging
+        }
+
+
+class EventBus:
+    """購読者ごとの上限付きキューを介してフックにイベントを配信するバス
+
+    publish はキューに入れるだけで、フックの実行は購読者ごとのワーカーが順に行う。
+    同期フックは別スレッドで、非同期フックはイベントループ上で実行するため、
+    遅いフックが発行側（会話）を止めるのは block 方針でキューが満杯になった場合に限る。
+    配信の遅延が lag_seconds を超えたか、キューが溢れた購読者は遅れているとして報告する。
+    """
+
+    def __init__(self, queue_size: int = 1000, policy: str = BACKPRESSURE_BLOCK, lag_seconds: float = 1.0):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy} (expected one of {BACKPRESSURE_POLICIES})")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.lag_seconds = lag_seconds
+        self.logger = get_logger(__name__)
+        self._subscriptions: List[Subscription] = []
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, hook: Callable, policy: Optional[str] = None, queue_size: Optional[int] = None) -> Subscription:
+        """フックを購読者として登録する（方針とキューの長さを省略した場合はバスの既定値）"""
+        subscription = Subscription(
+            hook,
+            policy or self.policy,
+            queue_size or self.queue_size,
+            self.lag_seconds
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, hook: Callable) -> None:
+        """フックの登録を解除する（未配信のイベントは破棄する）"""
+        for subscription in [s for s in self._subscriptions if s.hook == hook]:
+            subscription.cancel()
+            self._subscriptions.remove(subscription)
+
+    def clear(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.cancel()
+        self._subscriptions.clear()
+
+    async def publish(self, event: Any, key: Any = None) -> None:
+        """全ての購読者のキューにイベントを入れる（key を付けると drain でそのキーの分だけ待てる）"""
+        for subscription in list(self._subscriptions):
+            await subscription.put(event, key)
+
+    async def drain(self, timeout: Optional[float] = None, key: Any = None) -> bool:
+        """全ての購読者の配信完了を待つ（期限内に終わらなかった場合は False）
+
+        key を指定した場合は、そのキーで発行したイベントの配信完了だけを待つ
+        （並行実行中の他のセッションのイベントは待たない）。
+        """
+        if not self._subscriptions:
+            return True
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(subscription.drain(key) for subscription in self._subscriptions)),
+                timeout=timeout
+            )
+            return True
+        except asyncio.TimeoutError:
+            lagging = [s.name for s in self._subscriptions if s.get_stats()["pending"]]
+            self.logger.warning(f"Timed out draining hooks: {', '.join(lagging)}")
+            return False
+
+    def get_lagging(self) -> List[str]:
+        """遅れている購読者の名前を取得する"""
+        return [subscription.name for subscription in self._subscriptions if subscription.lagging]
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        return [subscription.get_stats() for subscription in self._subscriptions]
@@ -0,0 +1,138 @@
+"""
+Health Probes - 一定コストのチェックによる生存確認（liveness）と準備完了確認（readiness）
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import Settings
+from utils.file_utils import format_timestamp
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from core.client_manager import ClientManager
+
+
+class HealthProbes:
+    """生存確認と準備完了確認を提供するクラス
+
+    liveness は外部サービスに接続せず、プロセスとイベントループが応答するかだけを確認する。
+    readiness はモデルのデプロイメントへの1トークンの呼び出しとCosmosDBのデータベース・
+    コンテナのメタデータ読み取りを、それぞれ期限付きで並行に実行する（データ量に依存しない）。
+    readiness の結果は cache_ttl 秒キャッシュし、期限切れ後の呼び出しではキャッシュを返しつつ
+    バックグラウンドで更新する。CosmosDBは任意の連携のため、失敗しても準備完了とみなす。
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        client_manager: Optional["ClientManager"] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        self.settings = settings
+        self.client_manager = client_manager
+        self.cache_ttl = settings.health_cache_ttl if cache_ttl is None else cache_ttl
+        self.timeout = settings.health_check_timeout if timeout is None else timeout
+        self.logger = get_logger(__name__)
+        self.started_at = time.time()
+        self._cosmos_client = None
+        self._readiness: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def liveness(self) -> Dict[str, Any]:
+        """外部サービスに接続せずに、プロセスとイベントループが応答するかを確認する"""
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        return {
+            "alive": True,
+            "uptime": time.time() - self.started_at,
+            "event_loop_lag_ms": (time.perf_counter() - start) * 1000,
+            "checked_at": format_timestamp()
+        }
+
+    async def readiness(self, force: bool = False) -> Dict[str, Any]:
+        """準備完了確認の結果を返す（キャッシュが有効ならチェックを実行しない）"""
+        if self._readiness is None or force:
+            return await self.refresh()
+
+        if time.monotonic() - self._checked_at >= self.cache_ttl:
+            # 期限切れのキャッシュを返しつつバックグラウンドで更新する
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self.refresh())
+        return self._with_age(self._readiness)
+
+    async def refresh(self) -> Dict[str, Any]:
+        """全てのチェックを並行に実行し、キャッシュを更新する"""
+        checks = {
+            "model": (self._check_model, True),
+            "cosmosdb": (self._check_cosmosdb, False)
+        }
+        names = list(checks)
+        results = await asyncio.gather(*(self._run_check(checks[name][0]) for name in names))
+
+        check_results = {}
+        for name, result in zip(names, results):
+            result["required"] = checks[name][1]
+            check_results[name] = result
+            if not result["ok"]:
+                self.logger.warning(f"Readiness check '{name}' failed: {result['error']}")
+
+        self._readiness = {
+            "ready": all(result["ok"] for result in check_results.values() if result["required"]),
+            "checks": check_results,
+            "checked_at": format_timestamp()
+        }
+        self._checked_at = time.monotonic()
+        return self._with_age(self._readiness)
+
+    def _with_age(self, readiness: Dict[str, Any]) -> Dict[str, Any]:
+        return {**readiness, "age": time.monotonic() - self._checked_at}
+
+    async def _run_check(self, check: Callable[[], Awaitable[Optional[str]]]) -> Dict[str, Any]:
+        """チェックを期限付きで実行する（チェックはスキップ理由または None を返す）"""
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"ok": True, "skipped": None, "error": None}
+        try:
+            result["skipped"] = await asyncio.wait_for(check(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            result.update(ok=False, error=f"Timed out after {self.timeout}s")
+        except Exception as e:
+            result.update(ok=False, error=str(e))
+        result["latency_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    async def _check_model(self) -> Optional[str]:
+        """デプロイメントに1トークンの呼び出しを行う"""
+        if self.settings.model_client_mode == "replay":
+            return "replay mode"
+        if self.client_manager is None:
+            from core.client_manager import ClientManager
+            self.client_manager = ClientManager(self.settings)
+        await self.client_manager.ping()
+        return None
+
+    async def _check_cosmosdb(self) -> Optional[str]:
+        """データベースとコンテナのメタデータを読み取る"""
+        if not self.settings.cosmosdb_enabled:
+            return "disabled"
+
+        cosmos_settings = self.settings.get_cosmosdb_settings()
+        if self._cosmos_client is None:
+            from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+            self._cosmos_client = AsyncCosmosClient(cosmos_settings['endpoint'], cosmos_settings['key'])
+
+        database = self._cosmos_client.get_database_client(cosmos_settings['database_name'])
+        await database.read()
+        await database.get_container_client(cosmos_settings['container_name']).read()
+        return None
+
+    async def close(self) -> None:
+        """バックグラウンドの更新を止め、CosmosDBクライアントを閉じる"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._cosmos_client is not None:
+            await self._cosmos_client.close()
+            self._cosmos_client = None
@@ -0,0 +1,201 @@
+"""
+Job Queue - SQLiteベースの永続ジョブキュー
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from utils.logging import get_logger
+
+
+# ジョブの状態
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, id);
+"""
+
+
+class JobQueue:
+    """優先度・リース・リトライ付きのローカルジョブキュー
+
+    キューファイルを共有すれば複数プロセス・複数ホストのワーカーから利用できる。
+    ネットワーク共有上に置く場合はWALが使えないため journal_mode="DELETE" を指定する。
+    """
+
+    def __init__(self, path: str, journal_mode: str = "WAL", busy_timeout: float = 30.0):
+        self.path = path
+        self.journal_mode = journal_mode
+        self.busy_timeout = busy_timeout
+        self.logger = get_logger(__name__)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """呼び出しごとに接続を開く（スレッド・プロセス間で安全に使うため）"""
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """書き込みロックを取得したトランザクションを開始する"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, task: str, priority: int = 0, max_attempts: int = 3) -> int:
+        """ジョブを投入し、ジョブIDを返す"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (task, priority, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task, priority, JOB_QUEUED, max_attempts, now, now, now)
+            )
+            job_id = cursor.lastrowid
+
+        self.logger.info(f"Job enqueued: {job_id} (priority={priority})")
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """実行可能なジョブを1件取得してリースする"""
+        now = time.time()
+        with self._transaction() as conn:
+            # リース切れ（ワーカーのクラッシュ等）で再試行回数を使い切ったジョブは失敗にする
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, last_error = ?, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (JOB_FAILED, "Lease expired", now, JOB_RUNNING, now)
+            )
+
+            row = conn.execute(
+                "SELECT * FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (JOB_QUEUED, now, JOB_RUNNING, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, worker_id, now + lease_seconds, now, row["id"])
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+
+        return self._row_to_dict(job)
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """リースを延長する。他のワーカーにリースが移っていた場合はFalseを返す"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, JOB_RUNNING, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """ジョブを完了状態にする"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "result = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (JOB_COMPLETED, json.dumps(result or {}, ensure_ascii=False, default=str),
+                 now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_delay: float = 0.0) -> bool:
+        """ジョブを失敗させる。再試行回数が残っていれば retry_delay 秒後に再投入する"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            status = JOB_QUEUED if row["attempts"] < row["max_attempts"] else JOB_FAILED
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "available_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, now + retry_delay, error, now, job_id)
+            )
+
+        self.logger.info(f"Job {job_id} failed ({status}): {error}")
+        return True
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """ジョブを取得する"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """ジョブ一覧を新しい順に取得する"""
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get_stats(self) -> Dict[str, int]:
+        """状態別のジョブ数を取得する"""
+        stats = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_COMPLETED: 0, JOB_FAILED: 0}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"):
+                stats[row["status"]] = row["count"]
+        return stats
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """行を辞書に変換する"""
+        job = dict(row)
+        if job.get("result"):
+            job["result"] = json.loads(job["result"])
+        return job
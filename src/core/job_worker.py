@@ -0,0 +1,183 @@
+"""
+Job Worker - ジョブキューからセッションを取得して実行するワーカー
+"""
+
+import asyncio
+import os
+import random
+import socket
+from typing import Dict, Any, Optional, Set
+
+from config.settings import Settings
+from core.client_manager import ClientManager
+from core.cosmosdb_manager import CosmosDBManager
+from core.job_queue import JobQueue
+from core.session_manager import SessionManager
+from core.team_pool import TeamPool
+from utils.logging import get_logger
+
+
+class JobWorker:
+    """ジョブキューのジョブを同時実行数を制限して処理するワーカー"""
+
+    def __init__(
+        self,
+        settings: Settings,
+        queue: Optional[JobQueue] = None,
+        concurrency: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0
+    ):
+        self.settings = settings
+        self.logger = get_logger(__name__)
+        self.queue = queue or JobQueue(settings.job_queue_path)
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = settings.job_lease_seconds
+        # リースの1/3ごとに延長し、1回失敗しても期限切れになる前に再試行できるようにする
+        self.heartbeat_interval = max(self.lease_seconds / 3, 1.0)
+        self.poll_interval = poll_interval
+        # モデルクライアントはワーカー内の全ジョブで共有する
+        self.client_manager = ClientManager(settings)
+        # エージェントとチームはジョブごとに作り直さず、リセットして再利用する
+        self.team_pool = TeamPool(settings, self.client_manager, max_size=settings.team_pool_size)
+
+        self._stop_event = asyncio.Event()
+        self._running: Set[asyncio.Task] = set()
+        self.processed_count = 0
+
+    def stop(self) -> None:
+        """新規ジョブの取得を停止する（実行中のジョブは完了まで待つ）"""
+        self.logger.info(f"Worker {self.worker_id} stopping")
+        self._stop_event.set()
+
+    async def run(self, drain: bool = False) -> int:
+        """ワーカーを起動する。drain=Trueの場合はキューが空になった時点で終了する"""
+        self.logger.info(f"Worker {self.worker_id} started (concurrency={self.concurrency})")
+        cosmos_client = CosmosDBManager.create_shared_client(self.settings.get_cosmosdb_settings())
+        self.team_pool.prewarm(self.concurrency)
+        # 1つのSessionManagerで全ジョブを並行実行する（実行ごとの状態はSessionContextに分離される）
+        session_manager = SessionManager(
+            self.settings,
+            client_manager=self.client_manager,
+            cosmos_client=cosmos_client,
+            team_pool=self.team_pool
+        )
+        session_manager.console_output = False
+
+        try:
+            while not self._stop_event.is_set():
+                if len(self._running) >= self.concurrency:
+                    await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease_seconds)
+                if job is None:
+                    if drain and not self._running:
+                        break
+                    await self._sleep(self.poll_interval)
+                    continue
+
+                task = asyncio.create_task(self._execute_job(job, session_manager))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            # 実行中のジョブの完了を待つ
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+        finally:
+            if cosmos_client is not None:
+                await cosmos_client.close()
+
+        self.logger.info(f"Worker {self.worker_id} stopped after {self.processed_count} jobs")
+        return self.processed_count
+
+    async def _sleep(self, seconds: float) -> None:
+        """停止要求があれば即座に戻るスリープ"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _execute_job(self, job: Dict[str, Any], session_manager: SessionManager) -> None:
+        """1件のジョブを実行する（前回の試行がクラッシュして残したチェックポイントがあれば再開する）"""
+        job_id = job["id"]
+        self.logger.info(f"Job {job_id} started (attempt {job['attempts']}/{job['max_attempts']})")
+
+        resume_id = await self._find_checkpoint(job, session_manager)
+        if resume_id is not None:
+            self.logger.info(f"Job {job_id} resuming from checkpoint {resume_id}")
+            context = session_manager.new_context(resume_id)
+            session = session_manager.resume_session(resume_id, context=context)
+        else:
+            context = session_manager.new_context(self._session_id(job_id, job["attempts"]))
+            session = session_manager.run_session(job["task"], context=context)
+        session_task = asyncio.create_task(session)
+        heartbeat_task = asyncio.create_task(self._heartbeat(job_id, session_task))
+
+        try:
+            filename = await session_task
+            stats = session_manager.get_session_stats(context)
+            await asyncio.to_thread(self.queue.complete, job_id, self.worker_id, {
+                "context_file": filename,
+                "total_messages": stats.get("total_messages", 0),
+                "execution_time": stats.get("execution_time", 0.0)
+            })
+            self.processed_count += 1
+            self.logger.info(f"Job {job_id} completed")
+        except asyncio.CancelledError:
+            # ハートビートがセッションを止めた場合（リース喪失）以外のキャンセルは呼び出し元に伝える
+            if not self._lease_lost(heartbeat_task):
+                raise
+            # リースを失った場合は他のワーカーが再実行するため結果を書き込まない
+            self.logger.warning(f"Job {job_id} cancelled: lease lost")
+        except Exception as e:
+            await asyncio.to_thread(
+                self.queue.fail, job_id, self.worker_id, str(e), self._retry_delay(job["attempts"])
+            )
+            self.processed_count += 1
+        finally:
+            heartbeat_task.cancel()
+            # 例外で失敗した試行の再試行は最初から実行するため、チェックポイントは残さない
+            # （プロセスごと停止した場合はここに到達せず、次の試行がチェックポイントから再開する）
+            await context.checkpoint_manager.delete(context.session_id)
+
+    @staticmethod
+    def _session_id(job_id: int, attempt: int) -> str:
+        """試行ごとのセッションID（次の試行が前回のチェックポイントを探せるよう、ジョブIDと試行回数から決める）"""
+        return f"job_{job_id}_attempt_{attempt}"
+
+    async def _find_checkpoint(self, job: Dict[str, Any], session_manager: SessionManager) -> Optional[str]:
+        """前回までの試行が残したチェックポイントのセッションIDを新しい試行から順に探す（このワーカーのディスクのみ）"""
+        for attempt in range(job["attempts"] - 1, 0, -1):
+            session_id = self._session_id(job["id"], attempt)
+            if await session_manager.checkpoint_manager.load(session_id) is not None:
+                return session_id
+        return None
+
+    async def _heartbeat(self, job_id: int, session_task: asyncio.Task) -> bool:
+        """リースを定期的に延長し、失った場合はセッションをキャンセルして True を返す
+
+        延長に失敗した場合（データベースのロックなど）は記録して次の間隔で再試行する。
+        """
+        while not session_task.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                renewed = await asyncio.to_thread(self.queue.heartbeat, job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                self.logger.warning(f"Heartbeat for job {job_id} failed, retrying: {e}")
+                continue
+            if not renewed:
+                session_task.cancel()
+                return True
+        return False
+
+    @staticmethod
+    def _lease_lost(heartbeat_task: asyncio.Task) -> bool:
+        """ハートビートがリースを失ってセッションをキャンセルしたか"""
+        return heartbeat_task.done() and not heartbeat_task.cancelled() and heartbeat_task.result()
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        """再試行までの待機時間（ジッター付き指数バックオフ）"""
+        return min(300.0, 5.0 * (2 ** (attempts - 1))) * random.uniform(0.5, 1.0)
@@ -0,0 +1,180 @@
+"""
+Orchestrated Team - 専門家エージェントを並列に発言させるラウンド制チーム
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Sequence
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Response, TaskResult, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, MessageFactory, TextMessage
+from autogen_core import CancellationToken
+
+from utils.logging import get_logger
+
+
+STEP_EXPERTS = "experts"
+STEP_REFLECTION = "reflection"
+
+
+class OrchestratedTeam:
+    """各ラウンドで専門家エージェントを同じ会話履歴に対して並列に発言させるチーム
+
+    専門家の応答はエージェントの並び順で会話に追加し、ラウンドの間に reflection_agent を発言させる。
+    1ラウンドの所要時間はおおよそLLM呼び出し1回分になり、発言者の選択にLLMを使わない。
+    SessionManager からは SelectorGroupChat と同じく run_stream / save_state / load_state / reset で扱う。
+    並列に生成するため、トークン単位のストリーミングチャンクは出力しない。
+    """
+
+    def __init__(
+        self,
+        experts: Sequence[AssistantAgent],
+        reflection_agent: Optional[AssistantAgent] = None,
+        termination_condition: Optional[TerminationCondition] = None
+    ):
+        if not experts:
+            raise ValueError("At least one expert agent is required")
+        self.experts = list(experts)
+        self.reflection_agent = reflection_agent
+        self.termination_condition = termination_condition
+        self.logger = get_logger(__name__)
+
+        self._agents: Dict[str, AssistantAgent] = {agent.name: agent for agent in self.experts}
+        if reflection_agent is not None:
+            self._agents[reflection_agent.name] = reflection_agent
+
+        self._message_factory = MessageFactory()
+        self._message_thread: List[BaseChatMessage] = []
+        self._delivered: Dict[str, int] = {name: 0 for name in self._agents}
+        self._next_step = STEP_EXPERTS
+        self._round = 0
+
+    def _unseen_messages(self, agent_name: str) -> List[BaseChatMessage]:
+        """エージェントにまだ渡していないメッセージ（自分の発言を除く）を返し、渡したことを記録する"""
+        messages = [
+            message for message in self._message_thread[self._delivered[agent_name]:]
+            if message.source != agent_name
+        ]
+        self._delivered[agent_name] = len(self._message_thread)
+        return messages
+
+    async def _ask(self, agent: AssistantAgent, cancellation_token: CancellationToken) -> Response:
+        return await agent.on_messages(self._unseen_messages(agent.name), cancellation_token)
+
+    async def _ask_all(self, agents: Sequence[AssistantAgent], cancellation_token: CancellationToken) -> List[Response]:
+        """エージェントを並列に実行する
+
+        いずれかが失敗（またはキャンセル）した場合は残りの呼び出しをキャンセルし、
+        エージェントの状態と受け渡し位置をステップ開始前に戻してから例外を送出する。
+        そのため再試行や再開の際に、まだ応答していないメッセージが失われたり重複したりしない。
+        """
+        delivered = dict(self._delivered)
+        agent_states = [await agent.save_state() for agent in agents]
+        tasks = [asyncio.ensure_future(self._ask(agent, cancellation_token)) for agent in agents]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for agent, state in zip(agents, agent_states):
+                await agent.load_state(state)
+            self._delivered = delivered
+            raise
+
+    async def _run_step(self, cancellation_token: CancellationToken) -> List[BaseAgentEvent | BaseChatMessage]:
+        """次のステップ（専門家の並列ラウンドまたは振り返り）を実行し、出力するメッセージを返す"""
+        if self._next_step == STEP_EXPERTS:
+            # 全員に同じ履歴を渡してから並列に実行する
+            responses = await self._ask_all(self.experts, cancellation_token)
+            self._round += 1
+            self._next_step = STEP_REFLECTION if self.reflection_agent is not None else STEP_EXPERTS
+        else:
+            responses = await self._ask_all([self.reflection_agent], cancellation_token)
+            self._next_step = STEP_EXPERTS
+
+        output: List[BaseAgentEvent | BaseChatMessage] = []
+        for response in responses:
+            output.extend(response.inner_messages or [])
+            output.append(response.chat_message)
+            self._message_thread.append(response.chat_message)
+        return output
+
+    async def _check_termination(self, message: BaseAgentEvent | BaseChatMessage) -> Optional[str]:
+        if self.termination_condition is None:
+            return None
+        stop_message = await self.termination_condition([message])
+        return stop_message.content if stop_message is not None else None
+
+    async def run_stream(
+        self,
+        task: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None
+    ) -> AsyncGenerator[BaseAgentEvent | BaseChatMessage | TaskResult, None]:
+        """ラウンドを繰り返し、メッセージを順に出力して最後に TaskResult を出力する
+
+        task を省略すると、load_state で復元した会話の続きから再開する。
+        """
+        cancellation_token = cancellation_token or CancellationToken()
+        output_messages: List[BaseAgentEvent | BaseChatMessage] = []
+        stop_reason: Optional[str] = None
+
+        if task is not None:
+            task_message = TextMessage(source="user", content=task)
+            self._message_thread.append(task_message)
+            output_messages.append(task_message)
+            yield task_message
+            stop_reason = await self._check_termination(task_message)
+
+        while stop_reason is None:
+            for message in await self._run_step(cancellation_token):
+                output_messages.append(message)
+                yield message
+                if isinstance(message, BaseChatMessage):
+                    stop_reason = await self._check_termination(message)
+                    if stop_reason is not None:
+                        # 同じラウンドの残りの応答は出力しない
+                        break
+
+        if self.termination_condition is not None:
+            await self.termination_condition.reset()
+        self.logger.info(f"Orchestrated team stopped after {self._round} rounds: {stop_reason}")
+        yield TaskResult(messages=output_messages, stop_reason=stop_reason)
+
+    async def run(self, task: Optional[str] = None, cancellation_token: Optional[CancellationToken] = None) -> TaskResult:
+        result = None
+        async for message in self.run_stream(task=task, cancellation_token=cancellation_token):
+            if isinstance(message, TaskResult):
+                result = message
+        return result
+
+    async def reset(self) -> None:
+        for agent in self._agents.values():
+            await agent.on_reset(CancellationToken())
+        self._message_thread = []
+        self._delivered = {name: 0 for name in self._agents}
+        self._next_step = STEP_EXPERTS
+        self._round = 0
+        if self.termination_condition is not None:
+            await self.termination_condition.reset()
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return {
+            "type": "OrchestratedTeamState",
+            "agent_states": {name: await agent.save_state() for name, agent in self._agents.items()},
+            "message_thread": [message.dump() for message in self._message_thread],
+            "delivered": dict(self._delivered),
+            "next_step": self._next_step,
+            "round": self._round
+        }
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        if state.get("type") != "OrchestratedTeamState":
+            raise ValueError("State was not saved by OrchestratedTeam (team_mode mismatch?)")
+        for name, agent_state in state["agent_states"].items():
+            if name in self._agents:
+                await self._agents[name].load_state(agent_state)
+        self._message_thread = [self._message_factory.create(message) for message in state["message_thread"]]
+        self._delivered = {name: state["delivered"].get(name, 0) for name in self._agents}
+        self._next_step = state["next_step"]
+        self._round = state["round"]
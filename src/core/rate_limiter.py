@@ -0,0 +1,303 @@
+"""
+Rate Limiter - Azure OpenAIデプロイメントのRPM/TPMに合わせたトークンバケット
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from core.client_wrappers import ChatCompletionClientWrapper
+from utils.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# これ以上待った呼び出しを統計上「待った」として数える（秒）
+WAIT_REPORT_THRESHOLD = 0.05
+
+
+class TokenBucketRateLimiter:
+    """リクエスト数（RPM）とトークン数（TPM）の2つのバケットで呼び出しを制限するクラス
+
+    バケットは1分で満杯になる速度で補充される。呼び出し元は受付順（FIFO）に並び、
+    先頭の呼び出しだけが容量の空きを待つため、大きなリクエストが後続に追い越されることはない。
+    順番が来た呼び出しは、待っているイベントループ上のイベントで起こす。
+    state_path を指定するとバケットの状態をファイルに置き、fcntlのファイルロックで
+    複数プロセス間で共有する（プロセス間の順番は保証しない）。ロック待ちとファイルの
+    読み書きはイベントループを止めないよう別スレッドで行う。
+    イベントループをまたいで共有できるよう、状態はスレッドロックで保護する。
+    """
+
+    def __init__(self, rpm: int, tpm: int, state_path: Optional[str] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.logger = get_logger(__name__)
+
+        if state_path and fcntl is None:
+            self.logger.warning("fcntl is not available; rate limiting is limited to this process")
+            state_path = None
+        self.state_path = state_path
+
+        self._lock = threading.Lock()
+        self._state = {"requests": float(rpm), "tokens": float(tpm), "updated_at": time.time()}
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned = set()
+        # 順番待ちの呼び出し（チケット → 待っているループとイベント）
+        self._waiters: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        if self.state_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+
+    @contextmanager
+    def _shared_state(self):
+        """バケットの状態を読み込み、ブロックを抜けたら書き戻す"""
+        if not self.state_path:
+            yield self._state
+            return
+
+        with open(self.state_path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content.strip() else dict(self._state)
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _try_take(self, tokens: int) -> float:
+        """容量があれば差し引いて0を、なければ必要な待ち時間（秒）を返す
+
+        プロセス内では先頭の呼び出しだけが呼ぶため、スレッドロックは取らない
+        （ファイルロックを待つ間に他のループがチケットを取れるようにする）。
+        """
+        # バケット容量を超えるリクエストは満杯になるまで待てば通す
+        tokens = min(tokens, self.tpm)
+        with self._shared_state() as state:
+            now = time.time()
+            elapsed = max(0.0, now - state["updated_at"])
+            state["requests"] = min(self.rpm, state["requests"] + elapsed * self.rpm / 60.0)
+            state["tokens"] = min(self.tpm, state["tokens"] + elapsed * self.tpm / 60.0)
+            state["updated_at"] = now
+
+            if state["requests"] >= 1 and state["tokens"] >= tokens:
+                state["requests"] -= 1
+                state["tokens"] -= tokens
+                return 0.0
+
+            request_wait = max(0.0, 1 - state["requests"]) * 60.0 / self.rpm
+            token_wait = max(0.0, tokens - state["tokens"]) * 60.0 / self.tpm
+            return max(request_wait, token_wait)
+
+    def _take_ticket(self) -> int:
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            return ticket
+
+    async def _wait_for_turn(self, ticket: int) -> None:
+        """自分の順番が来るまで待つ"""
+        with self._lock:
+            if self._serving == ticket:
+                return
+            event = asyncio.Event()
+            self._waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            await event.wait()
+        finally:
+            with self._lock:
+                self._waiters.pop(ticket, None)
+
+    def _release_ticket(self, ticket: int) -> None:
+        """順番を次の呼び出しに進める（キャンセル済みの順番は飛ばす）"""
+        with self._lock:
+            if self._serving != ticket:
+                self._abandoned.add(ticket)
+                return
+            self._serving += 1
+            while self._serving in self._abandoned:
+                self._abandoned.remove(self._serving)
+                self._serving += 1
+            waiter = self._waiters.get(self._serving)
+
+        if waiter is not None:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 待っていたループが閉じられた場合、その呼び出しはキャンセル時に順番を手放す
+                pass
+
+    async def acquire(self, tokens: int) -> float:
+        """リクエスト1件と推定トークン数分の容量を確保し、待った時間を返す"""
+        start = time.perf_counter()
+        ticket = self._take_ticket()
+        try:
+            await self._wait_for_turn(ticket)
+
+            while True:
+                if self.state_path:
+                    wait = await asyncio.to_thread(self._try_take, tokens)
+                else:
+                    wait = self._try_take(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            self._release_ticket(ticket)
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.acquired += 1
+            if waited >= WAIT_REPORT_THRESHOLD:
+                self.waited += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def get_stats(self) -> Dict[str, Any]:
+        """待ち時間などの統計を取得する"""
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+                "queued": self._next_ticket - self._serving - len(self._abandoned)
+            }
+
+
+_registry: Dict[Tuple[str, str], TokenBucketRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    endpoint: str,
+    deployment: str,
+    rpm: int,
+    tpm: int,
+    state_directory: Optional[str] = None
+) -> TokenBucketRateLimiter:
+    """エンドポイントとデプロイメントごとにプロセス内で共有するリミッターを取得する"""
+    key = (endpoint, deployment)
+    with _registry_lock:
+        limiter = _registry.get(key)
+        if limiter is None:
+            state_path = None
+            if state_directory:
+                digest = hashlib.sha256(f"{endpoint}|{deployment}".encode("utf-8")).hexdigest()[:16]
+                state_path = os.path.join(state_directory, f"ratelimit_{digest}.json")
+            limiter = TokenBucketRateLimiter(rpm, tpm, state_path=state_path)
+            _registry[key] = limiter
+        return limiter
+
+
+def estimate_request_tokens(
+    client: ChatCompletionClient,
+    messages: Sequence[LLMMessage],
+    tools: Sequence[Tool | ToolSchema],
+    max_tokens: int
+) -> int:
+    """リクエストがTPMから消費するトークン数を推定する
+
+    Azure OpenAIはリクエスト時点の推定トークン数（プロンプト + max_tokens）で
+    TPMを消費するため、同じ方法で推定する。
+    """
+    try:
+        prompt_tokens = client.count_tokens(messages, tools=tools)
+    except Exception:
+        # トークナイザーがモデルに対応していない場合は文字数から概算する
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 2
+    return prompt_tokens + max_tokens
+
+
+class RateLimitedChatCompletionClient(ChatCompletionClientWrapper):
+    """呼び出し前にリミッターから容量を確保するクライアント
+
+    再試行を行うクライアントと組み合わせる場合は、再試行ごとに容量を確保するよう
+    ResilientChatCompletionClient にリミッターを渡す。
+    """
+
+    def __init__(
+        self,
+        inner: ChatCompletionClient,
+        limiter: TokenBucketRateLimiter,
+        model_name: str,
+        max_tokens: int
+    ):
+        super().__init__(inner, model_name)
+        self.limiter = limiter
+        self.max_tokens = max_tokens
+
+    def _estimate_tokens(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> int:
+        """リクエストのトークン数を推定する"""
+        return estimate_request_tokens(self.inner, messages, tools, self.max_tokens)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        await self.limiter.acquire(self._estimate_tokens(messages, tools))
+        return await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        await self.limiter.acquire(self._estimate_tokens(messages, tools))
+        async for chunk in self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"rate_limit": self.limiter.get_stats()}
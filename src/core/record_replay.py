@@ -0,0 +1,300 @@
+"""
+Record Replay - モデル呼び出しの記録と再生（オフライン・決定的なベンチマーク用）
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from core.client_wrappers import ChatCompletionClientWrapper, request_key
+from utils.logging import get_logger
+
+
+# 再生時の残りトークン計算に用いるコンテキスト長
+REPLAY_CONTEXT_TOKENS = 128000
+
+
+class ModelFixture:
+    """記録したモデル呼び出しを保持するJSONLフィクスチャファイル
+
+    1行が1回の呼び出し（クライアント名・リクエストキー・応答・レイテンシ）に対応する。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """呼び出しを1件追記する"""
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def load(self, client_name: str) -> List[Dict[str, Any]]:
+        """指定クライアントの記録を記録順に読み込む"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Model fixture not found: {self.path}")
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("client") == client_name:
+                    records.append(record)
+        return records
+
+
+class RecordingChatCompletionClient(ChatCompletionClientWrapper):
+    """実際のモデル呼び出しを通過させながらフィクスチャに記録するクライアント"""
+
+    def __init__(
+        self,
+        inner: ChatCompletionClient,
+        fixture: ModelFixture,
+        client_name: str,
+        model_name: str,
+        client_params: Optional[Mapping[str, Any]] = None
+    ):
+        super().__init__(inner, model_name)
+        self.fixture = fixture
+        self.client_name = client_name
+        self.client_params = dict(client_params or {})
+        self.recorded = 0
+
+    def _record(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool | type[BaseModel]],
+        extra_create_args: Mapping[str, Any],
+        result: CreateResult,
+        latency: float
+    ) -> None:
+        """1回の呼び出しを記録する"""
+        params = dict(self.client_params)
+        params.update(extra_create_args)
+        self.fixture.append({
+            "client": self.client_name,
+            "model": self.model_name,
+            "key": request_key(self.model_name, messages, tools, json_output, params),
+            "model_info": dict(self.inner.model_info),
+            "result": result.model_dump(mode="json"),
+            "latency": latency
+        })
+        self.recorded += 1
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        start_time = time.perf_counter()
+        result = await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        self._record(messages, tools, json_output, extra_create_args, result, time.perf_counter() - start_time)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        start_time = time.perf_counter()
+        async for chunk in self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._record(
+                    messages, tools, json_output, extra_create_args, chunk, time.perf_counter() - start_time
+                )
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"recorded_calls": self.recorded}
+
+
+class ReplayModelClient(ChatCompletionClient):
+    """フィクスチャに記録された応答を再生するクライアント（ネットワーク不要）
+
+    リクエストキーが一致する記録を優先して返し、見つからない場合は
+    strict=False であれば記録順に次の応答を返す。
+    レイテンシは記録値に latency_scale を掛けた値、または fixed_latency 秒を再現する。
+    """
+
+    def __init__(
+        self,
+        fixture: ModelFixture,
+        client_name: str,
+        model_name: str,
+        client_params: Optional[Mapping[str, Any]] = None,
+        latency_scale: float = 1.0,
+        fixed_latency: Optional[float] = None,
+        strict: bool = False
+    ):
+        self.client_name = client_name
+        self.client_params = dict(client_params or {})
+        self.latency_scale = latency_scale
+        self.fixed_latency = fixed_latency
+        self.strict = strict
+        self.logger = get_logger(__name__)
+
+        records = fixture.load(client_name)
+        if not records:
+            raise ValueError(f"No recorded calls for client '{client_name}' in {fixture.path}")
+
+        # モデル名が未設定の場合は記録時のモデル名を使う（リクエストキーを一致させるため）
+        self.model_name = model_name or records[0].get("model", "")
+        self._model_info: ModelInfo = records[0]["model_info"]
+        self._sequence: Deque[Dict[str, Any]] = deque(records)
+        self._by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        for record in records:
+            self._by_key[record["key"]].append(record)
+
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._actual_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self.replayed = 0
+        self.key_misses = 0
+
+    def _next_record(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool | type[BaseModel]],
+        extra_create_args: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        """リクエストに対応する記録を取り出す"""
+        params = dict(self.client_params)
+        params.update(extra_create_args)
+        key = request_key(self.model_name, messages, tools, json_output, params)
+
+        candidates = self._by_key.get(key)
+        if candidates:
+            record = candidates.popleft()
+            self._sequence.remove(record)
+            return record
+
+        self.key_misses += 1
+        if self.strict or not self._sequence:
+            raise LookupError(f"No recorded response for {self.client_name} request {key[:12]}")
+
+        record = self._sequence.popleft()
+        self._by_key[record["key"]].remove(record)
+        self.logger.debug(f"Replay key miss for {self.client_name}, falling back to recorded order")
+        return record
+
+    async def _simulate_latency(self, record: Dict[str, Any]) -> None:
+        """記録時のレイテンシを再現する"""
+        delay = self.fixed_latency if self.fixed_latency is not None else record.get("latency", 0.0) * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _to_result(self, record: Dict[str, Any]) -> CreateResult:
+        """記録から応答を作成し、使用量を集計する"""
+        result = CreateResult.model_validate(record["result"])
+        self._total_usage = RequestUsage(
+            prompt_tokens=self._total_usage.prompt_tokens + result.usage.prompt_tokens,
+            completion_tokens=self._total_usage.completion_tokens + result.usage.completion_tokens,
+        )
+        self._actual_usage = self._total_usage
+        self.replayed += 1
+        return result
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        record = self._next_record(messages, tools, json_output, extra_create_args)
+        await self._simulate_latency(record)
+        return self._to_result(record)
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        record = self._next_record(messages, tools, json_output, extra_create_args)
+        await self._simulate_latency(record)
+        result = self._to_result(record)
+        if isinstance(result.content, str):
+            yield result.content
+        yield result
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._actual_usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._total_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        # オフラインのため文字数から概算する
+        return sum(len(str(message.content)) for message in messages) // 2
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return max(0, REPLAY_CONTEXT_TOKENS - self.count_tokens(messages, tools=tools))
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self._model_info  # type: ignore
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._model_info
+
+    def get_stats(self) -> Dict[str, Any]:
+        """再生統計を取得する"""
+        return {"replayed_calls": self.replayed, "key_misses": self.key_misses}
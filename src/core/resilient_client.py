@@ -0,0 +1,341 @@
+"""
+Resilient Client - タイムアウト・リトライ・サーキットブレーカー付きモデルクライアント
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import openai
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from core.client_wrappers import ChatCompletionClientWrapper
+from core.rate_limiter import TokenBucketRateLimiter, estimate_request_tokens
+from utils.logging import get_logger
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# 再試行で回復が見込めるエラー（接続エラー・タイムアウト・429・5xx）
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """サーキットブレーカーが開いているため呼び出しを行わなかったことを示す例外"""
+
+
+class CircuitBreaker:
+    """連続した失敗が閾値に達したら一定時間呼び出しを即時失敗させるサーキットブレーカー
+
+    開いてから reset_timeout 秒経過すると半開状態になり、1件だけ試行を通す。
+    成功すれば閉じ、失敗すれば再び開く。
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = CIRCUIT_HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """呼び出しを許可するか判定し、許可しない場合は CircuitOpenError を送出する"""
+        with self._lock:
+            state = self._current_state()
+            if state == CIRCUIT_OPEN:
+                raise CircuitOpenError("Circuit breaker is open; model endpoint is unhealthy")
+            if state == CIRCUIT_HALF_OPEN:
+                # 試行がキャンセルされて結果が記録されない場合に備え、一定時間で次の試行を許可する
+                if self._trial_in_flight and time.monotonic() - self._trial_started_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit breaker is half-open; waiting for trial call")
+                self._trial_in_flight = True
+                self._trial_started_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CIRCUIT_CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == CIRCUIT_HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if state != CIRCUIT_OPEN:
+                    self.opened += 1
+                self._state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._consecutive_failures,
+                "opened": self.opened
+            }
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(
+    endpoint: str,
+    deployment: str,
+    failure_threshold: int,
+    reset_timeout: float
+) -> CircuitBreaker:
+    """エンドポイントとデプロイメントごとにプロセス内で共有するサーキットブレーカーを取得する"""
+    key = (endpoint, deployment)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(failure_threshold, reset_timeout)
+            _breakers[key] = breaker
+        return breaker
+
+
+class CallStats:
+    """1セッション分のモデル呼び出しの件数（呼び出し・再試行・タイムアウト・失敗）をモデル別に集計するクラス
+
+    クライアントはプロセス内の全セッションで共有するため、クライアント自体の件数は累計になる。
+    セッション別の件数は current_call_stats に設定したこのオブジェクトに記録する。
+    """
+
+    FIELDS = ("calls", "retries", "timeouts", "failures", "short_circuited")
+
+    def __init__(self):
+        self._models: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model_name: str, field: str) -> None:
+        counts = self._models.setdefault(model_name, {name: 0 for name in self.FIELDS})
+        counts[field] += 1
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        return {model_name: dict(counts) for model_name, counts in self._models.items()}
+
+
+# 実行中のセッションの呼び出し件数（同一プロセスで複数セッションを並行実行しても混ざらない）
+current_call_stats: ContextVar[Optional[CallStats]] = ContextVar("current_call_stats", default=None)
+
+
+class ResilientChatCompletionClient(ChatCompletionClientWrapper):
+    """呼び出しごとの期限、ジッター付き指数バックオフによる再試行、サーキットブレーカーを適用するクライアント
+
+    ストリーミングでは最初のチャンクを受け取る前に限り再試行する。
+    limiter を渡すと、再試行を含む試行ごとにレート制限の容量を確保してから送信する
+    （容量待ちの時間は呼び出しの期限に含めない）。
+    """
+
+    def __init__(
+        self,
+        inner: ChatCompletionClient,
+        model_name: str,
+        timeout: float = 120.0,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[TokenBucketRateLimiter] = None,
+        max_tokens: int = 0
+    ):
+        super().__init__(inner, model_name)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.limiter = limiter
+        self.max_tokens = max_tokens
+        self.logger = get_logger(__name__)
+
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+    def _count(self, field: str) -> None:
+        """クライアントの累計と、実行中セッションの件数を1増やす"""
+        setattr(self, field, getattr(self, field) + 1)
+        call_stats = current_call_stats.get()
+        if call_stats is not None:
+            call_stats.record(self.model_name, field)
+
+    def _deadline(self) -> Optional[float]:
+        return self.timeout if self.timeout > 0 else None
+
+    def _before_attempt(self) -> None:
+        if self.breaker is not None:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count("short_circuited")
+                raise
+
+    async def _acquire(self, messages: Sequence[LLMMessage], tools: Sequence[Tool | ToolSchema]) -> None:
+        """レート制限の容量を確保する（試行ごとに呼ぶ）"""
+        if self.limiter is not None:
+            await self.limiter.acquire(estimate_request_tokens(self.inner, messages, tools, self.max_tokens))
+
+    def _on_success(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    async def _on_failure(self, error: BaseException, attempt: int) -> None:
+        """失敗を記録し、再試行する場合はバックオフ後に戻る（再試行しない場合は例外を再送出する）"""
+        if isinstance(error, asyncio.TimeoutError):
+            self._count("timeouts")
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+        if attempt >= self.max_retries:
+            self._count("failures")
+            raise error
+
+        # フルジッター: 0〜上限の一様乱数だけ待つ
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        self._count("retries")
+        self.logger.warning(
+            f"Model call to {self.model_name} failed ({type(error).__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        await asyncio.sleep(delay)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._before_attempt()
+            await self._acquire(messages, tools)
+            try:
+                result = await asyncio.wait_for(
+                    self.inner.create(
+                        messages,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        json_output=json_output,
+                        extra_create_args=extra_create_args,
+                        cancellation_token=cancellation_token,
+                    ),
+                    self._deadline()
+                )
+            except TRANSIENT_ERRORS as e:
+                await self._on_failure(e, attempt)
+                attempt += 1
+                continue
+            except Exception:
+                # 400などはエンドポイント自体は応答しているためブレーカーには成功として扱う
+                self._count("failures")
+                self._on_success()
+                raise
+            self._on_success()
+            return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._before_attempt()
+            await self._acquire(messages, tools)
+            stream = self.inner.create_stream(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+            started = False
+            deadline = time.monotonic() + self.timeout if self.timeout > 0 else None
+            try:
+                while True:
+                    remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield chunk
+            except TRANSIENT_ERRORS as e:
+                await stream.aclose()
+                if started:
+                    # 出力済みのチャンクは取り消せないため再試行しない
+                    self._count("failures")
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._count("timeouts")
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    raise
+                await self._on_failure(e, attempt)
+                attempt += 1
+                continue
+            except Exception:
+                self._count("failures")
+                self._on_success()
+                await stream.aclose()
+                raise
+            self._on_success()
+            return
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited
+        }
+        if self.breaker is not None:
+            stats["circuit_breaker"] = self.breaker.get_stats()
+        if self.limiter is not None:
+            return {"resilience": stats, "rate_limit": self.limiter.get_stats()}
+        return {"resilience": stats}
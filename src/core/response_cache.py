@@ -0,0 +1,222 @@
+"""
+Response Cache - モデル応答のコンテンツアドレス型キャッシュ
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from core.client_wrappers import ChatCompletionClientWrapper, request_key
+from utils.logging import get_logger
+
+
+class ResponseCache:
+    """SQLiteに応答を保存し、サイズ上限を超えたら最も古く使われたものから削除するキャッシュ"""
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.logger = get_logger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        """呼び出しごとに接続を開く"""
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[CreateResult]:
+        """キャッシュ済みの応答を取得する"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        result = CreateResult.model_validate(json.loads(row[0]))
+        self.hits += 1
+        self.saved_tokens += result.usage.prompt_tokens + result.usage.completion_tokens
+        return result
+
+    def put(self, key: str, result: CreateResult) -> None:
+        """応答を保存し、必要に応じて古いエントリを削除する"""
+        value = json.dumps(result.model_dump(mode="json"), ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self.stores += 1
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """合計サイズが上限を超えている場合、最終アクセスが古い順に削除する"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # 削除を繰り返さないよう上限の90%まで減らす
+        target = self.max_bytes * 0.9
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """キャッシュを空にする"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計を取得する"""
+        with self._connect() as conn:
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "saved_tokens": self.saved_tokens,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+
+class CachingChatCompletionClient(ChatCompletionClientWrapper):
+    """同一リクエスト（モデル・メッセージ・パラメータ）の応答をキャッシュから返すクライアント"""
+
+    def __init__(
+        self,
+        inner: ChatCompletionClient,
+        cache: ResponseCache,
+        model_name: str,
+        client_params: Optional[Mapping[str, Any]] = None
+    ):
+        super().__init__(inner, model_name)
+        self.cache = cache
+        # max_tokensなどクライアント側で固定されたパラメータもキーに含める
+        self.client_params = dict(client_params or {})
+
+    def _key(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool | type[BaseModel]],
+        extra_create_args: Mapping[str, Any]
+    ) -> str:
+        """キャッシュキーを計算する"""
+        params = dict(self.client_params)
+        params.update(extra_create_args)
+        return request_key(self.model_name, messages, tools, json_output, params)
+
+    @staticmethod
+    def _as_hit(result: CreateResult) -> CreateResult:
+        """キャッシュから返す応答として印を付ける
+
+        保存時の使用量は saved_tokens に計上済みのため、使用量の集計やトークン予算に
+        実際の消費として数えられないよう0にする。
+        """
+        result.cached = True
+        result.usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        return result
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        key = self._key(messages, tools, json_output, extra_create_args)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return self._as_hit(cached)
+
+        result = await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        await asyncio.to_thread(self.cache.put, key, result)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key = self._key(messages, tools, json_output, extra_create_args)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            cached = self._as_hit(cached)
+            if isinstance(cached.content, str):
+                yield cached.content
+            yield cached
+            return
+
+        async for chunk in self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                await asyncio.to_thread(self.cache.put, key, chunk)
+            yield chunk
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"response_cache": self.cache.get_stats()}
@@ -0,0 +1,54 @@
+"""
+Session Context - 1回のセッション実行に固有の状態
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from core.checkpoint_manager import CheckpointManager
+from core.cosmosdb_manager import CosmosDBManager
+from core.resilient_client import CallStats
+from core.usage_tracker import UsageTracker
+from utils.file_utils import TranscriptWriter
+
+
+class SessionContext:
+    """セッション1回分の状態（会話・使用量・トランスクリプト・CosmosDBのセッション文書など）
+
+    SessionManager はクライアントやチームプールなど共有のインフラだけを持ち、
+    実行ごとの状態はこのオブジェクトに置くため、1つの SessionManager で複数のセッションを並行に実行できる。
+    team_manager は実行中だけ割り当てられ、終了時のチーム情報は team_info に残す。
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        cosmosdb_manager: CosmosDBManager,
+        checkpoint_manager: CheckpointManager
+    ):
+        self.session_id = session_id
+        self.cosmosdb_manager = cosmosdb_manager
+        self.checkpoint_manager = checkpoint_manager
+        self.task: Optional[str] = None
+        self.team_manager = None
+        self.team_info: Optional[Dict[str, Any]] = None
+        self.chat_contexts: List[Dict[str, Any]] = []
+        self.usage_tracker = UsageTracker()
+        self.call_stats = CallStats()  # このセッションのモデル呼び出しの再試行・タイムアウト件数
+        self.start_time: Optional[float] = None
+        self.stop_reason: Optional[str] = None  # 終了条件が返した終了理由
+        self.transcript_writer: Optional[TranscriptWriter] = None
+        self.event_queue: Optional[asyncio.Queue] = None  # stream_session の消費者へのイベント
+        self.last_message_time: Optional[float] = None  # メッセージ間のレイテンシ計測用
+        self.streaming_source: Optional[str] = None  # コンソールに逐次表示中のエージェント
+
+    @property
+    def elapsed_time(self) -> float:
+        return time.time() - self.start_time if self.start_time is not None else 0.0
+
+    def get_team_info(self) -> Dict[str, Any]:
+        """実行中はチームの現在の情報、終了後は終了時点の情報を返す"""
+        if self.team_manager is not None:
+            return self.team_manager.get_team_info()
+        return self.team_info or {}
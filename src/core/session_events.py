@@ -0,0 +1,67 @@
+"""
+Session Events - SessionManager.stream_session が出力するイベントの型
+"""
+
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Optional, Union
+
+
+@dataclass
+class SessionStarted:
+    """セッションの開始"""
+    session_id: str
+    task: str
+    timestamp: str
+    type: str = field(default="session_started", init=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class MessageEvent:
+    """確定したエージェントのメッセージ
+
+    latency は直前のメッセージ（最初のメッセージはセッション開始）からの秒数。
+    usage はこの発言のトークン使用量（モデルが使用量を返さない場合は None）。
+    """
+    index: int
+    source: str
+    content: str
+    timestamp: str
+    latency: float
+    usage: Optional[Dict[str, Any]] = None
+    type: str = field(default="message", init=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ChunkEvent:
+    """生成途中のトークン（stream_tokens 有効時のみ）"""
+    source: str
+    content: str
+    timestamp: str
+    type: str = field(default="chunk", init=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SessionCompleted:
+    """セッションの正常終了"""
+    session_id: str
+    stop_reason: Optional[str]
+    filename: str
+    total_messages: int
+    execution_time: float
+    timestamp: str
+    type: str = field(default="session_completed", init=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+SessionEvent = Union[SessionStarted, MessageEvent, ChunkEvent, SessionCompleted]
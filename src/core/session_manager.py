@@ -3,9 +3,11 @@ Session Manager - セッション管理とメイン実行ロジック
 """
 
 import asyncio
+import os
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional, AsyncGenerator, Callable
+from typing import List, Dict, Any, Optional, AsyncGenerator, AsyncIterator, Callable, Set
 from autogen_agentchat.base import TaskResult
 
 from config.settings import Settings
@@ -13,96 +15,335 @@ from config.prompts import Prompts
 from core.client_manager import ClientManager
 from core.team_manager import TeamManager
 from core.cosmosdb_manager import CosmosDBManager
+from core.checkpoint_manager import CheckpointManager
+from core.event_bus import EventBus, BACKPRESSURE_DROP
+from core.session_events import SessionEvent, SessionStarted, MessageEvent, ChunkEvent, SessionCompleted
+from core.health_probes import HealthProbes
+from core.session_context import SessionContext
+from core.team_pool import TeamPool
+from core.resilient_client import current_call_stats
+from core.usage_tracker import current_usage_tracker
 from utils.logging import get_logger
-from utils.file_utils import save_context, format_timestamp
-from utils.unicode_utils import safe_print, safe_format_output
+from utils.file_utils import TranscriptWriter, format_timestamp, read_context_footer
+from utils.unicode_utils import safe_print, safe_format_output, safe_format_header
+
+
+# セッション終了時にフックへの配信完了を待つ最大秒数
+HOOK_DRAIN_TIMEOUT = 10.0
 
 
 class SessionManager:
-    """セッション管理とメイン実行ロジックを担当するクラス"""
+    """セッション管理とメイン実行ロジックを担当するクラス
+
+    クライアント・チーム・CosmosDBクライアント・フックは共有し、実行ごとの状態は SessionContext に置く。
+    team_manager を渡した場合はそのチームを使う（同時に実行できるセッションは1つ）。
+    渡さない場合はチームプールから実行ごとにチームを借りるため、複数のセッションを並行に実行できる。
+    並行実行では cosmos_client に共有クライアントを渡すと、セッションごとに接続を作らない。
+    """
     
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        client_manager: Optional[ClientManager] = None,
+        cosmos_client=None,
+        team_manager: Optional[TeamManager] = None,
+        team_pool: Optional[TeamPool] = None,
+        health_probes: Optional[HealthProbes] = None
+    ):
         self.settings = settings
         self.logger = get_logger(__name__)
-        self.client_manager = ClientManager(settings)
-        self.team_manager = TeamManager(settings, self.client_manager)
-        
-        # CosmosDB設定
-        cosmosdb_settings = {
-            'enabled': settings.cosmosdb_enabled,
-            'endpoint': settings.cosmosdb_endpoint,
-            'key': settings.cosmosdb_key,
-            'database_name': settings.cosmosdb_database_name,
-            'container_name': settings.cosmosdb_container_name
-        }
-        self.cosmosdb_manager = CosmosDBManager(cosmosdb_settings)
+        # バッチ実行時などは共有のClientManager/CosmosDBクライアントと、TeamPoolから借りたチームを受け取る
+        self.client_manager = client_manager or ClientManager(settings)
+        self.team_manager = team_manager
+        self.team_pool = None
+        if team_manager is None:
+            self.team_pool = team_pool or TeamPool(settings, self.client_manager, max_size=settings.team_pool_size)
+        self._team_busy = False
+        self.cosmos_client = cosmos_client
+        # 準備完了確認の結果をキャッシュするため、プローブは呼び出しごとに作らず使い回す
+        self.health_probes = health_probes or HealthProbes(settings, self.client_manager)
+        
+        # チェックポイントの一覧・削除用（CosmosDBへの保存はセッションごとのマネージャーで行う）
+        self.checkpoint_manager = CheckpointManager(os.path.join(settings.log_directory, "checkpoints"))
+        
+        self.context: Optional[SessionContext] = None  # 最後に開始したセッション
+        self._active_contexts: Set[SessionContext] = set()  # 実行中のセッション
+        self.transcript_directory = settings.log_directory  # トランスクリプト（JSONL）の出力先
+        # フックは購読者ごとのキューを介して会話とは非同期に呼び出す
+        self.message_bus = EventBus(settings.hook_queue_size, settings.hook_backpressure, settings.hook_lag_seconds)
+        # ストリーミングチャンクは確定したメッセージでも届くため、遅れた購読者の分は捨てる
+        self.stream_bus = EventBus(settings.hook_queue_size, BACKPRESSURE_DROP, settings.hook_lag_seconds)
+        self.console_output = True  # Falseの場合はメッセージをコンソールに表示しない
+    
+    # 最後に開始したセッションの状態（1セッションずつ実行する呼び出し元向け）。
+    # 複数のセッションを並行実行している間は、どのセッションを指すか定まらないため RuntimeError になる。
+    # 並行実行する場合は run_session などに渡した SessionContext から参照する。
+    
+    def _single_context(self) -> Optional[SessionContext]:
+        if len(self._active_contexts) > 1:
+            raise RuntimeError(
+                "Multiple sessions are running on this SessionManager; "
+                "read their state from the SessionContext passed to each run"
+            )
+        return self.context
+    
+    @property
+    def session_id(self) -> Optional[str]:
+        context = self._single_context()
+        return context.session_id if context else None
+    
+    @property
+    def session_start_time(self) -> Optional[float]:
+        context = self._single_context()
+        return context.start_time if context else None
+    
+    @property
+    def chat_contexts(self) -> List[Dict[str, Any]]:
+        context = self._single_context()
+        return context.chat_contexts if context else []
+    
+    @property
+    def stop_reason(self) -> Optional[str]:
+        context = self._single_context()
+        return context.stop_reason if context else None
+    
+    @property
+    def transcript_writer(self) -> Optional[TranscriptWriter]:
+        context = self._single_context()
+        return context.transcript_writer if context else None
+    
+    @property
+    def cosmosdb_manager(self) -> Optional[CosmosDBManager]:
+        context = self._single_context()
+        return context.cosmosdb_manager if context else None
+    
+    def new_context(self, session_id: Optional[str] = None) -> SessionContext:
+        """セッション1回分の状態を作成する（session_id を省略した場合は新しいIDを割り当てる）"""
+        cosmosdb_manager = CosmosDBManager(self.settings.get_cosmosdb_settings(), client=self.cosmos_client)
+        context = SessionContext(
+            session_id or "",
+            cosmosdb_manager,
+            CheckpointManager(
+                self.checkpoint_manager.directory,
+                cosmosdb_manager=cosmosdb_manager,
+                save_to_cosmosdb=self.settings.checkpoint_to_cosmosdb
+            )
+        )
+        if not session_id:
+            context.session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(context)}"
+        return context
+    
+    @asynccontextmanager
+    async def _lease_team(self, context: SessionContext) -> AsyncIterator[TeamManager]:
+        """セッションの実行中だけチームを割り当て、終了時のチーム情報をコンテキストに残す"""
+        if self.team_pool is not None:
+            lease = self.team_pool.lease()
+        else:
+            if self._team_busy:
+                raise RuntimeError(
+                    "The team given to this SessionManager is already running a session; "
+                    "create it without team_manager to run sessions concurrently"
+                )
+            lease = self._fixed_team()
         
-        self.chat_contexts: List[Dict[str, Any]] = []
-        self.session_start_time: Optional[float] = None
-        self.message_hooks: List[Callable] = []  # メッセージフック関数のリスト
+        async with lease as team_manager:
+            context.team_manager = team_manager
+            try:
+                yield team_manager
+            finally:
+                context.team_info = team_manager.get_team_info()
+                context.team_manager = None
+    
+    @asynccontextmanager
+    async def _fixed_team(self) -> AsyncIterator[TeamManager]:
+        self._team_busy = True
+        try:
+            yield self.team_manager
+        finally:
+            self._team_busy = False
     
-    async def run_session(self, task: Optional[str] = None) -> str:
-        """セッションを実行する"""
+    async def run_session(self, task: Optional[str] = None, context: Optional[SessionContext] = None) -> str:
+        """セッションを実行する（context を渡すと、そのオブジェクトに実行中の状態が記録される）"""
+        context = context or self.new_context()
+        self.context = context
+        self._active_contexts.add(context)
         self.logger.info("Starting new session")
-        self.session_start_time = time.time()
+        context.start_time = time.time()
         
         if task is None:
             task = Prompts.get_default_task()
+        context.task = task
         
         self.logger.info(f"Task: {task}")
+        if self.console_output:
+            safe_print(f"Session ID: {context.session_id}")
+        context.last_message_time = context.start_time
+        self._emit(context, SessionStarted(session_id=context.session_id, task=task, timestamp=format_timestamp()))
         
         try:
+            # トランスクリプトをセッション開始時に開き、メッセージごとに追記する
+            context.transcript_writer = TranscriptWriter(self.transcript_directory)
+            
             # CosmosDBを初期化
-            await self.cosmosdb_manager.initialize()
+            await context.cosmosdb_manager.initialize(session_id=context.session_id)
             
-            # チームを取得
-            team = self.team_manager.get_team()
+            async with self._lease_team(context) as team_manager:
+                # チームを取得
+                team = team_manager.get_team()
+                
+                # CosmosDBにセッション文書を作成
+                if context.cosmosdb_manager.container:
+                    await context.cosmosdb_manager.create_session_document(
+                        task, 
+                        team_manager.get_team_info()
+                    )
+                
+                # セッション実行
+                await self._execute_session(context, team, task)
             
-            # CosmosDBにセッション文書を作成
-            if self.cosmosdb_manager.container:
-                await self.cosmosdb_manager.create_session_document(
-                    task, 
-                    self.team_manager.get_team_info()
-                )
+            return await self._finish_session(context)
             
-            # セッション実行
-            await self._execute_session(team, task)
+        except BaseException as e:
+            self.logger.error(f"Session failed: {e!r}")
+            self._abort_transcript(context)
+            raise
+        finally:
+            self._active_contexts.discard(context)
+            # CosmosDBクライアントを閉じる
+            await context.cosmosdb_manager.close()
+    
+    async def resume_session(self, session_id: str, context: Optional[SessionContext] = None) -> str:
+        """チェックポイントから中断したセッションを再開する"""
+        self.logger.info(f"Resuming session: {session_id}")
+        context = context or self.new_context(session_id)
+        context.session_id = session_id
+        self.context = context
+        self._active_contexts.add(context)
+        
+        try:
+            # CosmosDBを初期化（チェックポイントがディスクにない場合の取得元にもなる）
+            await context.cosmosdb_manager.initialize(session_id=session_id)
             
-            # 結果を保存
-            filename = save_context(self.chat_contexts, self.settings.log_directory)
+            checkpoint = await context.checkpoint_manager.load(session_id)
+            if checkpoint is None:
+                raise ValueError(f"No checkpoint found for session: {session_id}")
+            if await self._is_completed(context, checkpoint):
+                # 完了後に残ったチェックポイントから再開すると、完了したトランスクリプトを途中までの内容で上書きしてしまう
+                await context.checkpoint_manager.delete(session_id)
+                raise ValueError(f"Session already completed: {session_id}")
             
-            execution_time = time.time() - self.session_start_time
+            task = checkpoint["task"]
+            context.task = task
+            context.chat_contexts = list(checkpoint["chat_contexts"])
+            context.usage_tracker.restore(context.chat_contexts)
             
-            # CosmosDBでセッション完了
-            if self.cosmosdb_manager.container:
-                final_stats = self.get_session_stats()
-                await self.cosmosdb_manager.complete_session(execution_time, final_stats)
+            # 同じトランスクリプトをチェックポイント時点の内容で書き直して追記を再開する
+            context.transcript_writer = TranscriptWriter(
+                self.transcript_directory,
+                filename=checkpoint.get("transcript_file")
+            )
+            for chat_context in context.chat_contexts:
+                await context.transcript_writer.append_async(chat_context)
+            # 実行時間は中断前の経過時間を引き継ぐ
+            context.start_time = time.time() - checkpoint.get("elapsed_time", 0.0)
+            context.last_message_time = time.time()
+            self._emit(context, SessionStarted(session_id=session_id, task=task, timestamp=format_timestamp()))
             
-            self.logger.info(f"Session completed in {execution_time:.2f} seconds")
-            safe_print(f"Context saved to {filename}")
+            async with self._lease_team(context) as team_manager:
+                # チーム状態を復元し、終了条件に既存メッセージを反映
+                team = team_manager.get_team()
+                await team.load_state(checkpoint["team_state"])
+                await team_manager.prime_termination(context.chat_contexts, context.elapsed_time)
+                
+                if context.cosmosdb_manager.container:
+                    await context.cosmosdb_manager.resume_session_document(
+                        task,
+                        team_manager.get_team_info()
+                    )
+                
+                if self.console_output:
+                    safe_print(f"Resumed from checkpoint at message {len(context.chat_contexts)}")
+                
+                # タスクを指定せずに実行すると、復元した会話の続きから再開する
+                await self._execute_session(context, team, task, resume=True)
             
-            return filename
+            return await self._finish_session(context)
             
-        except Exception as e:
-            self.logger.error(f"Session failed: {e}")
+        except BaseException as e:
+            self.logger.error(f"Session resume failed: {e!r}")
+            self._abort_transcript(context)
             raise
         finally:
-            # CosmosDBクライアントを閉じる
-            await self.cosmosdb_manager.close()
+            self._active_contexts.discard(context)
+            await context.cosmosdb_manager.close()
+    
+    async def _is_completed(self, context: SessionContext, checkpoint: Dict[str, Any]) -> bool:
+        """チェックポイントのセッションが既に完了しているか（CosmosDBの文書の状態、またはトランスクリプトのフッター）"""
+        if context.cosmosdb_manager.container:
+            if await context.cosmosdb_manager.get_session_status(context.session_id) == "completed":
+                return True
+        transcript_file = checkpoint.get("transcript_file")
+        return bool(transcript_file) and read_context_footer(transcript_file, self.transcript_directory) is not None
+    
+    async def _finish_session(self, context: SessionContext) -> str:
+        """トランスクリプトを閉じてセッションを完了する"""
+        execution_time = context.elapsed_time
+        filename = await context.transcript_writer.close_async({
+            "session_id": context.session_id,
+            "execution_time": execution_time
+        })
+        
+        # CosmosDBでセッション完了
+        if context.cosmosdb_manager.container:
+            final_stats = self.get_session_stats(context)
+            await context.cosmosdb_manager.complete_session(execution_time, final_stats)
+        
+        # 正常終了したセッションのチェックポイントは不要
+        await context.checkpoint_manager.delete(context.session_id)
+        
+        self.logger.info(f"Session completed in {execution_time:.2f} seconds")
+        if self.console_output:
+            safe_print(f"Context saved to {filename}")
+        
+        return filename
     
-    async def _execute_session(self, team, task: str) -> None:
+    async def _execute_session(self, context: SessionContext, team, task: str, resume: bool = False) -> None:
         """セッションを実行する内部メソッド"""
-        self.chat_contexts.clear()
+        # セレクター呼び出しの使用量と、モデル呼び出しの再試行などの件数をこのセッションに記録させる
+        tracker_token = current_usage_tracker.set(context.usage_tracker)
+        call_stats_token = current_call_stats.set(context.call_stats)
+        try:
+            await self._consume_stream(context, team, task, resume)
+        finally:
+            current_call_stats.reset(call_stats_token)
+            current_usage_tracker.reset(tracker_token)
+            # セッションを終える前に、このセッションのメッセージでキューに残っているものをフックに配信する
+            await self.message_bus.drain(HOOK_DRAIN_TIMEOUT, key=context.session_id)
+            await self.stream_bus.drain(HOOK_DRAIN_TIMEOUT, key=context.session_id)
+    
+    async def _consume_stream(self, context: SessionContext, team, task: str, resume: bool) -> None:
+        """チームの出力ストリームを処理する"""
+        messages_since_checkpoint = 0
         
-        async for chunk in team.run_stream(task=task):
+        async for chunk in team.run_stream(task=None if resume else task):
             if isinstance(chunk, TaskResult):
-                safe_print(f"Stop reason: {chunk.stop_reason}")
+                context.stop_reason = chunk.stop_reason
+                if self.console_output:
+                    safe_print(f"Stop reason: {chunk.stop_reason}")
                 self.logger.info(f"Session ended with reason: {chunk.stop_reason}")
+            elif chunk.type == "ModelClientStreamingChunkEvent":
+                # 生成途中のチャンクは表示とフックのみで、保存はしない
+                await self._handle_stream_chunk(context, chunk)
             else:
                 # 出力を安全に表示（詳細ログを抑制してユーザーメッセージのみ）
-                if chunk.type == "TextMessage":
-                    formatted_output = safe_format_output(chunk.source, chunk.type, chunk.content)
-                    safe_print(formatted_output)
+                if chunk.type == "TextMessage" and self.console_output:
+                    if context.streaming_source == chunk.source:
+                        # 逐次表示済みのため改行のみ出力する
+                        safe_print("\n")
+                    else:
+                        formatted_output = safe_format_output(chunk.source, chunk.type, chunk.content)
+                        safe_print(formatted_output)
+                    context.streaming_source = None
                 
                 # テキストメッセージの場合はコンテキストに保存
                 if chunk.type == "TextMessage":
@@ -112,92 +353,226 @@ class SessionManager:
                         "type": chunk.type,
                         "timestamp": format_timestamp()
                     }
-                    self.chat_contexts.append(chat_context)
+                    turn_usage = context.usage_tracker.record_message(chunk.source, chunk.models_usage)
+                    if turn_usage:
+                        chat_context["usage"] = turn_usage
+                    context.chat_contexts.append(chat_context)
+                    await context.transcript_writer.append_async(chat_context)
+                    
+                    now = time.time()
+                    self._emit(context, MessageEvent(
+                        index=len(context.chat_contexts) - 1,
+                        source=chunk.source,
+                        content=chunk.content,
+                        timestamp=chat_context["timestamp"],
+                        latency=now - context.last_message_time,
+                        usage=turn_usage
+                    ))
+                    context.last_message_time = now
                     
                     # CosmosDBにリアルタイム保存
-                    if self.cosmosdb_manager.container:
+                    if context.cosmosdb_manager.container:
                         try:
-                            await self.cosmosdb_manager.save_message_realtime(chat_context)
+                            await context.cosmosdb_manager.save_message_realtime(chat_context)
                         except Exception as db_error:
                             self.logger.warning(f"Failed to save message to CosmosDB: {db_error}")
                     
-                    # メッセージフックを実行
-                    for hook in self.message_hooks:
-                        try:
-                            hook(chat_context)
-                        except Exception as hook_error:
-                            self.logger.warning(f"Message hook failed: {hook_error}")
+                    # メッセージフックに配信（フックの実行は待たない、並行実行時の識別用にセッションIDを付ける）
+                    if self.message_bus:
+                        await self.message_bus.publish({**chat_context, "session_id": context.session_id}, key=context.session_id)
+                    
+                    # 一定メッセージごとにチェックポイントを保存
+                    messages_since_checkpoint += 1
+                    if self.settings.checkpoint_interval and messages_since_checkpoint >= self.settings.checkpoint_interval:
+                        messages_since_checkpoint = 0
+                        await self._save_checkpoint(context, team, task)
+    
+    async def _handle_stream_chunk(self, context: SessionContext, chunk) -> None:
+        """ストリーミングチャンクをコンソールに逐次表示し、ストリームフックに渡す"""
+        if self.console_output:
+            if context.streaming_source != chunk.source:
+                safe_print(safe_format_header(chunk.source, "TextMessage"))
+                context.streaming_source = chunk.source
+            safe_print(chunk.content, end="", flush=True)
+        
+        if context.event_queue is not None:
+            self._emit(context, ChunkEvent(source=chunk.source, content=chunk.content, timestamp=format_timestamp()))
+        
+        if not self.stream_bus:
+            return
+        
+        chunk_data = {
+            "source": chunk.source,
+            "content": chunk.content,
+            "type": chunk.type,
+            "timestamp": format_timestamp(),
+            "session_id": context.session_id
+        }
+        await self.stream_bus.publish(chunk_data, key=context.session_id)
+    
+    async def stream_session(
+        self,
+        task: Optional[str] = None,
+        context: Optional[SessionContext] = None
+    ) -> AsyncGenerator[SessionEvent, None]:
+        """セッションを実行し、イベント（開始・メッセージ・チャンク・完了）を発生順に出力する
+
+        セッションはバックグラウンドのタスクで実行され、消費者が途中でループを抜けるとキャンセルされる
+        （即座にキャンセルするには contextlib.aclosing で囲む）。
+        セッションが失敗した場合は、それまでのイベントを出力した後に例外を送出する。
+        """
+        context = context or self.new_context()
+        events: asyncio.Queue = asyncio.Queue()
+        context.event_queue = events
+        run_task = asyncio.create_task(self._run_for_stream(task, context, events))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            # 失敗したセッションの例外を消費者に伝える
+            await run_task
+        finally:
+            context.event_queue = None
+            if not run_task.done():
+                run_task.cancel()
+                try:
+                    await run_task
+                except asyncio.CancelledError:
+                    pass
+    
+    async def _run_for_stream(self, task: Optional[str], context: SessionContext, events: asyncio.Queue) -> None:
+        try:
+            filename = await self.run_session(task, context=context)
+            self._emit(context, SessionCompleted(
+                session_id=context.session_id,
+                stop_reason=context.stop_reason,
+                filename=filename,
+                total_messages=len(context.chat_contexts),
+                execution_time=context.elapsed_time,
+                timestamp=format_timestamp()
+            ))
+        finally:
+            events.put_nowait(None)
+    
+    def _emit(self, context: SessionContext, event: SessionEvent) -> None:
+        """stream_session の消費者がいればイベントを渡す"""
+        if context.event_queue is not None:
+            context.event_queue.put_nowait(event)
+    
+    def _abort_transcript(self, context: SessionContext) -> None:
+        """異常終了時にトランスクリプトをフッターなしで閉じる"""
+        if context.transcript_writer is not None:
+            context.transcript_writer.abort()
+    
+    async def _save_checkpoint(self, context: SessionContext, team, task: str) -> None:
+        """チーム状態とチャットコンテキストのチェックポイントを保存する
+
+        実行中のチームの状態は厳密な一貫性が保証されないため、
+        メッセージ受信直後（次の発言者の選択前後）の状態を保存する。
+        """
+        try:
+            team_state = await team.save_state()
+            await context.checkpoint_manager.save(
+                context.session_id,
+                task,
+                team_state,
+                context.chat_contexts,
+                context.elapsed_time,
+                transcript_file=context.transcript_writer.filename
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to save checkpoint: {e}")
     
-    def get_session_stats(self) -> Dict[str, Any]:
-        """セッション統計を取得する"""
-        if self.session_start_time is None:
+    def get_session_stats(self, context: Optional[SessionContext] = None) -> Dict[str, Any]:
+        """セッション統計を取得する（context を省略した場合は最後に開始したセッション、並行実行中は指定が必要）
+
+        model_calls はこのセッションのモデル呼び出しの件数、process_client_stats は
+        全セッションで共有するクライアントの累計（キャッシュ・レート制限など）。
+        """
+        context = context or self._single_context()
+        if context is None or context.start_time is None:
             return {"status": "not_started"}
         
-        execution_time = time.time() - self.session_start_time
+        execution_time = context.elapsed_time
         
         # エージェント別メッセージ数を集計
         agent_message_counts = {}
-        for context in self.chat_contexts:
-            source = context.get("source", "unknown")
+        for chat_context in context.chat_contexts:
+            source = chat_context.get("source", "unknown")
             agent_message_counts[source] = agent_message_counts.get(source, 0) + 1
         
         return {
             "status": "completed",
             "execution_time": execution_time,
             "execution_time_formatted": f"{execution_time:.2f}s",
-            "session_start": format_timestamp(datetime.fromtimestamp(self.session_start_time)),
+            "session_start": format_timestamp(datetime.fromtimestamp(context.start_time)),
             "session_end": format_timestamp(),
-            "total_messages": len(self.chat_contexts),
+            "total_messages": len(context.chat_contexts),
+            "stop_reason": context.stop_reason,
             "agent_message_counts": agent_message_counts,
-            "team_info": self.team_manager.get_team_info()
+            "team_info": context.get_team_info(),
+            "token_usage": context.usage_tracker.get_summary(),
+            "model_calls": context.call_stats.get_summary(),
+            "process_client_stats": self.client_manager.get_client_stats(),
+            "hook_stats": {
+                "message": self.message_bus.get_stats(),
+                "stream": self.stream_bus.get_stats()
+            }
         }
     
-    def get_chat_contexts(self) -> List[Dict[str, Any]]:
+    def get_chat_contexts(self, context: Optional[SessionContext] = None) -> List[Dict[str, Any]]:
         """チャットコンテキストを取得する"""
-        return self.chat_contexts.copy()
+        context = context or self._single_context()
+        return context.chat_contexts.copy() if context else []
     
     def reset_session(self) -> None:
-        """セッションをリセットする"""
+        """最後に開始したセッションの参照を外し、固定のチームを渡された場合はチームをリセットする
+
+        チームプールを使う場合、チームは返却時にリセット済みのため、チームに対しては何もしない。
+        """
         self.logger.info("Resetting session")
-        self.chat_contexts.clear()
-        self.session_start_time = None
-        self.team_manager.reset_team()
+        self.context = None
+        if self.team_manager is not None:
+            self.team_manager.reset_team()
     
-    def add_message_hook(self, hook: Callable[[Dict[str, Any]], None]):
-        """メッセージフック関数を追加"""
-        self.message_hooks.append(hook)
+    def add_message_hook(
+        self,
+        hook: Callable[[Dict[str, Any]], Any],
+        backpressure: Optional[str] = None,
+        queue_size: Optional[int] = None
+    ):
+        """メッセージフック関数（同期・非同期）を追加
+
+        backpressure はフックが遅れてキューが満杯になった場合の方針（drop / block / coalesce、既定は HOOK_BACKPRESSURE）。
+        """
+        self.message_bus.subscribe(hook, policy=backpressure, queue_size=queue_size)
     
-    def remove_message_hook(self, hook: Callable[[Dict[str, Any]], None]):
+    def remove_message_hook(self, hook: Callable[[Dict[str, Any]], Any]):
         """メッセージフック関数を削除"""
-        if hook in self.message_hooks:
-            self.message_hooks.remove(hook)
+        self.message_bus.unsubscribe(hook)
     
     def clear_message_hooks(self):
         """全てのメッセージフックをクリア"""
-        self.message_hooks.clear()
+        self.message_bus.clear()
+    
+    def add_stream_hook(self, hook: Callable[[Dict[str, Any]], Any], queue_size: Optional[int] = None):
+        """ストリーミングチャンクのフック関数（同期・非同期）を追加（stream_tokens有効時のみ呼ばれる）"""
+        self.stream_bus.subscribe(hook, queue_size=queue_size)
+    
+    def remove_stream_hook(self, hook: Callable[[Dict[str, Any]], Any]):
+        """ストリーミングチャンクのフック関数を削除"""
+        self.stream_bus.unsubscribe(hook)
     
     async def health_check(self) -> bool:
-        """システムの健全性をチェックする"""
-        try:
-            # クライアントの健全性チェック
-            if not self.client_manager.health_check():
-                return False
-            
-            # チームの健全性チェック
-            team = self.team_manager.get_team()
-            if team is None:
-                return False
-            
-            # CosmosDBの健全性チェック（有効な場合のみ）
-            if self.settings.cosmosdb_enabled:
-                await self.cosmosdb_manager.initialize()
-                if not await self.cosmosdb_manager.health_check():
-                    self.logger.warning("CosmosDB health check failed, but system will continue")
-                await self.cosmosdb_manager.close()
-            
+        """システムの準備完了を確認する（モデルへの1トークンの呼び出しとCosmosDBのメタデータ読み取り）
+
+        結果は HEALTH_CACHE_TTL 秒キャッシュされ、期限切れ後はキャッシュを返しつつバックグラウンドで更新する。
+        """
+        readiness = await self.health_probes.readiness()
+        if readiness["ready"]:
             self.logger.info("System health check passed")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"System health check failed: {e}")
-            return False
\ No newline at end of file
+        else:
+            self.logger.error(f"System health check failed: {readiness['checks']}")
+        return readiness["ready"]
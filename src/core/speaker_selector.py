@@ -0,0 +1,191 @@
+"""
+Speaker Selector - LLMを呼ばずに次の発言者を決めるローカルセレクター
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage
+
+from utils.logging import get_logger
+from utils.selector_history_context import STANCE_AGREE, classify_stance
+
+
+# 選択プロンプトの「3回続けて賛成意見が出た場合」に合わせる
+AGREEMENT_THRESHOLD = 3
+
+
+class LocalSpeakerSelector:
+    """決定的なルールで次の発言者を選ぶ SelectorGroupChat 用の selector_func
+
+    - reflection_agent 以降に賛成意見が AGREEMENT_THRESHOLD 回続いたら reflection_agent を選ぶ
+    - それ以外は直前の発言者を除き、最も長く発言していないエージェントを優先する
+    - 過去のセッションの発言順から学習した遷移確率があれば、それと組み合わせて順位を付ける
+
+    1位と2位の差が小さく確信度が min_confidence 未満の場合は None を返し、
+    LLMによる選択に任せる。
+    """
+
+    def __init__(
+        self,
+        agent_names: Sequence[str],
+        reflection_agent: str = "reflection_agent",
+        min_confidence: float = 0.2,
+        allow_repeated_speaker: bool = False,
+        transition_weight: float = 0.5
+    ):
+        self.agent_names = list(agent_names)
+        self.reflection_agent = reflection_agent
+        self.min_confidence = min_confidence
+        self.allow_repeated_speaker = allow_repeated_speaker
+        self.transition_weight = transition_weight
+        self.logger = get_logger(__name__)
+
+        # transitions[直前の発言者][次の発言者] = 回数（"" はタスク直後）
+        self.transitions: Dict[str, Dict[str, int]] = {}
+        self.trained_sessions = 0
+
+        self._lock = threading.Lock()
+        self.local_selections = 0
+        self.fallbacks = 0
+        self.reflection_switches = 0
+
+    def train(self, sequences: Iterable[Sequence[str]]) -> int:
+        """過去のセッションの発言者の並びから遷移回数を学習し、学習したセッション数を返す"""
+        count = 0
+        for sequence in sequences:
+            previous = ""
+            for speaker in sequence:
+                if speaker not in self.agent_names:
+                    continue
+                row = self.transitions.setdefault(previous, {})
+                row[speaker] = row.get(speaker, 0) + 1
+                previous = speaker
+            count += 1
+        self.trained_sessions += count
+        return count
+
+    def save(self, path: str) -> None:
+        """学習結果をJSONに保存する"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "trained_sessions": self.trained_sessions,
+                "transitions": self.transitions
+            }, f, ensure_ascii=False, indent=2)
+
+    def load(self, path: str) -> bool:
+        """学習結果を読み込む（ファイルがなければFalse）"""
+        if not os.path.exists(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.transitions = data.get("transitions", {})
+        self.trained_sessions = data.get("trained_sessions", 0)
+        self.logger.info(f"Loaded speaker transitions from {path} ({self.trained_sessions} sessions)")
+        return True
+
+    def _transition_probabilities(self, previous: str, candidates: List[str]) -> Optional[Dict[str, float]]:
+        row = self.transitions.get(previous)
+        if not row:
+            return None
+        # 加算スムージング
+        total = sum(row.get(candidate, 0) + 1 for candidate in candidates)
+        return {candidate: (row.get(candidate, 0) + 1) / total for candidate in candidates}
+
+    def score(self, speakers: Sequence[str]) -> Dict[str, Any]:
+        """発言者の並びから次の発言者と確信度を求める"""
+        previous = speakers[-1] if speakers else ""
+
+        candidates = [
+            name for name in self.agent_names
+            if name != self.reflection_agent and (self.allow_repeated_speaker or name != previous)
+        ]
+        if not candidates:
+            return {"speaker": None, "confidence": 0.0, "scores": {}}
+
+        # 最後に発言してからのターン数（未発言は全体の長さ + 1）
+        last_spoken = {speaker: index for index, speaker in enumerate(speakers)}
+        gaps = {name: len(speakers) - last_spoken.get(name, -1) for name in candidates}
+        gap_total = sum(gaps.values())
+        scores = {name: gap / gap_total for name, gap in gaps.items()}
+
+        transition = self._transition_probabilities(previous, candidates)
+        if transition is not None:
+            scores = {
+                name: (1 - self.transition_weight) * scores[name] + self.transition_weight * transition[name]
+                for name in candidates
+            }
+
+        ranked = sorted(candidates, key=lambda name: scores[name], reverse=True)
+        top = scores[ranked[0]]
+        second = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        confidence = 1.0 - second / top if top > 0 else 0.0
+        return {"speaker": ranked[0], "confidence": confidence, "scores": scores}
+
+    def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[str]:
+        """SelectorGroupChat の selector_func として次の発言者を返す（確信が持てない場合は None）"""
+        chat_messages = [
+            message for message in messages
+            if isinstance(message, BaseChatMessage) and message.source in self.agent_names
+        ]
+
+        agree_streak = 0
+        for message in reversed(chat_messages):
+            if message.source == self.reflection_agent:
+                break
+            if classify_stance(message.to_text()) != STANCE_AGREE:
+                break
+            agree_streak += 1
+
+        if agree_streak >= AGREEMENT_THRESHOLD and self.reflection_agent in self.agent_names:
+            with self._lock:
+                self.local_selections += 1
+                self.reflection_switches += 1
+            return self.reflection_agent
+
+        result = self.score([message.source for message in chat_messages])
+        if result["speaker"] is None or result["confidence"] < self.min_confidence:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        with self._lock:
+            self.local_selections += 1
+        self.logger.debug(f"Local selector chose {result['speaker']} (confidence {result['confidence']:.2f})")
+        return result["speaker"]
+
+    def candidates(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> List[str]:
+        """SelectorGroupChat の candidate_func としてLLMに渡す候補を返す
+
+        selector_func で選んだ発言者は SelectorGroupChat の直前の発言者として記録されないため、
+        LLMにフォールバックした際も実際の直前の発言者を候補から外す。
+        """
+        previous = next(
+            (message.source for message in reversed(messages)
+             if isinstance(message, BaseChatMessage) and message.source in self.agent_names),
+            None
+        )
+        if self.allow_repeated_speaker or previous is None:
+            return list(self.agent_names)
+        return [name for name in self.agent_names if name != previous]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.local_selections = 0
+            self.fallbacks = 0
+            self.reflection_switches = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ローカル選択とLLMへのフォールバックの回数を取得する"""
+        with self._lock:
+            total = self.local_selections + self.fallbacks
+            return {
+                "local_selections": self.local_selections,
+                "llm_fallbacks": self.fallbacks,
+                "reflection_switches": self.reflection_switches,
+                "local_ratio": self.local_selections / total if total else 0.0,
+                "trained_sessions": self.trained_sessions
+            }
@@ -0,0 +1,247 @@
+"""
+Speculative - セレクターの判定と並行して次の発言者の応答を先行生成する
+"""
+
+import asyncio
+import copy
+import threading
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, SystemMessage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from agents.base_agent import BaseAgent
+from core.client_wrappers import ChatCompletionClientWrapper, request_key
+from core.speaker_selector import LocalSpeakerSelector
+from utils.logging import get_logger
+
+
+class SpeculationGroup:
+    """エージェントごとの先行生成を管理し、選ばれなかった生成をキャンセルして無駄になったトークンを集計する
+
+    無駄になったトークン数が max_wasted_tokens に達したら以降の先行生成は行わない。
+    完了前にキャンセルした生成は、課金されうるプロンプトの推定トークン数を無駄として数える。
+    """
+
+    def __init__(self, max_wasted_tokens: int):
+        self.max_wasted_tokens = max_wasted_tokens
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[str, asyncio.Task, int]] = {}
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self.skipped = 0
+        self.wasted_tokens = 0
+
+    @property
+    def budget_exhausted(self) -> bool:
+        return self.wasted_tokens >= self.max_wasted_tokens
+
+    def start(self, agent_name: str, key: str, coroutine, prompt_tokens: int) -> bool:
+        """先行生成を開始する（予算を使い切っている場合は開始しない）"""
+        with self._lock:
+            if self.budget_exhausted:
+                coroutine.close()
+                self.skipped += 1
+                return False
+            previous = self._pending.pop(agent_name, None)
+            if previous is not None:
+                self._discard(previous)
+            self._pending[agent_name] = (key, asyncio.ensure_future(coroutine), prompt_tokens)
+            self.started += 1
+            return True
+
+    def take(self, agent_name: str, key: str) -> Optional[asyncio.Task]:
+        """発言するエージェントのリクエストに一致する先行生成を返し、他の先行生成はキャンセルする"""
+        with self._lock:
+            own = self._pending.pop(agent_name, None)
+            speculated = own is not None or bool(self._pending)
+            for entry in self._pending.values():
+                self._discard(entry)
+            self._pending.clear()
+
+            if own is not None and own[0] == key:
+                self.hits += 1
+                return own[1]
+            if own is not None:
+                self._discard(own)
+            if speculated:
+                self.misses += 1
+            return None
+
+    def _discard(self, entry: Tuple[str, asyncio.Task, int]) -> None:
+        _, task, prompt_tokens = entry
+        if task.done() and not task.cancelled() and task.exception() is None:
+            usage = task.result().usage
+            self.wasted_tokens += usage.prompt_tokens + usage.completion_tokens
+        else:
+            task.cancel()
+            self.cancelled += 1
+            self.wasted_tokens += prompt_tokens
+
+    def reset(self) -> None:
+        """未使用の先行生成を破棄し、統計をリセットする"""
+        with self._lock:
+            for _, task, _ in self._pending.values():
+                task.cancel()
+            self._pending.clear()
+            self._reset_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "skipped": self.skipped,
+                "wasted_tokens": self.wasted_tokens,
+                "max_wasted_tokens": self.max_wasted_tokens
+            }
+
+
+class SpeculativeChatCompletionClient(ChatCompletionClientWrapper):
+    """エージェント1人分のクライアント。先行生成した応答がリクエストと一致すればそれを返す"""
+
+    def __init__(self, inner: ChatCompletionClient, group: SpeculationGroup, agent_name: str, model_name: str):
+        super().__init__(inner, model_name)
+        self.group = group
+        self.agent_name = agent_name
+
+    def _estimate_tokens(self, messages: Sequence[LLMMessage]) -> int:
+        try:
+            return self.inner.count_tokens(messages)
+        except Exception:
+            return sum(len(str(message.content)) for message in messages) // 2
+
+    def prefetch(self, messages: Sequence[LLMMessage]) -> bool:
+        """エージェントが送るはずのメッセージで応答の生成を開始する"""
+        key = request_key(self.model_name, messages)
+        return self.group.start(self.agent_name, key, self.inner.create(messages), self._estimate_tokens(messages))
+
+    async def _take_prefetched(
+        self,
+        messages: Sequence[LLMMessage],
+        tools: Sequence[Tool | ToolSchema],
+        json_output: Optional[bool | type[BaseModel]],
+        extra_create_args: Mapping[str, Any]
+    ) -> Optional[CreateResult]:
+        key = request_key(self.model_name, messages, tools, json_output, extra_create_args)
+        task = self.group.take(self.agent_name, key)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            # 先行生成が失敗した場合は通常どおり呼び出す
+            self.group.logger.warning(f"Speculative call for {self.agent_name} failed: {e}")
+            return None
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        result = await self._take_prefetched(messages, tools, json_output, extra_create_args)
+        if result is not None:
+            return result
+        return await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        result = await self._take_prefetched(messages, tools, json_output, extra_create_args)
+        if result is not None:
+            # 生成済みの応答はまとめて1チャンクとして出力する
+            if isinstance(result.content, str):
+                yield result.content
+            yield result
+            return
+        async for chunk in self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            yield chunk
+
+
+class SpeculativeSelector:
+    """SelectorGroupChat の selector_func として、LLMによる選択と並行して上位 top_k 人の応答を先行生成する
+
+    select は先行生成を開始したうえで None を返し、選択自体はLLMに任せる。
+    local_selector が発言者を決められる場合はLLMを呼ばないため、先行生成も行わない。
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, BaseAgent],
+        group: SpeculationGroup,
+        top_k: int = 2,
+        local_selector: Optional[LocalSpeakerSelector] = None
+    ):
+        self.agents = agents
+        self.group = group
+        self.top_k = top_k
+        self.local_selector = local_selector
+        # 候補の順位付けには学習済みの遷移があればそれを使う
+        self.ranker = local_selector or LocalSpeakerSelector(list(agents.keys()))
+        self.logger = get_logger(__name__)
+
+    async def _predicted_messages(self, agent_name: str, thread: List[BaseChatMessage]) -> List[LLMMessage]:
+        """エージェントが次に発言する場合にモデルへ送るメッセージを、エージェントの状態を変えずに組み立てる"""
+        agent = self.agents[agent_name]
+        last_index = max((i for i, message in enumerate(thread) if message.source == agent_name), default=-1)
+        context = copy.deepcopy(agent.agent.model_context)
+        for message in thread[last_index + 1:]:
+            await context.add_message(message.to_model_message())
+        return [SystemMessage(content=agent.system_message)] + await context.get_messages()
+
+    async def select(self, thread: Sequence[BaseAgentEvent | BaseChatMessage]) -> Optional[str]:
+        if self.local_selector is not None:
+            speaker = self.local_selector(thread)
+            if speaker is not None:
+                return speaker
+
+        if self.group.budget_exhausted:
+            return None
+
+        chat_messages = [message for message in thread if isinstance(message, BaseChatMessage)]
+        scores = self.ranker.score([message.source for message in chat_messages if message.source in self.agents])["scores"]
+        candidates = sorted(scores, key=lambda name: scores[name], reverse=True)[:self.top_k]
+
+        for agent_name in candidates:
+            try:
+                self.agents[agent_name].model_client.prefetch(await self._predicted_messages(agent_name, chat_messages))
+            except Exception as e:
+                self.logger.warning(f"Failed to start speculative call for {agent_name}: {e}")
+        return None
@@ -2,9 +2,12 @@
 Team Manager - チーム管理とエージェント統合
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from autogen_agentchat.teams import SelectorGroupChat
 from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import TextMessage
+from autogen_core.model_context import ChatCompletionContext, UnboundedChatCompletionContext
+from autogen_core.models import RequestUsage
 
 from agents import (
         CreativePlannerAgent, MarketAnalystAgent, TechnicalValidatorAgent,
@@ -13,8 +16,16 @@ from agents import (
 from config.settings import Settings
 from config.prompts import Prompts
 from core.client_manager import ClientManager
+from core.orchestrated_team import OrchestratedTeam
+from core.speaker_selector import LocalSpeakerSelector
+from core.speculative import SpeculationGroup, SpeculativeChatCompletionClient, SpeculativeSelector
 from utils.logging import get_logger
 from utils.agent_count_termination import AgentCountTermination
+from utils.budget_termination import TokenBudgetTermination, DeadlineTermination
+from utils.convergence_termination import ConvergenceTermination
+from utils.rolling_summary_context import RollingSummaryChatCompletionContext
+from utils.selector_history_context import SelectorHistoryChatCompletionContext
+from utils.termination_priming import prime_conditions
 
 
 class TeamManager:
@@ -26,8 +37,14 @@ class TeamManager:
         self.logger = get_logger(__name__)
         self.agents = {}
         self.team = None
+        self.termination_condition = None
+        self.speaker_selector = None
+        self.speculation_group = None
+        self.speculative_selector = None
+        self.bound_loop = None  # チームを実行したイベントループ（TeamPoolが管理する）
         
         self._initialize_agents()
+        self._initialize_speaker_selector()
         self._initialize_team()
     
     def _initialize_agents(self) -> None:
@@ -36,24 +53,63 @@ class TeamManager:
         
         chat_client = self.client_manager.chat_client
         
-        # 各エージェントのインスタンスを作成
-        self.agents = {
-            'creative_planner': CreativePlannerAgent(chat_client),
-            'market_analyst': MarketAnalystAgent(chat_client),
-            'technical_validator': TechnicalValidatorAgent(chat_client),
-            'business_evaluator': BusinessEvaluatorAgent(chat_client),
-            'user_advocate': UserAdvocateAgent(chat_client),
-            'reflection_agent': ReflectionAgent(chat_client)
+        agent_classes = {
+            'creative_planner': CreativePlannerAgent,
+            'market_analyst': MarketAnalystAgent,
+            'technical_validator': TechnicalValidatorAgent,
+            'business_evaluator': BusinessEvaluatorAgent,
+            'user_advocate': UserAdvocateAgent,
+            'reflection_agent': ReflectionAgent
         }
         
+        if self.settings.speculation_enabled and self.settings.team_mode == "selector":
+            # 先行生成の応答をエージェントごとに受け取れるよう、クライアントをエージェント単位で包む
+            self.speculation_group = SpeculationGroup(self.settings.speculation_max_wasted_tokens)
+            self.agents = {
+                name: agent_class(SpeculativeChatCompletionClient(
+                    chat_client, self.speculation_group, name, self.settings.azure_deployment_chat
+                ))
+                for name, agent_class in agent_classes.items()
+            }
+        else:
+            # 各エージェントのインスタンスを作成
+            self.agents = {name: agent_class(chat_client) for name, agent_class in agent_classes.items()}
+        
         self.logger.info(f"Initialized {len(self.agents)} agents")
     
+    def _initialize_speaker_selector(self) -> None:
+        """ローカルセレクターと先行生成を初期化する（学習済みの遷移があれば読み込む）"""
+        if self.settings.local_selector_enabled:
+            self.speaker_selector = LocalSpeakerSelector(
+                self.get_agent_list(),
+                min_confidence=self.settings.local_selector_min_confidence,
+                allow_repeated_speaker=self.settings.allow_repeated_speaker
+            )
+            try:
+                self.speaker_selector.load(self.settings.local_selector_model_path)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Failed to load speaker model: {e}")
+        
+        if self.speculation_group is not None:
+            self.speculative_selector = SpeculativeSelector(
+                self.agents,
+                self.speculation_group,
+                top_k=self.settings.speculation_top_k,
+                local_selector=self.speaker_selector
+            )
+    
     def _initialize_team(self) -> None:
         """チームを初期化する"""
         self.logger.info("Initializing team")
         
         # エージェントリストを作成
-        agent_list = [agent.create_agent() for agent in self.agents.values()]
+        agent_list = [
+            agent.create_agent(
+                model_client_stream=self.settings.stream_tokens,
+                model_context=self._create_model_context(agent_name)
+            )
+            for agent_name, agent in self.agents.items()
+        ]
         
         # 終了条件を設定
         max_messages_termination = MaxMessageTermination(
@@ -64,6 +120,28 @@ class TeamManager:
             max_count=self.settings.reflection_agent_max_count
         )
         termination = reflection_termination | max_messages_termination
+        if self.settings.convergence_enabled:
+            termination = termination | ConvergenceTermination(
+                novelty_threshold=self.settings.convergence_novelty_threshold,
+                window_size=self.settings.convergence_window,
+                patience=self.settings.convergence_patience
+            )
+        if self.settings.session_token_budget:
+            termination = termination | TokenBudgetTermination(self.settings.session_token_budget)
+        if self.settings.session_deadline_seconds:
+            termination = termination | DeadlineTermination(self.settings.session_deadline_seconds)
+        self.termination_condition = termination
+        
+        if self.settings.team_mode == "parallel":
+            # 専門家は並列に発言させ、ラウンドの間に reflection_agent を発言させる
+            reflection_agent = self.agents['reflection_agent'].agent
+            self.team = OrchestratedTeam(
+                [agent for agent in agent_list if agent is not reflection_agent],
+                reflection_agent=reflection_agent,
+                termination_condition=termination
+            )
+            self.logger.info("Team initialized successfully (parallel mode)")
+            return
         
         # セレクタープロンプトを取得
         selector_prompt = Prompts.get_selector_prompt()
@@ -74,17 +152,63 @@ class TeamManager:
             model_client=self.client_manager.reasoning_client,
             termination_condition=termination,
             selector_prompt=selector_prompt,
-            allow_repeated_speaker=self.settings.allow_repeated_speaker
+            allow_repeated_speaker=self.settings.allow_repeated_speaker,
+            model_context=self._create_selector_context(),
+            selector_func=self.speculative_selector.select if self.speculative_selector else self.speaker_selector,
+            candidate_func=self.speaker_selector.candidates if self.speaker_selector else None
         )
         
         self.logger.info("Team initialized successfully")
     
-    def get_team(self) -> SelectorGroupChat:
+    def _create_model_context(self, agent_name: str) -> ChatCompletionContext:
+        """エージェントのモデルコンテキストを作成する（ウィンドウ0なら全履歴のコンテキスト）
+
+        チームを初期化するたびに新しいコンテキストを作るため、エージェントも作り直され、
+        前のチームの会話履歴は引き継がれない。
+        """
+        window = self.settings.get_agent_context_window(agent_name)
+        if window <= 0:
+            return UnboundedChatCompletionContext()
+        return RollingSummaryChatCompletionContext(
+            window_size=window,
+            summary_max_chars=self.settings.agent_context_summary_chars
+        )
+    
+    def _create_selector_context(self) -> Optional[SelectorHistoryChatCompletionContext]:
+        """スピーカー選択用のモデルコンテキストを作成する（0なら既定の全履歴コンテキスト）"""
+        if self.settings.selector_history_turns <= 0:
+            return None
+        return SelectorHistoryChatCompletionContext(recent_turns=self.settings.selector_history_turns)
+    
+    def get_team(self) -> Union[SelectorGroupChat, OrchestratedTeam]:
         """チームインスタンスを取得する"""
         if self.team is None:
             self._initialize_team()
         return self.team
     
+    async def prime_termination(self, chat_contexts: List[Dict[str, Any]], elapsed_time: float = 0.0) -> None:
+        """再開時に既存のメッセージと経過時間を終了条件に反映させる（チーム状態には終了条件が含まれないため）
+
+        ここでは停止を判定しない。中断前に上限に達していた場合は、再開後の最初のメッセージで
+        終了理由付きで停止する。
+        """
+        if self.termination_condition is None or not chat_contexts:
+            return
+        
+        messages = []
+        for context in chat_contexts:
+            usage = context.get("usage", {})
+            models_usage = None
+            if "prompt_tokens" in usage:
+                # トークン予算には中断前に消費したトークンも含める
+                models_usage = RequestUsage(
+                    prompt_tokens=usage["prompt_tokens"],
+                    completion_tokens=usage["completion_tokens"]
+                )
+            messages.append(TextMessage(source=context["source"], content=context["content"], models_usage=models_usage))
+        
+        await prime_conditions(self.termination_condition, messages, elapsed_time)
+    
     def get_agent(self, agent_name: str):
         """指定されたエージェントを取得する"""
         return self.agents.get(agent_name)
@@ -97,14 +221,42 @@ class TeamManager:
         """チームをリセットする"""
         self.logger.info("Resetting team")
         self.team = None
+        if self.speaker_selector is not None:
+            self.speaker_selector.reset_stats()
+        if self.speculation_group is not None:
+            self.speculation_group.reset()
         self._initialize_team()
     
+    async def reset_for_reuse(self) -> None:
+        """チームを作り直さずに AutoGen の reset で会話状態をリセットする（TeamPoolへの返却時）
+
+        エージェントのモデルコンテキスト、セレクターの状態、終了条件がリセットされる。
+        """
+        await self.get_team().reset()
+        if self.speaker_selector is not None:
+            self.speaker_selector.reset_stats()
+        if self.speculation_group is not None:
+            self.speculation_group.reset()
+    
     def get_team_info(self) -> Dict[str, Any]:
         """チーム情報を取得する"""
-        return {
+        info = {
+            'team_mode': self.settings.team_mode,
             'agent_count': len(self.agents),
             'agent_names': list(self.agents.keys()),
             'max_messages': self.settings.max_messages,
             'reflection_agent_max_count': self.settings.reflection_agent_max_count,
-            'allow_repeated_speaker': self.settings.allow_repeated_speaker
-        }
\ No newline at end of file
+            'session_token_budget': self.settings.session_token_budget,
+            'session_deadline_seconds': self.settings.session_deadline_seconds,
+            'allow_repeated_speaker': self.settings.allow_repeated_speaker,
+            'selector_history_turns': self.settings.selector_history_turns,
+            'agent_context_windows': {
+                agent_name: self.settings.get_agent_context_window(agent_name)
+                for agent_name in self.agents
+            }
+        }
+        if self.speaker_selector is not None:
+            info['speaker_selection'] = self.speaker_selector.get_stats()
+        if self.speculation_group is not None:
+            info['speculation'] = self.speculation_group.get_stats()
+        return info
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Team Pool - 構築済みのチームをセッション間で再利用するプール
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+from config.settings import Settings
+from core.client_manager import ClientManager
+from core.team_manager import TeamManager
+from utils.logging import get_logger
+
+
+class TeamPool:
+    """構築済みの TeamManager（エージェントとチーム）を貸し出し、返却時に AutoGen の reset でリセットして再利用するプール
+
+    AutoGenのチームは最初に実行したイベントループに紐づくため、貸し出すのは
+    未実行のチームか、同じイベントループで使われたチームに限る。
+    待機中のチームは max_size 件まで保持し、それを超えて返却されたチームは破棄する。
+    貸し出し中のチームが足りない場合は新たに構築する（呼び出し元を待たせない）。
+    """
+
+    def __init__(self, settings: Settings, client_manager: ClientManager, max_size: int = 4):
+        self.settings = settings
+        self.client_manager = client_manager
+        self.max_size = max_size
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+        self._idle: List[TeamManager] = []
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _build(self) -> TeamManager:
+        team_manager = TeamManager(self.settings, self.client_manager)
+        team_manager.bound_loop = None
+        with self._lock:
+            self.created += 1
+        return team_manager
+
+    def prewarm(self, count: int = 1) -> int:
+        """待機中のチームが count 件になるまで事前に構築し、構築した件数を返す"""
+        target = min(count, self.max_size)
+        built = 0
+        while True:
+            with self._lock:
+                if len(self._idle) >= target:
+                    return built
+            team_manager = self._build()
+            with self._lock:
+                self._idle.append(team_manager)
+            built += 1
+
+    def checkout(self) -> TeamManager:
+        """現在のイベントループで使えるチームを貸し出す（なければ構築する）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for team_manager in list(self._idle):
+                bound_loop = team_manager.bound_loop
+                if bound_loop is not None and bound_loop.is_closed():
+                    # 終了したイベントループに紐づくチームは再利用できない
+                    self._idle.remove(team_manager)
+                    self.discarded += 1
+                    continue
+                if bound_loop is None or bound_loop is loop:
+                    self._idle.remove(team_manager)
+                    self.reused += 1
+                    team_manager.bound_loop = loop
+                    return team_manager
+
+        team_manager = self._build()
+        team_manager.bound_loop = loop
+        return team_manager
+
+    async def checkin(self, team_manager: TeamManager) -> None:
+        """チームをリセットしてプールに戻す（リセットに失敗した場合や満杯の場合は破棄する）"""
+        try:
+            await team_manager.reset_for_reuse()
+        except Exception as e:
+            self.logger.warning(f"Discarding team that could not be reset: {e}")
+            with self._lock:
+                self.discarded += 1
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(team_manager)
+            else:
+                self.discarded += 1
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[TeamManager]:
+        """async with でチームを借りて、抜けるときに返却する"""
+        team_manager = self.checkout()
+        try:
+            yield team_manager
+        finally:
+            await self.checkin(team_manager)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの統計を取得する"""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded
+            }
@@ -0,0 +1,170 @@
+"""
+Usage Tracker - エージェント・ターン・セッション単位のトークン使用量集計
+"""
+
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import CreateResult, LLMMessage, RequestUsage
+from autogen_core.tools import Tool, ToolSchema
+from pydantic import BaseModel
+
+from core.client_wrappers import ChatCompletionClientWrapper
+
+
+SELECTOR_SOURCE = "selector"
+
+
+def _empty_usage() -> Dict[str, int]:
+    return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "calls": 0}
+
+
+def _add_usage(target: Dict[str, int], prompt_tokens: int, completion_tokens: int, calls: int = 1) -> None:
+    target["prompt_tokens"] += prompt_tokens
+    target["completion_tokens"] += completion_tokens
+    target["total_tokens"] += prompt_tokens + completion_tokens
+    target["calls"] += calls
+
+
+def _selected_name(selection: str) -> str:
+    """セレクターの応答から発言者名を取り出す（前後の空白・引用符・句読点は無視する）"""
+    return selection.strip().strip("\"'`.。")
+
+
+class UsageTracker:
+    """1セッション分のトークン使用量を集計するクラス
+
+    エージェントの使用量はメッセージの models_usage から、
+    セレクター（次の発言者の選択）の使用量は推論用クライアントのラッパーから記録する。
+    セレクター呼び出しはチームの出力ストリームとは非同期に行われるため、
+    応答が発言者名そのものである呼び出しを、その発言者のターンに対応付ける。
+    """
+
+    def __init__(self):
+        self._pending_selector: List[Tuple[str, RequestUsage]] = []
+        self._agents: Dict[str, Dict[str, int]] = {}
+        self._selector = _empty_usage()
+        self._turns = 0
+
+    def record_selector_call(self, usage: RequestUsage, selection: str = "") -> None:
+        """セレクター呼び出しの使用量を記録する"""
+        _add_usage(self._selector, usage.prompt_tokens, usage.completion_tokens)
+        self._pending_selector.append((selection, usage))
+
+    def _pop_selector_usage(self, source: str) -> Optional[RequestUsage]:
+        """発言者を選択したセレクター呼び出しを取り出す
+
+        それより前の未対応の呼び出し（選択をやり直した応答など）は以後どのターンにも
+        対応しないため破棄する（セレクター全体の使用量には記録済み）。
+        """
+        for index, (selection, usage) in enumerate(self._pending_selector):
+            if _selected_name(selection) == source:
+                del self._pending_selector[:index + 1]
+                return usage
+        return None
+
+    def record_message(self, source: str, usage: Optional[RequestUsage]) -> Dict[str, Any]:
+        """メッセージ1件分の使用量を記録し、そのターンの使用量を返す"""
+        self._turns += 1
+        turn: Dict[str, Any] = {}
+        if usage is not None:
+            turn["prompt_tokens"] = usage.prompt_tokens
+            turn["completion_tokens"] = usage.completion_tokens
+            _add_usage(self._agents.setdefault(source, _empty_usage()), usage.prompt_tokens, usage.completion_tokens)
+
+        selector_usage = self._pop_selector_usage(source)
+        if selector_usage is not None:
+            turn["selector_prompt_tokens"] = selector_usage.prompt_tokens
+            turn["selector_completion_tokens"] = selector_usage.completion_tokens
+        return turn
+
+    def restore(self, chat_contexts: List[Dict[str, Any]]) -> None:
+        """チャットコンテキストに記録されたターン別使用量から集計を復元する（再開時）"""
+        self.reset()
+        for context in chat_contexts:
+            self._turns += 1
+            turn = context.get("usage", {})
+            if "prompt_tokens" in turn:
+                agent_usage = self._agents.setdefault(context.get("source", "unknown"), _empty_usage())
+                _add_usage(agent_usage, turn["prompt_tokens"], turn["completion_tokens"])
+            if "selector_prompt_tokens" in turn:
+                _add_usage(self._selector, turn["selector_prompt_tokens"], turn["selector_completion_tokens"])
+
+    def reset(self) -> None:
+        """集計をリセットする"""
+        self._pending_selector.clear()
+        self._agents.clear()
+        self._selector = _empty_usage()
+        self._turns = 0
+
+    def get_summary(self) -> Dict[str, Any]:
+        """エージェント別・セレクター・セッション合計の使用量を取得する"""
+        total = _empty_usage()
+        for usage in list(self._agents.values()) + [self._selector]:
+            _add_usage(total, usage["prompt_tokens"], usage["completion_tokens"], usage["calls"])
+
+        return {
+            "total": total,
+            "agents": {source: dict(usage) for source, usage in self._agents.items()},
+            SELECTOR_SOURCE: dict(self._selector),
+            "turns": self._turns,
+            "average_tokens_per_turn": total["total_tokens"] / self._turns if self._turns else 0.0
+        }
+
+
+# 実行中のセッションのトラッカー（同一プロセスで複数セッションを並行実行しても混ざらない）
+current_usage_tracker: ContextVar[Optional[UsageTracker]] = ContextVar("current_usage_tracker", default=None)
+
+
+class UsageTrackingChatCompletionClient(ChatCompletionClientWrapper):
+    """呼び出しごとの使用量を実行中セッションのトラッカーに記録するクライアント（セレクター用）"""
+
+    def _record(self, result: CreateResult) -> None:
+        tracker = current_usage_tracker.get()
+        if tracker is not None:
+            selection = result.content if isinstance(result.content, str) else ""
+            tracker.record_selector_call(result.usage, selection)
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        result = await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+        self._record(result)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        async for chunk in self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._record(chunk)
+            yield chunk
@@ -7,14 +7,23 @@ import argparse
 import sys
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # 直接実行時の絶対インポート
+# AutoGen・OpenAI・Azure SDKを読み込むモジュールは、引数を解析して必要になった時点でインポートする
 from config.settings import Settings
-from core.session_manager import SessionManager
+from config.prompts import Prompts
+from core.job_queue import JobQueue
+from utils.lazy_imports import profile_imports, format_import_profile
 from utils.logging import setup_logging
 from utils.unicode_utils import ensure_utf8_encoding
 
+if TYPE_CHECKING:
+    from core.session_manager import SessionManager
+
+# --import-profile でモジュールを指定しない場合に計測する、セッション実行時に読み込むモジュール
+DEFAULT_PROFILE_MODULES = ["core.session_manager", "core.batch_runner", "core.client_pool"]
+
 # プロジェクトルートをPythonパスに追加（直接実行時）
 if __name__ == "__main__":
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -39,6 +48,40 @@ def parse_arguments():
         help="Interactive mode to input task"
     )
     
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="TASKS_JSONL",
+        help="Run every task in a JSONL file concurrently"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of concurrent sessions in batch mode"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="SESSION_ID",
+        help="Resume an interrupted session from its last checkpoint"
+    )
+    
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Submit --task/--batch to the job queue instead of running it"
+    )
+    
+    parser.add_argument(
+        "--priority",
+        type=int,
+        default=0,
+        help="Job priority for --enqueue (higher runs first)"
+    )
+    
     parser.add_argument(
         "--config",
         type=str,
@@ -60,6 +103,14 @@ def parse_arguments():
         help="Run health check and exit"
     )
     
+    parser.add_argument(
+        "--import-profile",
+        nargs="*",
+        metavar="MODULE",
+        help="Report per-module import time in a fresh interpreter and exit "
+             "(defaults to the modules a session run imports)"
+    )
+    
     return parser.parse_args()
 
 
@@ -73,6 +124,15 @@ async def main():
     
     # 引数の解析
     args = parse_arguments()
+    session_manager = None
+    
+    # インポート時間の計測（設定は不要）
+    if args.import_profile is not None:
+        modules = args.import_profile or DEFAULT_PROFILE_MODULES
+        records = profile_imports(modules, cwd=os.path.dirname(os.path.abspath(__file__)))
+        print(f"Import profile: {', '.join(modules)}")
+        print(format_import_profile(records))
+        return 0
     
     try:
         # 設定の読み込み
@@ -94,20 +154,43 @@ async def main():
         # コンソール出力のUnicodeエンコーディングを設定
         ensure_utf8_encoding()
         
-        # セッションマネージャーの初期化
-        session_manager = SessionManager(settings)
+        # ジョブキューへの投入（モデルクライアントは不要）
+        if args.enqueue:
+            from core.batch_runner import load_batch_tasks
+            
+            job_queue = JobQueue(settings.job_queue_path)
+            tasks = load_batch_tasks(args.batch) if args.batch else [{"task": args.task or Prompts.get_default_task()}]
+            for entry in tasks:
+                job_id = job_queue.enqueue(
+                    entry["task"],
+                    priority=args.priority,
+                    max_attempts=settings.job_max_attempts
+                )
+                print(f"Enqueued job {job_id}: {entry['task'][:60]}")
+            return 0
         
-        # ヘルスチェック
+        # ヘルスチェック（チームは構築しない）
         if args.health_check:
-            if await session_manager.health_check():
-                print("✅ Azure OpenAI connection OK")
-                print("✅ Configuration loaded successfully") 
-                print("✅ All systems operational")
-                return 0
-            else:
-                print("❌ System health check failed")
-                print("Please check your configuration and API keys")
-                return 1
+            return await _run_health_check(settings)
+        
+        # バッチモード（モデルクライアントとチームプールはBatchRunnerが作成して全タスクで共有する）
+        if args.batch:
+            from core.batch_runner import BatchRunner, load_batch_tasks, format_batch_report
+            
+            tasks = load_batch_tasks(args.batch)
+            print(f"Starting batch of {len(tasks)} tasks (concurrency={args.concurrency})...")
+            print("=" * 50)
+            
+            batch_runner = BatchRunner(settings, concurrency=args.concurrency)
+            report = await batch_runner.run(tasks)
+            
+            print("=" * 50)
+            print(format_batch_report(report))
+            return 0 if report["failed"] == 0 else 1
+        
+        # セッションマネージャーの初期化
+        from core.session_manager import SessionManager
+        session_manager = SessionManager(settings)
         
         # タスクの決定
         task = args.task
@@ -126,7 +209,10 @@ async def main():
         print("Starting AI Brainstorming Session...")
         print("=" * 50)
         
-        filename = await session_manager.run_session(task)
+        if args.resume:
+            filename = await session_manager.resume_session(args.resume)
+        else:
+            filename = await session_manager.run_session(task)
         
         print("=" * 50)
         print("Session completed successfully!")
@@ -135,16 +221,72 @@ async def main():
         stats = session_manager.get_session_stats()
         print(f"Total messages: {stats['total_messages']}")
         print(f"Execution time: {stats['execution_time']:.2f} seconds")
+        cache_stats = stats["process_client_stats"].get("chat", {}).get("response_cache")
+        if cache_stats:
+            print(
+                f"Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%}), {cache_stats['saved_tokens']} tokens saved"
+            )
+        for model_name, calls in stats["model_calls"].items():
+            if calls["retries"] or calls["timeouts"]:
+                print(
+                    f"Model calls ({model_name}): {calls['retries']} retries, "
+                    f"{calls['timeouts']} timeouts, {calls['failures']} failures"
+                )
         print(f"Results saved to: {filename}")
         
         return 0
         
     except KeyboardInterrupt:
         print("\nSession interrupted by user")
+        _print_resume_hint(session_manager)
         return 1
     except Exception as e:
         print(f"Error: {e}")
+        _print_resume_hint(session_manager)
         return 1
+    finally:
+        # 共有HTTP接続を閉じる（モデルクライアントを使った場合のみ）
+        client_pool = sys.modules.get("core.client_pool")
+        if client_pool is not None:
+            await client_pool.close_client_pool()
+
+
+async def _run_health_check(settings: Settings) -> int:
+    """生存確認と準備完了確認を実行し、チェックごとの結果を表示する"""
+    from core.health_probes import HealthProbes
+    
+    probes = HealthProbes(settings)
+    try:
+        liveness = await probes.liveness()
+        readiness = await probes.readiness()
+    finally:
+        await probes.close()
+    
+    print(f"✅ Liveness OK (event loop lag {liveness['event_loop_lag_ms']:.1f} ms)")
+    for name, check in readiness["checks"].items():
+        if check["skipped"]:
+            print(f"➖ {name}: skipped ({check['skipped']})")
+        elif check["ok"]:
+            print(f"✅ {name}: OK ({check['latency_ms']:.0f} ms)")
+        else:
+            optional = "" if check["required"] else " (optional)"
+            print(f"❌ {name}: {check['error']}{optional}")
+    
+    if readiness["ready"]:
+        print("✅ All systems operational")
+        return 0
+    print("❌ System health check failed")
+    print("Please check your configuration and API keys")
+    return 1
+
+
+def _print_resume_hint(session_manager: Optional["SessionManager"]) -> None:
+    """チェックポイントが残っている場合は再開方法を表示する"""
+    if session_manager is None or session_manager.session_id is None:
+        return
+    if session_manager.session_id in session_manager.checkpoint_manager.list_checkpoints():
+        print(f"Resume with: --resume {session_manager.session_id}")
 
 
 if __name__ == "__main__":
@@ -2,16 +2,57 @@
 Utils module - 共通ユーティリティ
 """
 
-from .logging import setup_logging
-from .file_utils import save_context, create_logs_dir, format_timestamp
-from .unicode_utils import safe_print
-from .agent_count_termination import AgentCountTermination
+from typing import TYPE_CHECKING
+
+from .lazy_imports import lazy_getattr
+
+# SDKの読み込みを初回利用時まで遅らせるため、各クラスは属性にアクセスした時点でインポートする
+_EXPORTS = {
+    "setup_logging": ".logging",
+    "save_context": ".file_utils",
+    "create_logs_dir": ".file_utils",
+    "format_timestamp": ".file_utils",
+    "TranscriptWriter": ".file_utils",
+    "safe_print": ".unicode_utils",
+    "AgentCountTermination": ".agent_count_termination",
+    "ConvergenceTermination": ".convergence_termination",
+    "TokenBudgetTermination": ".budget_termination",
+    "DeadlineTermination": ".budget_termination",
+    "PrimableTermination": ".termination_priming",
+    "prime_conditions": ".termination_priming",
+    "ContextArchive": ".context_archive",
+    "RollingSummaryChatCompletionContext": ".rolling_summary_context",
+    "SelectorHistoryChatCompletionContext": ".selector_history_context"
+}
+
+if TYPE_CHECKING:
+    from .logging import setup_logging
+    from .file_utils import save_context, create_logs_dir, format_timestamp, TranscriptWriter
+    from .unicode_utils import safe_print
+    from .agent_count_termination import AgentCountTermination
+    from .convergence_termination import ConvergenceTermination
+    from .budget_termination import TokenBudgetTermination, DeadlineTermination
+    from .termination_priming import PrimableTermination, prime_conditions
+    from .context_archive import ContextArchive
+    from .rolling_summary_context import RollingSummaryChatCompletionContext
+    from .selector_history_context import SelectorHistoryChatCompletionContext
+
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
 
 __all__ = [
     "setup_logging",
     "save_context",
     "create_logs_dir", 
     "format_timestamp",
+    "TranscriptWriter",
     "safe_print",
-    "AgentCountTermination"
+    "AgentCountTermination",
+    "ConvergenceTermination",
+    "TokenBudgetTermination",
+    "DeadlineTermination",
+    "PrimableTermination",
+    "prime_conditions",
+    "ContextArchive",
+    "RollingSummaryChatCompletionContext",
+    "SelectorHistoryChatCompletionContext"
 ]
\ No newline at end of file
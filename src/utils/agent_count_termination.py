@@ -6,13 +6,15 @@ from autogen_agentchat.messages import TextMessage, StopMessage
 from autogen_agentchat.base import TerminationCondition
 from pydantic import BaseModel
 
+from utils.termination_priming import PrimableTermination
+
 
 class AgentCountTerminationConfig(BaseModel):
     agent_name: str
     max_count: int = 1
 
 
-class AgentCountTermination(TerminationCondition):
+class AgentCountTermination(PrimableTermination, TerminationCondition):
     """
     指定のエージェントが max_count 以上発話した時点で会話を終了させる。
     """
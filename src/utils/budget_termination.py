@@ -0,0 +1,121 @@
+import time
+from typing import Sequence
+from typing_extensions import Self
+
+from autogen_agentchat.messages import BaseChatMessage, BaseAgentEvent
+from autogen_agentchat.messages import StopMessage
+from autogen_agentchat.base import TerminationCondition
+from pydantic import BaseModel
+
+from utils.termination_priming import PrimableTermination
+
+
+class TokenBudgetTerminationConfig(BaseModel):
+    max_total_tokens: int
+
+
+class TokenBudgetTermination(PrimableTermination, TerminationCondition):
+    """
+    メッセージの使用量（models_usage）のプロンプトトークンと完了トークンの累計が
+    max_total_tokens 以上になった時点で会話を終了させる。
+    """
+    def __init__(self, max_total_tokens: int):
+        self._max_total_tokens = max_total_tokens
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    @property
+    def total_tokens(self) -> int:
+        return self._prompt_tokens + self._completion_tokens
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            return None
+
+        for message in messages:
+            if message.models_usage is not None:
+                self._prompt_tokens += message.models_usage.prompt_tokens
+                self._completion_tokens += message.models_usage.completion_tokens
+
+        if self.total_tokens >= self._max_total_tokens:
+            self._terminated = True
+            return StopMessage(
+                content=f"Token budget exceeded: {self.total_tokens} tokens "
+                        f"(prompt {self._prompt_tokens}, completion {self._completion_tokens}) >= {self._max_total_tokens}.",
+                source="TokenBudgetTermination"
+            )
+
+        return None
+
+    async def reset(self) -> None:
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._terminated = False
+
+    def _to_config(self) -> TokenBudgetTerminationConfig:
+        return TokenBudgetTerminationConfig(max_total_tokens=self._max_total_tokens)
+
+    @classmethod
+    def _from_config(cls, config: TokenBudgetTerminationConfig) -> Self:
+        return cls(max_total_tokens=config.max_total_tokens)
+
+
+class DeadlineTerminationConfig(BaseModel):
+    deadline_seconds: float
+
+
+class DeadlineTermination(PrimableTermination, TerminationCondition):
+    """
+    最初のメッセージ（タスク）を受け取ってから deadline_seconds 秒経過した後の
+    最初のメッセージで会話を終了させる。
+    再開時は prime に中断前の経過時間を渡すと、その分だけ期限が進んだ状態から数える。
+    判定はメッセージ受信時に行うため、応答待ちの時間はモデル呼び出しのタイムアウトで制限すること。
+    """
+    def __init__(self, deadline_seconds: float):
+        self._deadline_seconds = deadline_seconds
+        self._started_at: float | None = None
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            return None
+
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+            return None
+
+        elapsed = now - self._started_at
+        if elapsed >= self._deadline_seconds:
+            self._terminated = True
+            return StopMessage(
+                content=f"Deadline exceeded: {elapsed:.1f}s >= {self._deadline_seconds}s.",
+                source="DeadlineTermination"
+            )
+
+        return None
+
+    async def prime(self, messages: Sequence[BaseAgentEvent | BaseChatMessage], elapsed_time: float = 0.0) -> None:
+        """再開時に中断前の経過時間を反映させる（停止は判定せず、次のメッセージで判定する）"""
+        self._started_at = time.monotonic() - elapsed_time
+        self._terminated = False
+
+    async def reset(self) -> None:
+        self._started_at = None
+        self._terminated = False
+
+    def _to_config(self) -> DeadlineTerminationConfig:
+        return DeadlineTerminationConfig(deadline_seconds=self._deadline_seconds)
+
+    @classmethod
+    def _from_config(cls, config: DeadlineTerminationConfig) -> Self:
+        return cls(deadline_seconds=config.deadline_seconds)
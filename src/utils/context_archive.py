@@ -0,0 +1,160 @@
+"""
+Context Archive - コンテキストログの圧縮アーカイブ
+"""
+
+import json
+import mmap
+import os
+import zlib
+from typing import List, Dict, Any, Optional
+
+from utils.file_utils import create_logs_dir, format_timestamp, iter_context, read_context_footer
+
+
+INDEX_FILENAME = "index.jsonl"
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".zseg"
+
+
+class ContextArchive:
+    """多数のセッションを圧縮セグメントファイルにまとめて保存するアーカイブ
+
+    セッションごとに独立してzlib圧縮したブロックをセグメントファイルに追記し、
+    セッション名 → (セグメント, オフセット, 長さ) のインデックスを持つ。
+    読み込み時は該当ブロックだけをmmap経由で切り出して展開するため、
+    他のセッションを展開する必要はない。書き込みは単一プロセスから行うこと。
+    """
+
+    def __init__(
+        self,
+        directory: str = "logs/archive",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        compression_level: int = 6
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+        self._index: Dict[str, Dict[str, Any]] = {}
+
+        create_logs_dir(directory)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """インデックスファイルを読み込む"""
+        index_path = os.path.join(self.directory, INDEX_FILENAME)
+        if not os.path.exists(index_path):
+            return
+
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断された最終行は無視する
+                    continue
+                self._index[entry["name"]] = entry
+
+    def _segment_path(self, segment: str) -> str:
+        """セグメントファイルのパスを返す"""
+        return os.path.join(self.directory, segment)
+
+    def _current_segment(self, incoming_bytes: int) -> str:
+        """書き込み先のセグメントを決定する（上限を超える場合は新しいセグメント）"""
+        segments = sorted(
+            f for f in os.listdir(self.directory)
+            if f.startswith(SEGMENT_PREFIX) and f.endswith(SEGMENT_SUFFIX)
+        )
+        if segments:
+            latest = segments[-1]
+            size = os.path.getsize(self._segment_path(latest))
+            if size == 0 or size + incoming_bytes <= self.max_segment_bytes:
+                return latest
+            number = int(latest[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+        else:
+            number = 1
+        return f"{SEGMENT_PREFIX}{number:05d}{SEGMENT_SUFFIX}"
+
+    def add_session(
+        self,
+        name: str,
+        messages: List[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """セッションをアーカイブに追加し、インデックスエントリを返す"""
+        if name in self._index:
+            raise ValueError(f"Session already archived: {name}")
+
+        raw = json.dumps(messages, ensure_ascii=False, default=str).encode("utf-8")
+        block = zlib.compress(raw, self.compression_level)
+
+        segment = self._current_segment(len(block))
+        segment_path = self._segment_path(segment)
+        with open(segment_path, "ab") as f:
+            offset = f.tell()
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+
+        entry = {
+            "name": name,
+            "segment": segment,
+            "offset": offset,
+            "length": len(block),
+            "raw_size": len(raw),
+            "message_count": len(messages),
+            "archived_at": format_timestamp()
+        }
+        if metadata:
+            entry["metadata"] = metadata
+
+        # ブロックを書き終えてからインデックスに追記する（途中で落ちても不整合にならない）
+        with open(os.path.join(self.directory, INDEX_FILENAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+        self._index[name] = entry
+        return entry
+
+    def get_session(self, name: str) -> List[Dict[str, Any]]:
+        """セッションのメッセージを読み込む"""
+        entry = self._index.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"Session not found in archive: {name}")
+
+        with open(self._segment_path(entry["segment"]), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                block = mapped[entry["offset"]:entry["offset"] + entry["length"]]
+
+        return json.loads(zlib.decompress(block).decode("utf-8"))
+
+    def contains(self, name: str) -> bool:
+        """セッションがアーカイブ済みかどうか"""
+        return name in self._index
+
+    def list_sessions(self) -> List[str]:
+        """アーカイブ済みセッション名の一覧を取得（新しい順）"""
+        return sorted(self._index.keys(), reverse=True)
+
+    def get_entry(self, name: str) -> Optional[Dict[str, Any]]:
+        """セッションのインデックスエントリを取得する"""
+        return self._index.get(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """アーカイブの統計を取得する"""
+        raw_bytes = sum(entry["raw_size"] for entry in self._index.values())
+        stored_bytes = sum(entry["length"] for entry in self._index.values())
+        return {
+            "sessions": len(self._index),
+            "segments": len({entry["segment"] for entry in self._index.values()}),
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "compression_ratio": raw_bytes / stored_bytes if stored_bytes else 0.0
+        }
+
+    def archive_file(self, filename: str, log_directory: str = "logs") -> Dict[str, Any]:
+        """既存のコンテキストファイル（JSON/JSONL）をアーカイブに追加する"""
+        messages = list(iter_context(filename, log_directory))
+        metadata = read_context_footer(filename, log_directory)
+        return self.add_session(filename, messages, metadata)
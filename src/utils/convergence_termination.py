@@ -0,0 +1,126 @@
+import re
+from collections import deque
+from typing import Deque, FrozenSet, Sequence
+from typing_extensions import Self
+
+from autogen_agentchat.messages import BaseChatMessage, BaseAgentEvent
+from autogen_agentchat.messages import TextMessage, StopMessage
+from autogen_agentchat.base import TerminationCondition
+from pydantic import BaseModel
+
+from utils.termination_priming import PrimableTermination
+
+
+# 空白と句読点は類似度の計算に含めない
+_IGNORED_CHARACTERS = re.compile(r"[\s、。，．,.!?！？・「」『』（）()\[\]【】:：;；\-—*#]+")
+
+
+def shingles(text: str, size: int = 3) -> FrozenSet[int]:
+    """テキストを文字 n-gram（シングル）のハッシュ値の集合に変換する"""
+    normalized = _IGNORED_CHARACTERS.sub("", text)
+    if len(normalized) <= size:
+        return frozenset([hash(normalized)]) if normalized else frozenset()
+    return frozenset(map(hash, (normalized[i:i + size] for i in range(len(normalized) - size + 1))))
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class ConvergenceTerminationConfig(BaseModel):
+    novelty_threshold: float = 0.2
+    window_size: int = 6
+    patience: int = 3
+    shingle_size: int = 3
+    reset_source: str | None = "reflection_agent"
+
+
+class ConvergenceTermination(PrimableTermination, TerminationCondition):
+    """
+    新しい発言と直近 window_size 件の発言とのシングル類似度（Jaccard）から新規性（1 - 最大類似度）を求め、
+    新規性が novelty_threshold 未満の発言が patience 回続いたら会話が収束したとみなして終了させる。
+    reset_source の発言（新しいトピックの開始）でウィンドウと連続回数をリセットする。
+    """
+    def __init__(
+        self,
+        novelty_threshold: float = 0.2,
+        window_size: int = 6,
+        patience: int = 3,
+        shingle_size: int = 3,
+        reset_source: str | None = "reflection_agent"
+    ):
+        self._novelty_threshold = novelty_threshold
+        self._window_size = window_size
+        self._patience = patience
+        self._shingle_size = shingle_size
+        self._reset_source = reset_source
+        self._window: Deque[FrozenSet[int]] = deque(maxlen=window_size)
+        self._low_novelty_count = 0
+        self._last_novelty = 1.0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    @property
+    def last_novelty(self) -> float:
+        return self._last_novelty
+
+    def _novelty(self, message_shingles: FrozenSet[int]) -> float:
+        if not self._window:
+            return 1.0
+        return 1.0 - max(jaccard(message_shingles, previous) for previous in self._window)
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            return None
+
+        for message in messages:
+            if not isinstance(message, TextMessage) or message.source == "user":
+                continue
+
+            message_shingles = shingles(message.content, self._shingle_size)
+            if message.source == self._reset_source:
+                self._window.clear()
+                self._low_novelty_count = 0
+                self._window.append(message_shingles)
+                continue
+
+            self._last_novelty = self._novelty(message_shingles)
+            self._window.append(message_shingles)
+            if self._last_novelty < self._novelty_threshold:
+                self._low_novelty_count += 1
+            else:
+                self._low_novelty_count = 0
+
+            if self._low_novelty_count >= self._patience:
+                self._terminated = True
+                return StopMessage(
+                    content=f"Conversation converged: novelty below {self._novelty_threshold} for {self._low_novelty_count} consecutive messages.",
+                    source="ConvergenceTermination"
+                )
+
+        return None
+
+    async def reset(self) -> None:
+        self._window.clear()
+        self._low_novelty_count = 0
+        self._last_novelty = 1.0
+        self._terminated = False
+
+    def _to_config(self) -> ConvergenceTerminationConfig:
+        return ConvergenceTerminationConfig(
+            novelty_threshold=self._novelty_threshold,
+            window_size=self._window_size,
+            patience=self._patience,
+            shingle_size=self._shingle_size,
+            reset_source=self._reset_source
+        )
+
+    @classmethod
+    def _from_config(cls, config: ConvergenceTerminationConfig) -> Self:
+        return cls(**config.model_dump())
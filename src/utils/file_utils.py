@@ -2,13 +2,23 @@
 File Utils - ファイル操作ユーティリティ
 """
 
+import asyncio
 import os
 import json
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 
 
+# JSONLトランスクリプトの最終行（フッター）を示すキー
+TRANSCRIPT_FOOTER_KEY = "__footer__"
+
+# ログディレクトリ内のアーカイブの置き場所
+ARCHIVE_DIRNAME = "archive"
+
+
 def format_timestamp(dt: datetime = None) -> str:
     """統一されたタイムスタンプ形式を返す"""
     if dt is None:
@@ -28,44 +38,227 @@ def save_context(chat_contexts: List[Dict[str, Any]], log_directory: str = "logs
     filename = datetime.now().strftime("context_%Y%m%d_%H%M%S.json")
     filepath = os.path.join(log_directory, filename)
     
+    # 同一秒に複数セッションが終了した場合は連番を付けて上書きを防ぐ
+    suffix = 1
+    while os.path.exists(filepath):
+        filename = datetime.now().strftime(f"context_%Y%m%d_%H%M%S_{suffix}.json")
+        filepath = os.path.join(log_directory, filename)
+        suffix += 1
+    
     with open(filepath, "w", encoding="utf-8") as f:
         json.dump(chat_contexts, f, ensure_ascii=False, indent=2, default=str)
     
     return filename
 
 
-def load_context(filename: str, log_directory: str = "logs") -> List[Dict[str, Any]]:
-    """JSONファイルからチャットコンテキストを読み込む"""
+class TranscriptWriter:
+    """チャットコンテキストを1メッセージ1行のJSONLとして追記するライター
+
+    セッション開始時に開き、メッセージを受信するたびに追記する。
+    追記した行はメモリに溜め、flush_interval件またはflush_seconds秒ごとにディスクへ書き出し、
+    close()で件数などを記録したフッター行を書き込む。
+    イベントループ上では append_async / close_async を使うと、書き出しとfsyncを別スレッドで行う。
+    """
+    
+    def __init__(
+        self,
+        log_directory: str = "logs",
+        filename: Optional[str] = None,
+        flush_interval: int = 5,
+        flush_seconds: float = 2.0
+    ):
+        create_logs_dir(log_directory)
+        
+        if filename is None:
+            filename = datetime.now().strftime("context_%Y%m%d_%H%M%S.jsonl")
+            suffix = 1
+            while os.path.exists(os.path.join(log_directory, filename)):
+                filename = datetime.now().strftime(f"context_%Y%m%d_%H%M%S_{suffix}.jsonl")
+                suffix += 1
+        
+        self.filename = filename
+        self.filepath = os.path.join(log_directory, filename)
+        self.flush_interval = flush_interval
+        self.flush_seconds = flush_seconds
+        self.message_count = 0
+        self.agent_message_counts: Dict[str, int] = {}
+        
+        self._file = open(self.filepath, "w", encoding="utf-8")
+        self._lines: List[str] = []
+        self._buffer_lock = threading.Lock()  # 追記と書き出し中の入れ替えを保護する
+        self._write_lock = threading.Lock()  # ファイルへの書き込みを1スレッドずつにする
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._started_at = format_timestamp()
+    
+    def _buffer(self, chat_context: Dict[str, Any]) -> bool:
+        """メッセージをバッファに追加し、書き出すべきかを返す"""
+        line = json.dumps(chat_context, ensure_ascii=False, default=str) + "\n"
+        with self._buffer_lock:
+            self._lines.append(line)
+            self._pending += 1
+            pending = self._pending
+        
+        self.message_count += 1
+        source = chat_context.get("source", "unknown")
+        self.agent_message_counts[source] = self.agent_message_counts.get(source, 0) + 1
+        return pending >= self.flush_interval or time.monotonic() - self._last_flush >= self.flush_seconds
+    
+    def append(self, chat_context: Dict[str, Any]) -> None:
+        """メッセージを1行追記する"""
+        if self._buffer(chat_context):
+            self.flush()
+    
+    async def append_async(self, chat_context: Dict[str, Any]) -> None:
+        """メッセージを1行追記する（ディスクへの書き出しは別スレッドで行う）"""
+        if self._buffer(chat_context):
+            await asyncio.to_thread(self.flush)
+    
+    def flush(self) -> None:
+        """バッファ済みのメッセージをディスクへ書き出す"""
+        with self._write_lock:
+            with self._buffer_lock:
+                lines, self._lines = self._lines, []
+                self._pending = 0
+                self._last_flush = time.monotonic()
+            if lines:
+                self._file.write("".join(lines))
+            self._file.flush()
+    
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> str:
+        """フッターを書き込んでファイルを閉じ、ファイル名を返す"""
+        if self._file.closed:
+            return self.filename
+        
+        footer = {
+            "message_count": self.message_count,
+            "agent_message_counts": self.agent_message_counts,
+            "started_at": self._started_at,
+            "completed_at": format_timestamp()
+        }
+        if extra:
+            footer.update(extra)
+        
+        with self._buffer_lock:
+            self._lines.append(json.dumps({TRANSCRIPT_FOOTER_KEY: footer}, ensure_ascii=False, default=str) + "\n")
+        self.flush()
+        with self._write_lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        return self.filename
+    
+    async def close_async(self, extra: Optional[Dict[str, Any]] = None) -> str:
+        """close と同じ（書き出しとfsyncは別スレッドで行う）"""
+        return await asyncio.to_thread(self.close, extra)
+    
+    def abort(self) -> None:
+        """フッターを書かずにファイルを閉じる（異常終了時）"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def iter_context(filename: str, log_directory: str = "logs") -> Iterator[Dict[str, Any]]:
+    """コンテキストファイルのメッセージを1件ずつ読み込む（JSONLは行単位で遅延読み込み）"""
     filepath = os.path.join(log_directory, filename)
     
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Context file not found: {filepath}")
     
+    if not filename.endswith(".jsonl"):
+        # 旧形式（JSON配列）は一括で読み込む
+        with open(filepath, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    
     with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 異常終了時に書きかけだった最終行は無視する
+                continue
+            if TRANSCRIPT_FOOTER_KEY in record:
+                continue
+            yield record
+
+
+def load_context(filename: str, log_directory: str = "logs") -> List[Dict[str, Any]]:
+    """JSON/JSONLファイルからチャットコンテキストを読み込む（アーカイブ済みの場合はアーカイブから）"""
+    if os.path.exists(os.path.join(log_directory, filename)):
+        return list(iter_context(filename, log_directory))
+    
+    archive_directory = os.path.join(log_directory, ARCHIVE_DIRNAME)
+    if os.path.exists(archive_directory):
+        from utils.context_archive import ContextArchive
+        archive = ContextArchive(archive_directory)
+        if archive.contains(filename):
+            return archive.get_session(filename)
+    
+    raise FileNotFoundError(f"Context file not found: {os.path.join(log_directory, filename)}")
+
+
+def read_context_footer(filename: str, log_directory: str = "logs") -> Optional[Dict[str, Any]]:
+    """JSONLトランスクリプトのフッターをファイル末尾だけ読んで取得する
+
+    フッターがない（旧形式、または異常終了した）場合はNoneを返す。
+    """
+    filepath = os.path.join(log_directory, filename)
+    if not filename.endswith(".jsonl") or not os.path.exists(filepath):
+        return None
+    
+    with open(filepath, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        # フッターは小さいため末尾の数KBだけを読む
+        f.seek(max(0, size - 8192))
+        tail = f.read().decode("utf-8", errors="ignore")
+    
+    lines = [line for line in tail.splitlines() if line.strip()]
+    if not lines:
+        return None
+    
+    try:
+        record = json.loads(lines[-1])
+    except json.JSONDecodeError:
+        return None
+    return record.get(TRANSCRIPT_FOOTER_KEY)
 
 
 def list_context_files(log_directory: str = "logs") -> List[str]:
-    """ログディレクトリ内のコンテキストファイル一覧を取得"""
+    """ログディレクトリ内のコンテキストファイル一覧を取得（ファイル内容は読み込まない）"""
     if not os.path.exists(log_directory):
         return []
     
-    files = [f for f in os.listdir(log_directory) if f.startswith("context_") and f.endswith(".json")]
+    files = [
+        f for f in os.listdir(log_directory)
+        if f.startswith("context_") and (f.endswith(".json") or f.endswith(".jsonl"))
+    ]
     return sorted(files, reverse=True)  # 新しいファイルが先頭に来るように
 
 
-def cleanup_old_contexts(log_directory: str = "logs", keep_count: int = 10) -> None:
-    """古いコンテキストファイルを削除する"""
+def cleanup_old_contexts(log_directory: str = "logs", keep_count: int = 10, archive: bool = False) -> None:
+    """古いコンテキストファイルを削除する（archive=Trueの場合はアーカイブしてから削除）"""
     context_files = list_context_files(log_directory)
     
     if len(context_files) <= keep_count:
         return
     
+    context_archive = None
+    if archive:
+        from utils.context_archive import ContextArchive
+        context_archive = ContextArchive(os.path.join(log_directory, ARCHIVE_DIRNAME))
+    
     files_to_delete = context_files[keep_count:]
     for filename in files_to_delete:
         filepath = os.path.join(log_directory, filename)
         try:
+            if context_archive is not None and not context_archive.contains(filename):
+                context_archive.archive_file(filename, log_directory)
             os.remove(filepath)
             print(f"Removed old context file: {filename}")
-        except OSError as e:
-            print(f"Error removing file {filename}: {e}")
\ No newline at end of file
+        except (OSError, ValueError) as e:
+            print(f"Error removing file {filename}: {e}")
@@ -0,0 +1,72 @@
+"""
+Lazy Imports - パッケージの再エクスポートを初回利用時までインポートしない仕組みとインポート時間の計測
+"""
+
+import importlib
+import re
+import subprocess
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def lazy_getattr(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """パッケージの __getattr__ (PEP 562) として使う関数を作成する
+
+    exports は公開名から相対モジュール名への対応。属性に初めてアクセスした時点で
+    モジュールをインポートし、以降は通常の属性として参照されるようパッケージに設定する。
+    """
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def profile_imports(modules: Sequence[str], cwd: Optional[str] = None) -> List[Dict[str, Any]]:
+    """新しいPythonプロセスで modules をインポートし、モジュールごとのインポート時間を返す
+
+    -X importtime の出力を解析し、各モジュールの自身の時間と依存を含む累積時間（ミリ秒）、
+    インポートの深さを、インポートが完了した順に返す。
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import failed: {completed.stderr.strip().splitlines()[-1:]}")
+
+    records = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        records.append({
+            "module": name,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2
+        })
+    return records
+
+
+def format_import_profile(records: List[Dict[str, Any]], top: int = 20) -> str:
+    """インポート時間の計測結果を、トップレベルの合計と累積時間の大きいモジュールの一覧に整形する"""
+    total_ms = sum(record["cumulative_ms"] for record in records if record["depth"] == 0)
+    slowest = sorted(records, key=lambda record: record["cumulative_ms"], reverse=True)[:top]
+
+    lines = [f"Total import time: {total_ms:.1f} ms ({len(records)} modules)"]
+    lines.append(f"{'cumulative':>12} {'self':>10}  module")
+    for record in slowest:
+        lines.append(f"{record['cumulative_ms']:>10.1f}ms {record['self_ms']:>8.1f}ms  {record['module']}")
+    return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+Rolling Summary Context - 古い発言を要約行に畳み込むエージェント用のモデルコンテキスト
+"""
+
+from typing import Any, List, Mapping
+from typing_extensions import Self
+
+from autogen_core import Component
+from autogen_core.model_context import ChatCompletionContext, ChatCompletionContextState
+from autogen_core.models import FunctionExecutionResultMessage, LLMMessage, UserMessage
+from pydantic import BaseModel
+
+
+SUMMARY_SOURCE = "conversation_summary"
+
+
+class RollingSummaryChatCompletionContextConfig(BaseModel):
+    window_size: int
+    summary_max_chars: int = 1500
+    line_max_chars: int = 80
+    keep_first: bool = True
+    initial_messages: List[LLMMessage] | None = None
+
+
+class RollingSummaryChatCompletionContextState(ChatCompletionContextState):
+    first_message: LLMMessage | None = None
+    summary_lines: List[str] = []
+
+
+class RollingSummaryChatCompletionContext(ChatCompletionContext, Component[RollingSummaryChatCompletionContextConfig]):
+    """
+    直近 window_size 件のメッセージをそのまま残し、それより古いメッセージは要約行に畳み込む。
+    要約はウィンドウから外れたメッセージだけを1行ずつ追記して更新し（毎ターン作り直さない）、
+    summary_max_chars を超えたら古い行から捨てる。要約はローカルで作るためモデル呼び出しは発生しない。
+    keep_first=True の場合は最初のメッセージ（タスク）を常に残す。
+    """
+
+    component_config_schema = RollingSummaryChatCompletionContextConfig
+    component_provider_override = "utils.rolling_summary_context.RollingSummaryChatCompletionContext"
+
+    def __init__(
+        self,
+        window_size: int,
+        summary_max_chars: int = 1500,
+        line_max_chars: int = 80,
+        keep_first: bool = True,
+        initial_messages: List[LLMMessage] | None = None
+    ) -> None:
+        super().__init__(initial_messages)
+        if window_size <= 0:
+            raise ValueError("window_size must be greater than 0.")
+        self._window_size = window_size
+        self._summary_max_chars = summary_max_chars
+        self._line_max_chars = line_max_chars
+        self._keep_first = keep_first
+        self._first_message: LLMMessage | None = None
+        self._summary_lines: List[str] = []
+
+    async def add_message(self, message: LLMMessage) -> None:
+        if self._keep_first and self._first_message is None and not self._messages:
+            self._first_message = message
+            return
+        self._messages.append(message)
+        self._fold()
+
+    def _fold(self) -> None:
+        """ウィンドウから外れたメッセージを要約行に畳み込み、保持しているメッセージから取り除く"""
+        overflow = len(self._messages) - self._window_size
+        if overflow <= 0:
+            return
+
+        for message in self._messages[:overflow]:
+            line = self._summarize_message(message)
+            if line:
+                self._summary_lines.append(line)
+        self._messages = self._messages[overflow:]
+
+        total = sum(len(line) + 1 for line in self._summary_lines)
+        while self._summary_lines and total > self._summary_max_chars:
+            total -= len(self._summary_lines.pop(0)) + 1
+
+    def _summarize_message(self, message: LLMMessage) -> str:
+        """メッセージを「発言者: 最初の一文」の1行に要約する"""
+        if not isinstance(message.content, str):
+            return ""
+        text = " ".join(message.content.split())
+        for delimiter in ("。", "！", "？", ". "):
+            index = text.find(delimiter)
+            if 0 <= index < self._line_max_chars:
+                text = text[:index + len(delimiter)].strip()
+                break
+        if len(text) > self._line_max_chars:
+            text = text[:self._line_max_chars] + "…"
+        source = getattr(message, "source", None) or "assistant"
+        return f"- {source}: {text}"
+
+    async def get_messages(self) -> List[LLMMessage]:
+        messages: List[LLMMessage] = []
+        if self._first_message is not None:
+            messages.append(self._first_message)
+        if self._summary_lines:
+            messages.append(UserMessage(
+                content="これまでの議論の要約（古い発言）:\n" + "\n".join(self._summary_lines),
+                source=SUMMARY_SOURCE
+            ))
+
+        recent = list(self._messages)
+        # 関数実行結果だけが先頭に残る場合は取り除く
+        if recent and isinstance(recent[0], FunctionExecutionResultMessage):
+            recent = recent[1:]
+        return messages + recent
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._first_message = None
+        self._summary_lines = []
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return RollingSummaryChatCompletionContextState(
+            messages=self._messages,
+            first_message=self._first_message,
+            summary_lines=self._summary_lines
+        ).model_dump()
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        loaded = RollingSummaryChatCompletionContextState.model_validate(state)
+        self._messages = loaded.messages
+        self._first_message = loaded.first_message
+        self._summary_lines = loaded.summary_lines
+
+    def _to_config(self) -> RollingSummaryChatCompletionContextConfig:
+        return RollingSummaryChatCompletionContextConfig(
+            window_size=self._window_size,
+            summary_max_chars=self._summary_max_chars,
+            line_max_chars=self._line_max_chars,
+            keep_first=self._keep_first,
+            initial_messages=self._initial_messages
+        )
+
+    @classmethod
+    def _from_config(cls, config: RollingSummaryChatCompletionContextConfig) -> Self:
+        return cls(**config.model_dump())
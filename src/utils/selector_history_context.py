@@ -0,0 +1,194 @@
+"""
+Selector History Context - スピーカー選択用に履歴を直近の発言と立場のダイジェストに圧縮するモデルコンテキスト
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping
+from typing_extensions import Self
+
+from autogen_core import Component
+from autogen_core.model_context import ChatCompletionContext, ChatCompletionContextState
+from autogen_core.models import LLMMessage, UserMessage
+from pydantic import BaseModel
+
+
+DIGEST_SOURCE = "stance_digest"
+
+STANCE_AGREE = "agree"
+STANCE_DISAGREE = "disagree"
+STANCE_NEW_IDEA = "new_idea"
+STANCE_NEUTRAL = "neutral"
+
+STANCE_LABELS = {
+    STANCE_AGREE: "賛成",
+    STANCE_DISAGREE: "反対・懸念",
+    STANCE_NEW_IDEA: "新しいアイデア",
+    STANCE_NEUTRAL: "中立",
+}
+
+# 同数の場合は先に並んでいる立場を優先する
+STANCE_KEYWORDS = {
+    STANCE_DISAGREE: ("反対", "懸念", "リスク", "課題", "難しい", "疑問", "問題", "不安"),
+    STANCE_AGREE: ("賛成", "同意", "同感", "賛同", "支持", "良い", "いいですね", "素晴らしい"),
+    STANCE_NEW_IDEA: ("提案", "アイデア", "新た", "新しい", "別の", "加えて", "さらに"),
+}
+
+
+def classify_stance(text: str) -> str:
+    """発言の立場（賛成・反対・新しいアイデア・中立）をキーワードで判定する"""
+    best, best_hits = STANCE_NEUTRAL, 0
+    for stance, keywords in STANCE_KEYWORDS.items():
+        hits = sum(text.count(keyword) for keyword in keywords)
+        if hits > best_hits:
+            best, best_hits = stance, hits
+    return best
+
+
+class SelectorHistoryChatCompletionContextConfig(BaseModel):
+    recent_turns: int = 6
+    stance_window: int = 3
+    reset_speaker: str | None = "reflection_agent"
+    initial_messages: List[LLMMessage] | None = None
+
+
+class SelectorHistoryChatCompletionContextState(ChatCompletionContextState):
+    first_message: LLMMessage | None = None
+    stances: Dict[str, List[str]] = {}
+    turn_counts: Dict[str, int] = {}
+    last_turns: Dict[str, int] = {}
+    turn: int = 0
+    agree_streak: int = 0
+
+
+class SelectorHistoryChatCompletionContext(ChatCompletionContext, Component[SelectorHistoryChatCompletionContextConfig]):
+    """
+    SelectorGroupChat のスピーカー選択用に会話履歴を圧縮するモデルコンテキスト。
+    タスクと直近 recent_turns 件の発言に加え、エージェントごとの発言回数・直近の立場・
+    最終発言からのターン数と連続した賛成の数をまとめたダイジェストを返す。
+    ダイジェストはメッセージ追加時にローカルで更新するため、選択プロンプトの長さはターン数に依存しない。
+    reset_speaker の発言（新しいトピックの開始）で連続した賛成の数をリセットする。
+    """
+
+    component_config_schema = SelectorHistoryChatCompletionContextConfig
+    component_provider_override = "utils.selector_history_context.SelectorHistoryChatCompletionContext"
+
+    def __init__(
+        self,
+        recent_turns: int = 6,
+        stance_window: int = 3,
+        reset_speaker: str | None = "reflection_agent",
+        initial_messages: List[LLMMessage] | None = None
+    ) -> None:
+        super().__init__(initial_messages)
+        if recent_turns <= 0:
+            raise ValueError("recent_turns must be greater than 0.")
+        self._recent_turns = recent_turns
+        self._stance_window = stance_window
+        self._reset_speaker = reset_speaker
+        self._first_message: LLMMessage | None = None
+        self._stances: Dict[str, Deque[str]] = {}
+        self._turn_counts: Dict[str, int] = {}
+        self._last_turns: Dict[str, int] = {}
+        self._turn = 0
+        self._agree_streak = 0
+
+    async def add_message(self, message: LLMMessage) -> None:
+        if self._first_message is None and not self._messages and self._turn == 0:
+            self._first_message = message
+            return
+
+        self._turn += 1
+        self._record_stance(message)
+        self._messages.append(message)
+        if len(self._messages) > self._recent_turns:
+            self._messages = self._messages[-self._recent_turns:]
+
+    def _record_stance(self, message: LLMMessage) -> None:
+        source = getattr(message, "source", None)
+        if not source or not isinstance(message.content, str):
+            return
+
+        self._turn_counts[source] = self._turn_counts.get(source, 0) + 1
+        self._last_turns[source] = self._turn
+
+        if source == self._reset_speaker:
+            self._agree_streak = 0
+            return
+
+        stance = classify_stance(message.content)
+        self._stances.setdefault(source, deque(maxlen=self._stance_window)).append(stance)
+        self._agree_streak = self._agree_streak + 1 if stance == STANCE_AGREE else 0
+
+    @property
+    def agree_streak(self) -> int:
+        """直近で連続した賛成の発言数"""
+        return self._agree_streak
+
+    def build_digest(self) -> str:
+        """エージェントごとの立場のダイジェストを作成する"""
+        lines = []
+        for source, count in self._turn_counts.items():
+            line = f"- {source}: 発言{count}回, 最終発言は{self._turn - self._last_turns[source] + 1}ターン前"
+            stances = self._stances.get(source)
+            if stances:
+                line += ", 直近の立場: " + "→".join(STANCE_LABELS[stance] for stance in stances)
+            lines.append(line)
+        lines.append(f"- 連続した賛成意見: {self._agree_streak}回")
+        return "\n".join(lines)
+
+    async def get_messages(self) -> List[LLMMessage]:
+        messages: List[LLMMessage] = []
+        if self._first_message is not None:
+            messages.append(self._first_message)
+        if self._turn > len(self._messages):
+            # 直近の発言だけでは足りない分をダイジェストで補う
+            messages.append(UserMessage(
+                content=f"（全{self._turn}件の発言のうち直近{len(self._messages)}件のみ表示）\n" + self.build_digest(),
+                source=DIGEST_SOURCE
+            ))
+        return messages + list(self._messages)
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._first_message = None
+        self._stances = {}
+        self._turn_counts = {}
+        self._last_turns = {}
+        self._turn = 0
+        self._agree_streak = 0
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return SelectorHistoryChatCompletionContextState(
+            messages=self._messages,
+            first_message=self._first_message,
+            stances={source: list(stances) for source, stances in self._stances.items()},
+            turn_counts=self._turn_counts,
+            last_turns=self._last_turns,
+            turn=self._turn,
+            agree_streak=self._agree_streak
+        ).model_dump()
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        loaded = SelectorHistoryChatCompletionContextState.model_validate(state)
+        self._messages = loaded.messages
+        self._first_message = loaded.first_message
+        self._stances = {
+            source: deque(stances, maxlen=self._stance_window)
+            for source, stances in loaded.stances.items()
+        }
+        self._turn_counts = loaded.turn_counts
+        self._last_turns = loaded.last_turns
+        self._turn = loaded.turn
+        self._agree_streak = loaded.agree_streak
+
+    def _to_config(self) -> SelectorHistoryChatCompletionContextConfig:
+        return SelectorHistoryChatCompletionContextConfig(
+            recent_turns=self._recent_turns,
+            stance_window=self._stance_window,
+            reset_speaker=self._reset_speaker,
+            initial_messages=self._initial_messages
+        )
+
+    @classmethod
+    def _from_config(cls, config: SelectorHistoryChatCompletionContextConfig) -> Self:
+        return cls(**config.model_dump())
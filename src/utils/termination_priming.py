@@ -0,0 +1,64 @@
+"""
+Termination Priming - 再開時に中断前のメッセージを終了条件に反映させる共通処理
+"""
+
+from typing import Iterator, Sequence
+
+from autogen_agentchat.base import TerminationCondition
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import BaseChatMessage, BaseAgentEvent
+
+
+class PrimableTermination:
+    """再開時に prime で既存のメッセージを反映できる終了条件のミックスイン
+
+    チームの状態には終了条件が含まれないため、再開時に中断前のメッセージを __call__ に流して
+    カウンターを復元する。停止の判定は __call__ が立てる _terminated を戻して次のメッセージに持ち越す。
+    """
+
+    _terminated: bool
+
+    async def prime(self, messages: Sequence[BaseAgentEvent | BaseChatMessage], elapsed_time: float = 0.0) -> None:
+        """再開時に既存のメッセージをカウンターに反映させる（停止は判定せず、次のメッセージで判定する）"""
+        for message in messages:
+            await self([message])
+            self._terminated = False
+
+
+def iter_termination_conditions(condition: TerminationCondition) -> Iterator[TerminationCondition]:
+    """AND/ORで組み合わせた終了条件を個々の条件に分解する"""
+    children = getattr(condition, "_conditions", None)
+    if children is None:
+        yield condition
+        return
+    for child in children:
+        yield from iter_termination_conditions(child)
+
+
+async def _prime_max_messages(
+    condition: MaxMessageTermination,
+    messages: Sequence[BaseAgentEvent | BaseChatMessage]
+) -> None:
+    """MaxMessageTermination に既存のメッセージを数えさせる
+
+    上限に達した状態で判定すると例外になるため、上限に達した場合は数え直して1つ手前までに留める。
+    """
+    for counted, message in enumerate(messages):
+        if await condition([message]) is not None:
+            await condition.reset()
+            for earlier in messages[:counted]:
+                await condition([earlier])
+            return
+
+
+async def prime_conditions(
+    condition: TerminationCondition,
+    messages: Sequence[BaseAgentEvent | BaseChatMessage],
+    elapsed_time: float = 0.0
+) -> None:
+    """組み合わせた終了条件のそれぞれに、中断前のメッセージと経過時間を反映させる"""
+    for child in iter_termination_conditions(condition):
+        if isinstance(child, MaxMessageTermination):
+            await _prime_max_messages(child, messages)
+        elif isinstance(child, PrimableTermination):
+            await child.prime(messages, elapsed_time)
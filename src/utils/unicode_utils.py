@@ -6,17 +6,17 @@ import sys
 from typing import Any
 
 
-def safe_print(message: Any) -> None:
-    """Unicode文字を安全に出力する"""
+def safe_print(message: Any, end: str = "\n", flush: bool = False) -> None:
+    """Unicode文字を安全に出力する（ストリーミング表示では end="" で改行せずに出力する）"""
     try:
-        print(message)
+        print(message, end=end, flush=flush)
     except UnicodeEncodeError:
         # Windows環境でのcp1252エンコーディングエラーを回避
         if isinstance(message, str):
             encoded_message = message.encode('utf-8', 'replace').decode('utf-8')
-            print(encoded_message)
+            print(encoded_message, end=end, flush=flush)
         else:
-            print(str(message).encode('utf-8', 'replace').decode('utf-8'))
+            print(str(message).encode('utf-8', 'replace').decode('utf-8'), end=end, flush=flush)
 
 
 def safe_format_output(source: str, content_type: str, content: str) -> str:
@@ -28,6 +28,11 @@ def safe_format_output(source: str, content_type: str, content: str) -> str:
         return f" ------ {source} ({content_type}) ------\n{safe_content}\n"
 
 
+def safe_format_header(source: str, content_type: str) -> str:
+    """ストリーミング表示の先頭に出力する見出しをフォーマットする"""
+    return f" ------ {source} ({content_type}) ------"
+
+
 def ensure_utf8_encoding() -> None:
     """UTF-8エンコーディングを確保する（Windows対応）"""
     if sys.platform.startswith('win'):
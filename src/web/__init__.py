@@ -2,8 +2,22 @@
 Web module - Streamlit Web界面
 """
 
-from .cosmosdb_reader import CosmosDBReader
-from .autogen_runner import StreamlitAutoGenRunner, get_runner
+from typing import TYPE_CHECKING
+
+from utils.lazy_imports import lazy_getattr
+
+# SDKの読み込みを初回利用時まで遅らせるため、各クラスは属性にアクセスした時点でインポートする
+_EXPORTS = {
+    "CosmosDBReader": ".cosmosdb_reader",
+    "StreamlitAutoGenRunner": ".autogen_runner",
+    "get_runner": ".autogen_runner"
+}
+
+if TYPE_CHECKING:
+    from .cosmosdb_reader import CosmosDBReader
+    from .autogen_runner import StreamlitAutoGenRunner, get_runner
+
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
 
 __all__ = [
     "CosmosDBReader",
@@ -20,9 +20,12 @@ project_root = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
-from core.session_manager import SessionManager
+from core.job_queue import JobQueue
 from config.settings import Settings
 
+# AutoGen・OpenAI SDKを読み込むモジュール（ClientManager・SessionManager・TeamPool）は
+# 画面の表示を遅らせないよう、セッションを初めて実行する時点でインポートする
+
 
 class StreamlitAutoGenRunner:
     """StreamlitでAutoGenセッションを実行するためのクラス"""
@@ -35,24 +38,46 @@ class StreamlitAutoGenRunner:
             print(f"Warning: Environment variables not properly set: {e}")
             self.settings = None
         
+        self.client_manager = None
+        self.team_pool = None
+        self.health_probes = None
         self.session_manager = None
         self.current_session_id = None
         self.message_queue = queue.Queue()
         self.is_running = False
-        self.session_thread = None
+        self.session_future = None
+        # AutoGenのチームは最初に実行したイベントループに紐づくため、
+        # プールしたチームを再利用できるよう全セッションを同じループで実行する
+        self._loop = None
+        self._loop_thread = None
         
     async def initialize(self) -> bool:
-        """セッションマネージャーを初期化"""
+        """モデルクライアントとチームプールを初期化し、チームを1つ事前に構築する"""
         try:
             if self.settings is None:
                 print("Settings not available - cannot initialize session manager")
                 return False
-            self.session_manager = SessionManager(self.settings)
+            from core.client_manager import ClientManager
+            from core.health_probes import HealthProbes
+            from core.team_pool import TeamPool
+            
+            self.client_manager = ClientManager(self.settings)
+            self.health_probes = HealthProbes(self.settings, self.client_manager)
+            self.team_pool = TeamPool(self.settings, self.client_manager, max_size=self.settings.team_pool_size)
+            self.team_pool.prewarm(1)
             return True
         except Exception as e:
             print(f"Failed to initialize session manager: {e}")
             return False
     
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """セッション実行用のイベントループ（バックグラウンドスレッドで常駐）を取得"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._loop_thread.start()
+        return self._loop
+    
     def start_session_async(self, task: str, callback: Optional[Callable] = None) -> str:
         """非同期でセッションを開始（Streamlitのメインスレッドをブロックしない）"""
         if self.is_running:
@@ -62,25 +87,18 @@ class StreamlitAutoGenRunner:
         self.current_session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.is_running = True
         
-        # 別スレッドでセッション実行
-        self.session_thread = threading.Thread(
-            target=self._run_session_in_thread,
-            args=(task, callback),
-            daemon=True
+        # 常駐スレッドのイベントループでセッション実行
+        self.session_future = asyncio.run_coroutine_threadsafe(
+            self._run_session_on_loop(task, callback),
+            self._get_loop()
         )
-        self.session_thread.start()
         
         return self.current_session_id
     
-    def _run_session_in_thread(self, task: str, callback: Optional[Callable] = None):
-        """別スレッドでセッションを実行"""
+    async def _run_session_on_loop(self, task: str, callback: Optional[Callable] = None):
+        """常駐ループ上でセッションを実行"""
         try:
-            # 新しいイベントループを作成
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # セッション実行
-            loop.run_until_complete(self._run_session_async(task, callback))
+            await self._run_session_async(task, callback)
             
         except Exception as e:
             self.message_queue.put({
@@ -96,8 +114,8 @@ class StreamlitAutoGenRunner:
     async def _run_session_async(self, task: str, callback: Optional[Callable] = None):
         """実際のセッション実行"""
         try:
-            # セッションマネージャーの初期化
-            if not self.session_manager:
+            # チームプールの初期化
+            if not self.team_pool:
                 await self.initialize()
             
             # 開始メッセージ
@@ -107,8 +125,23 @@ class StreamlitAutoGenRunner:
                 'timestamp': datetime.now().isoformat()
             })
             
-            # セッション実行（メッセージフックを追加）
-            await self._run_session_with_message_hook(task)
+            # セッションのイベントを順にStreamlitキューへ渡す（チームは実行ごとにプールから借りる）
+            if self.session_manager is None:
+                from core.session_manager import SessionManager
+                self.session_manager = SessionManager(
+                    self.settings,
+                    client_manager=self.client_manager,
+                    team_pool=self.team_pool,
+                    health_probes=self.health_probes
+                )
+            async for event in self.session_manager.stream_session(task):
+                if event.type in ('message', 'chunk'):
+                    self.message_queue.put({
+                        'type': event.type,
+                        'source': event.source,
+                        'content': event.content,
+                        'timestamp': event.timestamp
+                    })
             
             # 完了メッセージ
             self.message_queue.put({
@@ -117,6 +150,13 @@ class StreamlitAutoGenRunner:
                 'timestamp': datetime.now().isoformat()
             })
             
+        except asyncio.CancelledError:
+            self.message_queue.put({
+                'type': 'system',
+                'content': 'Session stopped',
+                'timestamp': datetime.now().isoformat()
+            })
+            raise
         except Exception as e:
             self.message_queue.put({
                 'type': 'error',
@@ -125,28 +165,6 @@ class StreamlitAutoGenRunner:
             })
             raise
     
-    async def _run_session_with_message_hook(self, task: str):
-        """メッセージフック付きでセッションを実行"""
-        
-        def message_hook(message_data: Dict[str, Any]):
-            """メッセージをStreamlitキューに追加するフック"""
-            self.message_queue.put({
-                'type': 'message',
-                'source': message_data.get('source', 'unknown'),
-                'content': message_data.get('content', ''),
-                'timestamp': message_data.get('timestamp', datetime.now().isoformat())
-            })
-        
-        # メッセージフックを追加
-        self.session_manager.add_message_hook(message_hook)
-        
-        try:
-            # セッション実行
-            await self.session_manager.run_session(task)
-        finally:
-            # メッセージフックを削除
-            self.session_manager.remove_message_hook(message_hook)
-    
     def get_new_messages(self) -> List[Dict[str, Any]]:
         """新しいメッセージを取得"""
         messages = []
@@ -168,21 +186,47 @@ class StreamlitAutoGenRunner:
     
     def stop_session(self):
         """セッションを停止"""
-        if self.is_running:
-            self.is_running = False
-            # 注意: この実装では強制停止は困難
-            # 実際のAutoGenセッションは自然に終了するまで待つ
+        if self.is_running and self.session_future is not None:
+            # ループ上のタスクをキャンセルすると、ストリームを抜けてセッションもキャンセルされる
+            self.session_future.cancel()
+    
+    def enqueue_session(self, task: str, priority: int = 0) -> int:
+        """セッションをプロセス内で実行せず、ジョブキューに投入する"""
+        if self.settings is None:
+            raise RuntimeError("Settings not available - cannot enqueue session")
+        
+        job_queue = JobQueue(self.settings.job_queue_path)
+        return job_queue.enqueue(task, priority=priority, max_attempts=self.settings.job_max_attempts)
+    
+    def get_queue_stats(self) -> Dict[str, int]:
+        """ジョブキューの状態別件数を取得"""
+        if self.settings is None:
+            return {}
+        return JobQueue(self.settings.job_queue_path).get_stats()
     
     async def health_check(self) -> bool:
         """システムの健全性チェック"""
+        report = await self.get_health_report()
+        return report is not None and report["ready"]
+    
+    async def get_health_report(self) -> Optional[Dict[str, Any]]:
+        """準備完了確認の結果（チェックごとの詳細付き）を取得する
+
+        結果はキャッシュされ、期限切れ後はバックグラウンドで更新されるため、繰り返し呼んでも外部への問い合わせは増えない。
+        CosmosDBクライアントを使い回すため、セッション実行用のループで実行する。
+        """
+        future = asyncio.run_coroutine_threadsafe(self._health_report_on_loop(), self._get_loop())
+        return await asyncio.wrap_future(future)
+    
+    async def _health_report_on_loop(self) -> Optional[Dict[str, Any]]:
         try:
-            if not self.session_manager:
-                await self.initialize()
-            
-            return await self.session_manager.health_check()
+            if not self.health_probes:
+                if not await self.initialize():
+                    return None
+            return await self.health_probes.readiness()
         except Exception as e:
             print(f"Health check failed: {e}")
-            return False
+            return None
 
 
 # Streamlit用のグローバルランナーインスタンス
@@ -68,6 +68,7 @@ class CosmosDBReader:
                     'start_time': item.get('start_time', ''),
                     'end_time': item.get('end_time', ''),
                     'execution_time': item.get('execution_time', 0),
+                    'stop_reason': item.get('stop_reason'),
                     'statistics': item.get('statistics', {}),
                     'created_at': item.get('created_at', ''),
                     'updated_at': item.get('updated_at', '')
@@ -109,6 +110,7 @@ class CosmosDBReader:
                     'message_type': item.get('message_type', ''),
                     'timestamp': item.get('timestamp', ''),
                     'sequence': item.get('sequence', 0),
+                    'usage': item.get('usage', {}),
                     'created_at': item.get('created_at', '')
                 }
                 messages.append(message)
@@ -138,6 +140,7 @@ class CosmosDBReader:
                 'start_time': item.get('start_time', ''),
                 'end_time': item.get('end_time', ''),
                 'execution_time': item.get('execution_time', 0),
+                'stop_reason': item.get('stop_reason'),
                 'team_info': item.get('team_info', {}),
                 'statistics': item.get('statistics', {}),
                 'final_statistics': item.get('final_statistics', {}),
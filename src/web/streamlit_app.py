@@ -19,7 +19,6 @@ sys.path.insert(0, project_root)
 sys.path.insert(0, os.path.join(project_root, 'src'))
 
 from cosmosdb_reader import CosmosDBReader
-from autogen_runner import get_runner
 
 # Streamlit設定
 st.set_page_config(
@@ -45,6 +44,8 @@ def init_session_state():
         st.session_state.refresh_interval = 10  # デフォルト10秒
     if 'live_messages' not in st.session_state:
         st.session_state.live_messages = []
+    if 'live_partial' not in st.session_state:
+        st.session_state.live_partial = None  # 生成途中のメッセージ（ストリーミング時）
     if 'current_task' not in st.session_state:
         st.session_state.current_task = ""
     if 'session_running' not in st.session_state:
@@ -135,6 +136,32 @@ def show_sessions_page(db_reader: CosmosDBReader):
             
             st.divider()
 
+def show_token_usage(token_usage: Dict[str, Any]):
+    """トークン使用量をエージェント別に表示"""
+    with st.expander("🪙 トークン使用量", expanded=False):
+        total = token_usage.get('total', {})
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("合計トークン", f"{total.get('total_tokens', 0):,}")
+        with col2:
+            st.metric("プロンプト / 生成", f"{total.get('prompt_tokens', 0):,} / {total.get('completion_tokens', 0):,}")
+        with col3:
+            st.metric("ターン平均", f"{token_usage.get('average_tokens_per_turn', 0):,.0f}")
+        
+        rows = []
+        usage_by_source = dict(token_usage.get('agents', {}))
+        usage_by_source['selector'] = token_usage.get('selector', {})
+        for source, usage in sorted(usage_by_source.items(), key=lambda item: -item[1].get('total_tokens', 0)):
+            rows.append({
+                "エージェント": source,
+                "呼び出し": usage.get('calls', 0),
+                "プロンプト": usage.get('prompt_tokens', 0),
+                "生成": usage.get('completion_tokens', 0),
+                "合計": usage.get('total_tokens', 0)
+            })
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
 def show_chat_page(db_reader: CosmosDBReader):
     """チャット表示ページを表示"""
     # ページが変更された際にコンテンツをクリア
@@ -202,6 +229,13 @@ def show_chat_page(db_reader: CosmosDBReader):
             team_info = session_detail.get('team_info', {})
             st.metric("エージェント数", team_info.get('agent_count', 0))
             st.metric("最終更新", session_detail['updated_at'])
+        if session_detail.get('stop_reason'):
+            st.caption(f"終了理由: {session_detail['stop_reason']}")
+    
+    # トークン使用量（完了したセッションのみ記録される）
+    token_usage = session_detail.get('final_statistics', {}).get('token_usage')
+    if token_usage:
+        show_token_usage(token_usage)
     
     # タスク情報
     st.subheader("🎯 タスク")
@@ -257,6 +291,9 @@ def show_chat_page(db_reader: CosmosDBReader):
                     with st.chat_message(agent, avatar=avatar):
                         st.markdown(f"**{agent_display}** *({timestamp})*")
                         st.markdown(content)
+                        usage = message.get('usage', {})
+                        if 'prompt_tokens' in usage:
+                            st.caption(f"🪙 {usage['prompt_tokens']:,} + {usage['completion_tokens']:,} tokens")
     
     # 初回表示
     display_messages(messages)
@@ -278,7 +315,8 @@ def show_live_brainstorming_page():
     """ライブブレインストーミングページを表示"""
     st.title("🧠 ライブブレインストーミング")
     
-    # AutoGenランナーを取得
+    # AutoGenランナーを取得（履歴の表示だけならAutoGenを読み込まないよう、このページで初めてインポートする）
+    from autogen_runner import get_runner
     runner = get_runner()
     
     # 設定チェック
@@ -317,6 +355,7 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
                     st.session_state.current_task = task_input.strip()
                     st.session_state.session_running = True
                     st.session_state.live_messages = []
+                    st.session_state.live_partial = None
                     
                     # セッション開始
                     try:
@@ -340,15 +379,40 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
                         # 新しいイベントループを作成
                         loop = asyncio.new_event_loop()
                         asyncio.set_event_loop(loop)
-                        is_healthy = loop.run_until_complete(runner.health_check())
+                        report = loop.run_until_complete(runner.get_health_report())
                         loop.close()
                         
-                        if is_healthy:
-                            health_container.success("✅ システム正常")
-                        else:
+                        if report is None:
                             health_container.error("❌ システムエラー - 設定を確認してください")
+                        else:
+                            failed = [
+                                f"{name}: {check['error']}"
+                                for name, check in report["checks"].items() if not check["ok"]
+                            ]
+                            if report["ready"]:
+                                health_container.success(f"✅ システム正常（{report['age']:.0f}秒前に確認）")
+                                if failed:
+                                    health_container.warning("⚠️ " + " / ".join(failed))
+                            else:
+                                health_container.error("❌ システムエラー - " + " / ".join(failed))
                     except Exception as e:
                         health_container.error(f"❌ ヘルスチェックエラー: {e}")
+        
+        with col3:
+            # ワーカーで実行するためにジョブキューへ投入
+            if st.button("📥 キューに投入", disabled=not task_input.strip(), help="ワーカー（scripts/run_worker.py）でバックグラウンド実行します"):
+                try:
+                    job_id = runner.enqueue_session(task_input.strip())
+                    st.success(f"ジョブを投入しました: #{job_id}")
+                except Exception as e:
+                    st.error(f"ジョブ投入エラー: {e}")
+            
+            queue_stats = runner.get_queue_stats()
+            if queue_stats:
+                st.caption(
+                    f"📦 待機 {queue_stats.get('queued', 0)} / 実行中 {queue_stats.get('running', 0)} / "
+                    f"完了 {queue_stats.get('completed', 0)} / 失敗 {queue_stats.get('failed', 0)}"
+                )
     
     else:
         # セッション実行中の表示
@@ -367,8 +431,18 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
     
     # 新しいメッセージを取得
     if st.session_state.session_running:
-        new_messages = runner.get_new_messages()
-        st.session_state.live_messages.extend(new_messages)
+        for new_message in runner.get_new_messages():
+            if new_message.get('type') == 'chunk':
+                # チャンクは確定するまで生成途中のメッセージに連結して表示する
+                partial = st.session_state.live_partial
+                if partial is None or partial['source'] != new_message['source']:
+                    partial = {**new_message, 'type': 'message', 'content': ''}
+                partial['content'] += new_message['content']
+                st.session_state.live_partial = partial
+            else:
+                if new_message.get('type') == 'message':
+                    st.session_state.live_partial = None
+                st.session_state.live_messages.append(new_message)
         
         # セッション状態を更新
         if not runner.is_session_running():
@@ -377,7 +451,7 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
     # チャットメッセージを表示
     chat_container = st.container()
     
-    if not st.session_state.live_messages:
+    if not st.session_state.live_messages and not st.session_state.live_partial:
         with chat_container:
             st.info("ブレインストーミングを開始すると、ここにAIエージェントの会話がリアルタイムで表示されます。")
     else:
@@ -401,8 +475,12 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
             'system': 'システム'
         }
         
+        displayed_messages = list(st.session_state.live_messages)
+        if st.session_state.live_partial:
+            displayed_messages.append({**st.session_state.live_partial, 'streaming': True})
+        
         with chat_container:
-            for message in st.session_state.live_messages:
+            for message in displayed_messages:
                 msg_type = message.get('type', 'message')
                 
                 if msg_type == 'system':
@@ -420,7 +498,7 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
                     # チャットメッセージコンポーネントを使用
                     with st.chat_message(agent, avatar=avatar):
                         st.markdown(f"**{agent_display}** *({timestamp[:19]})*")
-                        st.markdown(content)
+                        st.markdown(content + (" ▌" if message.get('streaming') else ""))
     
     # オンデマンド更新コントロール
     if st.session_state.session_running:
@@ -433,11 +511,13 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
         with col2:
             if st.button("🧹 画面クリア", help="チャット表示をクリアします"):
                 st.session_state.live_messages = []
+                st.session_state.live_partial = None
                 st.rerun()
         
         # 自動更新の場合
         if auto_refresh:
-            time.sleep(2)  # 2秒間隔で更新
+            # ストリーミング時はチャンクを滑らかに表示するため短い間隔で更新
+            time.sleep(0.5 if runner.settings.stream_tokens else 2)
             st.rerun()
         else:
             # 手動更新ボタン
@@ -451,6 +531,7 @@ AOAI_DEPLOYMENT_REASONING=your-reasoning-deployment-name
             with col1:
                 if st.button("🧹 履歴クリア", help="チャット履歴をクリアします"):
                     st.session_state.live_messages = []
+                    st.session_state.live_partial = None
                     st.rerun()
 
 def _handle_session_event(event: str):
@@ -0,0 +1,13 @@
+"""
+テスト共通設定
+"""
+
+import os
+import sys
+
+# アプリケーションは src をルートとしてインポートする（python src/main.py と同じ）
+SRC_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIRECTORY not in sys.path:
+    sys.path.insert(0, SRC_DIRECTORY)
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
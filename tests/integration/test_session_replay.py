@@ -0,0 +1,184 @@
+"""
+記録済みのモデル呼び出し（tests/fixtures/model_fixture.jsonl）を再生してセッション全体を実行するテスト
+"""
+
+import asyncio
+import os
+from contextlib import aclosing
+
+import pytest
+
+from config.settings import Settings
+from core.checkpoint_manager import CheckpointManager
+from core.session_context import SessionContext
+from core.session_events import MessageEvent, SessionCompleted, SessionStarted
+from core.session_manager import SessionManager
+from utils.file_utils import iter_context, read_context_footer
+
+from conftest import FIXTURES_DIRECTORY
+
+
+TASK = "新しいフィットネスアプリのアイデアを考えてください"
+EXPECTED_SPEAKERS = [
+    "user",
+    "creative_planner",
+    "market_analyst",
+    "technical_validator",
+    "business_evaluator",
+    "user_advocate",
+    "creative_planner",
+    "market_analyst",
+]
+
+
+def make_settings(log_directory: str, **overrides) -> Settings:
+    values = dict(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="gpt-4o",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+        max_messages=8,
+        log_directory=log_directory,
+        model_client_mode="replay",
+        model_fixture_path=os.path.join(FIXTURES_DIRECTORY, "model_fixture.jsonl"),
+        replay_fixed_latency=0.0,
+        team_pool_size=1,
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.fixture
+def log_directory(tmp_path):
+    return str(tmp_path / "logs")
+
+
+def make_session_manager(settings: Settings) -> SessionManager:
+    session_manager = SessionManager(settings)
+    session_manager.console_output = False
+    return session_manager
+
+
+class TestSessionReplay:
+    """記録済みフィクスチャによるセッション実行のテスト"""
+
+    async def test_run_session_replays_fixture(self, log_directory):
+        session_manager = make_session_manager(make_settings(log_directory))
+
+        filename = await session_manager.run_session(TASK)
+
+        assert [c["source"] for c in session_manager.chat_contexts] == EXPECTED_SPEAKERS
+        assert session_manager.chat_contexts[1]["content"] == "意見0です。新しいアイデアを提案します。"
+        assert "Maximum number of messages" in session_manager.stop_reason
+
+        stats = session_manager.get_session_stats()
+        assert stats["total_messages"] == 8
+        replay_stats = stats["process_client_stats"]
+        assert replay_stats["chat"] == {"replayed_calls": 7, "key_misses": 0}
+        assert replay_stats["reasoning"]["key_misses"] == 0
+
+        # トランスクリプトは全メッセージとフッターを含む
+        assert [c["source"] for c in iter_context(filename, log_directory)] == EXPECTED_SPEAKERS
+        footer = read_context_footer(filename, log_directory)
+        assert footer["message_count"] == 8
+        assert footer["session_id"] == session_manager.session_id
+
+    async def test_stream_session_emits_events_in_order(self, log_directory):
+        session_manager = make_session_manager(make_settings(log_directory))
+
+        events = [event async for event in session_manager.stream_session(TASK)]
+
+        assert isinstance(events[0], SessionStarted)
+        messages = [event for event in events if isinstance(event, MessageEvent)]
+        assert [event.source for event in messages] == EXPECTED_SPEAKERS
+        assert [event.index for event in messages] == list(range(len(EXPECTED_SPEAKERS)))
+        assert isinstance(events[-1], SessionCompleted)
+        assert events[-1].total_messages == 8
+
+    async def test_closing_stream_cancels_session(self, log_directory):
+        # 途中で抜けられるよう、記録した応答ごとに待ち時間を入れる
+        session_manager = make_session_manager(make_settings(log_directory, replay_fixed_latency=0.05))
+        context = session_manager.new_context()
+
+        received = []
+        async with aclosing(session_manager.stream_session(TASK, context=context)) as stream:
+            async for event in stream:
+                received.append(event)
+                if isinstance(event, MessageEvent) and event.source != "user":
+                    break
+
+        assert not any(isinstance(event, SessionCompleted) for event in received)
+        assert len(context.chat_contexts) < len(EXPECTED_SPEAKERS)
+        assert context.event_queue is None
+        assert session_manager._active_contexts == set()
+
+        # 中断したトランスクリプトにはフッターがなく、チェックポイントを取らない設定では再開情報も残らない
+        filename = context.transcript_writer.filename
+        assert read_context_footer(filename, log_directory) is None
+        assert session_manager.checkpoint_manager.list_checkpoints() == []
+
+        # 借りたチームはリセットされてプールに戻っている
+        pool_stats = session_manager.team_pool.get_stats()
+        assert (pool_stats["created"], pool_stats["idle"], pool_stats["discarded"]) == (1, 1, 0)
+
+
+class TestSessionResume:
+    """チェックポイントからの再開のテスト"""
+
+    async def interrupt(self, log_directory: str) -> SessionContext:
+        """チェックポイントを取りながら実行し、途中で中断したセッションのコンテキストを返す"""
+        session_manager = make_session_manager(
+            make_settings(log_directory, checkpoint_interval=2, replay_fixed_latency=0.05)
+        )
+        context = session_manager.new_context()
+        async with aclosing(session_manager.stream_session(TASK, context=context)) as stream:
+            async for event in stream:
+                if isinstance(event, MessageEvent) and event.index == 4:
+                    break
+        return context
+
+    async def test_resume_continues_from_checkpoint(self, log_directory):
+        context = await self.interrupt(log_directory)
+        session_manager = make_session_manager(make_settings(log_directory, checkpoint_interval=2))
+        assert session_manager.checkpoint_manager.list_checkpoints() == [context.session_id]
+        checkpoint = await session_manager.checkpoint_manager.load(context.session_id)
+        assert checkpoint["message_count"] in (2, 4)
+
+        filename = await session_manager.resume_session(context.session_id)
+
+        assert filename == context.transcript_writer.filename
+        assert [c["source"] for c in session_manager.chat_contexts] == EXPECTED_SPEAKERS
+        assert "Maximum number of messages" in session_manager.stop_reason
+        assert session_manager.get_session_stats()["process_client_stats"]["chat"]["key_misses"] == 0
+        # 同じトランスクリプトに最後まで書かれ、チェックポイントは削除される
+        assert [c["source"] for c in iter_context(filename, log_directory)] == EXPECTED_SPEAKERS
+        assert read_context_footer(filename, log_directory)["message_count"] == 8
+        assert session_manager.checkpoint_manager.list_checkpoints() == []
+
+    async def test_completed_session_is_not_resumed(self, log_directory):
+        context = await self.interrupt(log_directory)
+        checkpoint_manager = CheckpointManager(os.path.join(log_directory, "checkpoints"))
+        stale_checkpoint = await checkpoint_manager.load(context.session_id)
+        session_manager = make_session_manager(make_settings(log_directory))
+        filename = await session_manager.resume_session(context.session_id)
+
+        # 完了後に残ったチェックポイント（CosmosDBから取得した場合など）では再開しない
+        await checkpoint_manager.save(
+            context.session_id,
+            stale_checkpoint["task"],
+            stale_checkpoint["team_state"],
+            stale_checkpoint["chat_contexts"],
+            stale_checkpoint["elapsed_time"],
+            transcript_file=stale_checkpoint["transcript_file"]
+        )
+        with pytest.raises(ValueError, match="already completed"):
+            await make_session_manager(make_settings(log_directory)).resume_session(context.session_id)
+
+        assert read_context_footer(filename, log_directory)["message_count"] == 8
+        assert checkpoint_manager.list_checkpoints() == []
+
+    async def test_missing_checkpoint(self, log_directory):
+        session_manager = make_session_manager(make_settings(log_directory))
+
+        with pytest.raises(ValueError, match="No checkpoint"):
+            await session_manager.resume_session("session_missing")
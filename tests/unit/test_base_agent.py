@@ -0,0 +1,34 @@
+from autogen_core.model_context import UnboundedChatCompletionContext
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from agents import CreativePlannerAgent
+from utils.rolling_summary_context import RollingSummaryChatCompletionContext
+
+
+class TestCreateAgent:
+    """AssistantAgent の作成と再利用のテスト"""
+
+    def test_same_arguments_return_cached_agent(self):
+        agent = CreativePlannerAgent(ReplayChatCompletionClient([]))
+        context = RollingSummaryChatCompletionContext(window_size=4)
+
+        first = agent.create_agent(model_client_stream=True, model_context=context)
+        assert agent.create_agent(model_client_stream=True, model_context=context) is first
+        assert agent.agent is first
+
+    def test_different_context_rebuilds_agent(self):
+        agent = CreativePlannerAgent(ReplayChatCompletionClient([]))
+        first = agent.create_agent(model_context=RollingSummaryChatCompletionContext(window_size=4))
+
+        context = UnboundedChatCompletionContext()
+        second = agent.create_agent(model_context=context)
+
+        assert second is not first
+        assert second.model_context is context
+        assert agent.agent is second
+
+    def test_different_stream_flag_rebuilds_agent(self):
+        agent = CreativePlannerAgent(ReplayChatCompletionClient([]))
+        first = agent.create_agent()
+
+        assert agent.create_agent(model_client_stream=True) is not first
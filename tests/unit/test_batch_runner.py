@@ -0,0 +1,157 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import Settings
+from core import batch_runner as batch_runner_module
+from core.batch_runner import BatchRunner, format_batch_report, load_batch_tasks
+
+
+def make_settings(tmp_path) -> Settings:
+    return Settings(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="o3-mini",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+        http_pool_enabled=False,
+        log_directory=str(tmp_path / "logs"),
+    )
+
+
+def write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class TestLoadBatchTasks:
+    """バッチタスクファイルの読み込みのテスト"""
+
+    def test_objects_strings_and_blank_lines(self, tmp_path):
+        path = write_lines(tmp_path / "tasks.jsonl", [
+            json.dumps({"id": "fitness", "task": "フィットネスアプリ"}, ensure_ascii=False),
+            "",
+            json.dumps("旅行アプリ", ensure_ascii=False),
+            json.dumps({"id": 7, "task": "家計簿アプリ"}, ensure_ascii=False),
+            json.dumps({"task": "料理アプリ"}, ensure_ascii=False),
+        ])
+
+        assert load_batch_tasks(path) == [
+            {"id": "fitness", "task": "フィットネスアプリ"},
+            {"id": "task_0002", "task": "旅行アプリ"},
+            {"id": "7", "task": "家計簿アプリ"},
+            {"id": "task_0004", "task": "料理アプリ"},
+        ]
+
+    @pytest.mark.parametrize("line", [json.dumps({"id": "x"}), json.dumps({"task": ""}), "[1, 2]"])
+    def test_missing_task_reports_line_number(self, tmp_path, line):
+        path = write_lines(tmp_path / "tasks.jsonl", [json.dumps("有効なタスク", ensure_ascii=False), line])
+
+        with pytest.raises(ValueError, match="line 2"):
+            load_batch_tasks(path)
+
+    def test_invalid_json(self, tmp_path):
+        path = write_lines(tmp_path / "tasks.jsonl", ["{not json"])
+
+        with pytest.raises(json.JSONDecodeError):
+            load_batch_tasks(path)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeSessionManager:
+    """タスク文字列で指定した時間だけ時計を進めて、セッションのイベントを出力する SessionManager
+
+    タスクは "最初の発言までの秒数,セッション全体の秒数" 形式で、"fail" なら途中で失敗する。
+    """
+
+    clock = None
+
+    def __init__(self, settings, client_manager=None, cosmos_client=None, team_pool=None):
+        self.console_output = True
+        self.transcript_directory = None
+
+    def new_context(self):
+        return SimpleNamespace(chat_contexts=[], transcript_writer=None)
+
+    async def stream_session(self, task, context):
+        yield SimpleNamespace(type="message", source="user")
+        if task == "fail":
+            self.clock.now += 1.0
+            raise RuntimeError("model unavailable")
+        first, total = (float(value) for value in task.split(","))
+        self.clock.now += first
+        context.chat_contexts.append({"source": "creative_planner"})
+        yield SimpleNamespace(type="message", source="creative_planner")
+        self.clock.now += total - first
+        context.chat_contexts.append({"source": "market_analyst"})
+        yield SimpleNamespace(type="message", source="market_analyst")
+        yield SimpleNamespace(type="session_completed", source=None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(batch_runner_module, "time", clock)
+    monkeypatch.setattr(FakeSessionManager, "clock", clock)
+    monkeypatch.setattr(batch_runner_module, "SessionManager", FakeSessionManager)
+    return clock
+
+
+def make_runner(tmp_path, concurrency: int = 2) -> BatchRunner:
+    runner = BatchRunner(make_settings(tmp_path), concurrency=concurrency)
+    # チームは FakeSessionManager が使わないため事前構築しない
+    runner.team_pool.prewarm = lambda count: None
+    return runner
+
+
+class TestBatchReport:
+    """バッチ実行のレイテンシとスループットの集計のテスト"""
+
+    async def test_latency_percentiles_and_throughput(self, tmp_path, clock):
+        tasks = [{"id": f"t{i}", "task": f"{i / 10},{i}"} for i in range(1, 11)]
+
+        report = await make_runner(tmp_path).run(tasks)
+
+        assert (report["total_tasks"], report["completed"], report["failed"]) == (10, 10, 0)
+        assert report["latency"]["min"] == pytest.approx(1.0)
+        assert report["latency"]["p50"] == pytest.approx(5.0)
+        assert report["latency"]["p95"] == pytest.approx(10.0)
+        assert report["latency"]["max"] == pytest.approx(10.0)
+        assert report["latency"]["mean"] == pytest.approx(5.5)
+        assert report["first_message_latency"]["p50"] == pytest.approx(0.5)
+        # 時計を進めるのは各セッションだけなので、壁時計時間はレイテンシの合計になる
+        assert report["wall_time"] == pytest.approx(55.0)
+        assert report["sessions_per_minute"] == pytest.approx(10 / 55.0 * 60)
+        assert report["total_messages"] == 20
+        assert report["messages_per_second"] == pytest.approx(20 / 55.0)
+
+    async def test_failed_tasks_are_excluded_from_latency(self, tmp_path, clock):
+        tasks = [{"id": "ok", "task": "0.5,2"}, {"id": "ng", "task": "fail"}]
+
+        report = await make_runner(tmp_path).run(tasks)
+
+        assert (report["completed"], report["failed"]) == (1, 1)
+        failed = next(result for result in report["results"] if result["id"] == "ng")
+        assert failed["status"] == "failed"
+        assert failed["error"] == "model unavailable"
+        assert failed["first_message_latency"] is None
+        assert report["latency"]["max"] == pytest.approx(2.0)
+
+    async def test_format_report(self, tmp_path, clock):
+        report = await make_runner(tmp_path).run([{"id": "ok", "task": "0.5,2"}])
+
+        text = format_batch_report(report)
+        assert "Tasks: 1/1 completed, 0 failed (concurrency=2)" in text
+        assert "p50 2.00s / p95 2.00s" in text
+        assert "Time to first message: mean 0.50s" in text
+
+    def test_concurrency_must_be_positive(self, tmp_path):
+        with pytest.raises(ValueError):
+            BatchRunner(make_settings(tmp_path), concurrency=0)
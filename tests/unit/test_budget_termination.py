@@ -0,0 +1,111 @@
+import pytest
+from autogen_agentchat.messages import StopMessage, TextMessage
+from autogen_core.models import RequestUsage
+
+from utils import budget_termination as budget_termination_module
+from utils.budget_termination import DeadlineTermination, TokenBudgetTermination
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(budget_termination_module, "time", clock)
+    return clock
+
+
+def text(prompt_tokens: int = 0, completion_tokens: int = 0, source: str = "market_analyst") -> TextMessage:
+    usage = RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    return TextMessage(content="発言", source=source, models_usage=usage)
+
+
+class TestTokenBudgetTermination:
+    """トークン予算による終了条件のテスト"""
+
+    async def test_stops_when_budget_is_reached(self):
+        condition = TokenBudgetTermination(max_total_tokens=100)
+
+        assert await condition([text(40, 10)]) is None
+        assert condition.total_tokens == 50
+        stop = await condition([text(30, 20)])
+
+        assert isinstance(stop, StopMessage)
+        assert condition.terminated
+        assert await condition([text(1, 1)]) is None
+
+    async def test_messages_without_usage_are_ignored(self):
+        condition = TokenBudgetTermination(max_total_tokens=10)
+
+        assert await condition([TextMessage(content="タスク", source="user")]) is None
+        assert condition.total_tokens == 0
+
+    async def test_prime_counts_previous_usage_without_stopping(self):
+        condition = TokenBudgetTermination(max_total_tokens=100)
+
+        await condition.prime([text(60, 0), text(60, 0)])
+        assert not condition.terminated
+        assert condition.total_tokens == 120
+        assert await condition([text(0, 1)]) is not None
+
+    async def test_reset(self):
+        condition = TokenBudgetTermination(max_total_tokens=10)
+        await condition([text(10, 0)])
+
+        await condition.reset()
+        assert not condition.terminated
+        assert condition.total_tokens == 0
+
+
+class TestDeadlineTermination:
+    """制限時間による終了条件のテスト"""
+
+    async def test_stops_on_first_message_after_deadline(self, clock):
+        condition = DeadlineTermination(deadline_seconds=60)
+
+        assert await condition([text()]) is None
+        clock.now += 59
+        assert await condition([text()]) is None
+        clock.now += 1
+        stop = await condition([text()])
+
+        assert isinstance(stop, StopMessage)
+        assert condition.terminated
+
+    async def test_prime_carries_over_elapsed_time(self, clock):
+        condition = DeadlineTermination(deadline_seconds=60)
+
+        await condition.prime([text()], elapsed_time=50)
+        assert not condition.terminated
+        clock.now += 9
+        assert await condition([text()]) is None
+        clock.now += 1
+        assert await condition([text()]) is not None
+
+    async def test_prime_after_deadline_stops_on_next_message(self, clock):
+        condition = DeadlineTermination(deadline_seconds=60)
+
+        await condition.prime([text()], elapsed_time=120)
+        assert not condition.terminated
+        assert await condition([text()]) is not None
+
+    async def test_reset_restarts_the_clock(self, clock):
+        condition = DeadlineTermination(deadline_seconds=60)
+        await condition([text()])
+        clock.now += 60
+        await condition([text()])
+
+        await condition.reset()
+        assert await condition([text()]) is None
+        clock.now += 30
+        assert await condition([text()]) is None
+
+    def test_config_round_trip(self):
+        assert DeadlineTermination._from_config(DeadlineTermination(30)._to_config())._deadline_seconds == 30
+        assert TokenBudgetTermination._from_config(TokenBudgetTermination(500)._to_config())._max_total_tokens == 500
@@ -0,0 +1,84 @@
+from azure.cosmos import exceptions
+
+from core.checkpoint_manager import CheckpointManager
+from core.cosmosdb_manager import CosmosDBManager
+
+
+class FakeContainer:
+    """id とパーティションキーで文書を保持するCosmosDBコンテナの代わり"""
+
+    def __init__(self):
+        self.items = {}
+
+    def _missing(self):
+        return exceptions.CosmosResourceNotFoundError(status_code=404, message="Not found")
+
+    async def upsert_item(self, body):
+        self.items[(body["id"], body["session_id"])] = dict(body)
+
+    async def read_item(self, item, partition_key):
+        if (item, partition_key) not in self.items:
+            raise self._missing()
+        return dict(self.items[(item, partition_key)])
+
+    async def delete_item(self, item, partition_key):
+        if self.items.pop((item, partition_key), None) is None:
+            raise self._missing()
+
+
+def make_cosmosdb_manager(session_id: str = "session_1") -> CosmosDBManager:
+    cosmosdb_manager = CosmosDBManager({"enabled": True})
+    cosmosdb_manager.container = FakeContainer()
+    cosmosdb_manager.session_id = session_id
+    return cosmosdb_manager
+
+
+async def save(checkpoint_manager: CheckpointManager, session_id: str = "session_1") -> None:
+    await checkpoint_manager.save(session_id, "タスク", {"state": 1}, [{"source": "user", "content": "タスク"}], 1.5)
+
+
+class TestCheckpointManager:
+    """チェックポイントの保存・読み込み・削除のテスト"""
+
+    async def test_round_trip_on_disk(self, tmp_path):
+        checkpoint_manager = CheckpointManager(str(tmp_path))
+        await save(checkpoint_manager)
+
+        checkpoint = await checkpoint_manager.load("session_1")
+        assert checkpoint["team_state"] == {"state": 1}
+        assert checkpoint["message_count"] == 1
+        assert checkpoint_manager.list_checkpoints() == ["session_1"]
+
+        await checkpoint_manager.delete("session_1")
+        assert await checkpoint_manager.load("session_1") is None
+
+    async def test_load_falls_back_to_cosmosdb(self, tmp_path):
+        cosmosdb_manager = make_cosmosdb_manager()
+        writer = CheckpointManager(str(tmp_path / "a"), cosmosdb_manager, save_to_cosmosdb=True)
+        await save(writer)
+
+        reader = CheckpointManager(str(tmp_path / "b"), cosmosdb_manager)
+        assert (await reader.load("session_1"))["task"] == "タスク"
+
+    async def test_delete_removes_cosmosdb_checkpoint(self, tmp_path):
+        cosmosdb_manager = make_cosmosdb_manager()
+        checkpoint_manager = CheckpointManager(str(tmp_path), cosmosdb_manager, save_to_cosmosdb=True)
+        await save(checkpoint_manager)
+
+        await checkpoint_manager.delete("session_1")
+
+        assert cosmosdb_manager.container.items == {}
+        assert await checkpoint_manager.load("session_1") is None
+        # 既に削除済みでも失敗しない
+        await checkpoint_manager.delete("session_1")
+
+
+class TestCosmosDBSessionStatus:
+    """セッション文書の状態取得のテスト"""
+
+    async def test_status(self):
+        cosmosdb_manager = make_cosmosdb_manager()
+        assert await cosmosdb_manager.get_session_status("session_1") is None
+
+        await cosmosdb_manager.container.upsert_item({"id": "session_1", "session_id": "session_1", "status": "completed"})
+        assert await cosmosdb_manager.get_session_status("session_1") == "completed"
@@ -0,0 +1,60 @@
+import pytest
+
+from config.settings import Settings
+from core import rate_limiter as rate_limiter_module
+from core import resilient_client as resilient_client_module
+from core.client_manager import ClientManager
+from core.client_wrappers import iter_wrappers
+from core.rate_limiter import RateLimitedChatCompletionClient
+from core.resilient_client import ResilientChatCompletionClient
+
+
+def make_settings(**overrides) -> Settings:
+    values = dict(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="o3-mini",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+        rate_limit_rpm=60,
+        rate_limit_tpm=10000,
+        http_pool_enabled=False,
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.fixture(autouse=True)
+def isolated_registries(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "_registry", {})
+    monkeypatch.setattr(resilient_client_module, "_breakers", {})
+
+
+def wrapper_types(client):
+    return [type(wrapper) for wrapper in iter_wrappers(client)]
+
+
+class TestClientWrapping:
+    """モデルクライアントのラッパー構成のテスト"""
+
+    def test_resilient_client_acquires_per_attempt(self):
+        client_manager = ClientManager(make_settings())
+
+        wrappers = list(iter_wrappers(client_manager.chat_client))
+        assert RateLimitedChatCompletionClient not in map(type, wrappers)
+        resilient = next(w for w in wrappers if isinstance(w, ResilientChatCompletionClient))
+        assert resilient.limiter is not None
+        assert resilient.max_tokens == client_manager.settings.max_tokens_chat
+
+    def test_chat_and_reasoning_share_the_deployment_limiter(self):
+        client_manager = ClientManager(make_settings())
+
+        def limiter_of(client):
+            return next(w for w in iter_wrappers(client) if isinstance(w, ResilientChatCompletionClient)).limiter
+
+        assert limiter_of(client_manager.chat_client) is limiter_of(client_manager.reasoning_client)
+
+    def test_rate_limit_without_resilience(self):
+        client_manager = ClientManager(make_settings(resilient_client_enabled=False))
+
+        assert RateLimitedChatCompletionClient in wrapper_types(client_manager.chat_client)
+        assert ResilientChatCompletionClient not in wrapper_types(client_manager.chat_client)
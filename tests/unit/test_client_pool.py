@@ -0,0 +1,115 @@
+import httpx
+import pytest
+
+from config.settings import Settings
+from core import client_pool as client_pool_module
+from core.client_manager import ClientManager
+from core.client_pool import ModelClientPool, close_client_pool, get_client_pool
+
+
+def make_settings(**overrides) -> Settings:
+    values = dict(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="o3-mini",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+def config(deployment: str = "gpt-4o", **overrides):
+    values = dict(
+        azure_deployment=deployment,
+        model="gpt-4o",
+        api_version="2025-04-01-preview",
+        azure_endpoint="https://example.openai.azure.com/",
+        api_key="unused",
+        max_tokens=500,
+        max_retries=0,
+    )
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture(autouse=True)
+def isolated_pool(monkeypatch):
+    monkeypatch.setattr(client_pool_module, "_pool", None)
+
+
+class TestModelClientPool:
+    """モデルクライアントと共有HTTPクライアントのプールのテスト"""
+
+    async def test_same_config_reuses_client(self):
+        pool = ModelClientPool()
+        try:
+            first = pool.get_client(**config())
+            assert pool.get_client(**config()) is first
+            assert pool.get_client(**config(max_tokens=2000)) is not first
+
+            stats = pool.get_stats()
+            assert (stats["clients"], stats["created"], stats["reused"]) == (2, 2, 1)
+        finally:
+            await pool.close()
+
+    async def test_clients_share_one_http_client_with_limits(self):
+        pool = ModelClientPool(max_connections=10, max_keepalive_connections=5, keepalive_expiry=15.0)
+        try:
+            pool.get_client(**config("chat"))
+            http_client = pool._http_client
+            pool.get_client(**config("reasoning"))
+
+            assert pool._http_client is http_client
+            assert isinstance(pool.limits, httpx.Limits)
+            assert pool.limits == httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=15.0)
+            assert pool.get_stats()["max_keepalive_connections"] == 5
+        finally:
+            await pool.close()
+
+    async def test_close_releases_http_client_and_clients(self):
+        pool = ModelClientPool()
+        client = pool.get_client(**config())
+        http_client = pool._http_client
+
+        await pool.close()
+
+        assert http_client.is_closed
+        assert pool.get_stats()["clients"] == 0
+        # 閉じた後に取得すると新しいHTTPクライアントで作り直す
+        assert pool.get_client(**config()) is not client
+        assert not pool._http_client.is_closed
+        await pool.close()
+
+    async def test_close_without_clients(self):
+        await ModelClientPool().close()
+
+
+class TestProcessPool:
+    """プロセス共通のプールのテスト"""
+
+    async def test_pool_is_created_once_from_settings(self):
+        settings = make_settings(http_max_connections=7, http_max_keepalive_connections=3)
+
+        pool = get_client_pool(settings)
+
+        assert get_client_pool(make_settings()) is pool
+        assert pool.limits.max_connections == 7
+        await close_client_pool()
+        assert client_pool_module._pool is None
+
+    async def test_client_manager_uses_pool_when_enabled(self):
+        settings = make_settings(http_pool_enabled=True)
+
+        first = ClientManager(settings)._create_chat_client()
+        second = ClientManager(settings)._create_chat_client()
+
+        assert first is second
+        assert get_client_pool(settings).get_stats()["reused"] == 1
+        await close_client_pool()
+
+    async def test_client_manager_creates_own_client_when_disabled(self):
+        settings = make_settings(http_pool_enabled=False)
+
+        ClientManager(settings)._create_chat_client()
+
+        assert client_pool_module._pool is None
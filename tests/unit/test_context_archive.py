@@ -0,0 +1,93 @@
+import zlib
+
+import pytest
+
+from utils.context_archive import ContextArchive
+from utils.file_utils import TranscriptWriter
+
+
+def make_messages(count: int, prefix: str = "発言"):
+    return [{"source": f"agent_{i % 3}", "content": f"{prefix} {i}"} for i in range(count)]
+
+
+class TestContextArchive:
+    """コンテキストアーカイブの保存・読み込みのテスト"""
+
+    def test_round_trip(self, tmp_path):
+        archive = ContextArchive(str(tmp_path / "archive"))
+        messages = make_messages(20)
+
+        entry = archive.add_session("session_a", messages, {"task": "テスト"})
+        assert entry["message_count"] == 20
+        assert entry["metadata"] == {"task": "テスト"}
+        assert archive.get_session("session_a") == messages
+
+    def test_sessions_are_read_independently(self, tmp_path):
+        archive = ContextArchive(str(tmp_path / "archive"))
+        first = make_messages(5, "first")
+        second = make_messages(7, "second")
+        archive.add_session("a", first)
+        archive.add_session("b", second)
+
+        assert archive.get_entry("b")["offset"] > 0
+        assert archive.get_session("b") == second
+        assert archive.get_session("a") == first
+
+    def test_index_is_reloaded(self, tmp_path):
+        directory = str(tmp_path / "archive")
+        messages = make_messages(3)
+        ContextArchive(directory).add_session("a", messages)
+
+        reopened = ContextArchive(directory)
+        assert reopened.contains("a")
+        assert reopened.get_session("a") == messages
+
+    def test_truncated_index_line_is_ignored(self, tmp_path):
+        directory = tmp_path / "archive"
+        ContextArchive(str(directory)).add_session("a", make_messages(3))
+        with open(directory / "index.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"name": "b", "segm')
+
+        assert ContextArchive(str(directory)).list_sessions() == ["a"]
+
+    def test_segment_rolls_over_at_size_limit(self, tmp_path):
+        archive = ContextArchive(str(tmp_path / "archive"), max_segment_bytes=1)
+        archive.add_session("a", make_messages(3))
+        archive.add_session("b", make_messages(3))
+
+        assert archive.get_entry("a")["segment"] != archive.get_entry("b")["segment"]
+        assert archive.get_stats()["segments"] == 2
+        assert archive.get_session("b") == make_messages(3)
+
+    def test_duplicate_and_missing_sessions(self, tmp_path):
+        archive = ContextArchive(str(tmp_path / "archive"))
+        archive.add_session("a", [])
+
+        with pytest.raises(ValueError):
+            archive.add_session("a", [])
+        with pytest.raises(FileNotFoundError):
+            archive.get_session("missing")
+
+    def test_stored_block_is_compressed(self, tmp_path):
+        archive = ContextArchive(str(tmp_path / "archive"))
+        entry = archive.add_session("a", make_messages(200))
+
+        stats = archive.get_stats()
+        assert stats["stored_bytes"] < stats["raw_bytes"]
+        with open(tmp_path / "archive" / entry["segment"], "rb") as f:
+            f.seek(entry["offset"])
+            assert zlib.decompress(f.read(entry["length"]))
+
+    def test_archive_transcript_file(self, tmp_path):
+        log_directory = str(tmp_path / "logs")
+        messages = make_messages(4)
+        writer = TranscriptWriter(log_directory, "context_test.jsonl")
+        for message in messages:
+            writer.append(message)
+        writer.close({"task": "テスト"})
+
+        archive = ContextArchive(str(tmp_path / "archive"))
+        entry = archive.archive_file("context_test.jsonl", log_directory)
+        assert entry["metadata"]["message_count"] == 4
+        assert entry["metadata"]["task"] == "テスト"
+        assert archive.get_session("context_test.jsonl") == messages
@@ -0,0 +1,100 @@
+from autogen_agentchat.messages import StopMessage, TextMessage
+
+from utils.convergence_termination import ConvergenceTermination, jaccard, shingles
+
+
+def text(content: str, source: str = "market_analyst") -> TextMessage:
+    return TextMessage(content=content, source=source)
+
+
+REPEATED = "新しい市場に参入するためには顧客の課題を明確にするべきです"
+
+
+class TestShingles:
+    """シングルと類似度のテスト"""
+
+    def test_punctuation_and_whitespace_are_ignored(self):
+        assert shingles("顧客の 課題、を。明確に") == shingles("顧客の課題を明確に")
+
+    def test_short_text(self):
+        assert shingles("") == frozenset()
+        assert len(shingles("あい")) == 1
+
+    def test_jaccard(self):
+        a = shingles("顧客の課題を明確にする")
+        assert jaccard(a, a) == 1.0
+        assert jaccard(a, shingles("全く関係のない文章です")) == 0.0
+        assert jaccard(a, frozenset()) == 0.0
+
+
+class TestConvergenceTermination:
+    """収束検出による終了条件のテスト"""
+
+    async def test_repeated_messages_terminate_after_patience(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, patience=3)
+
+        assert await condition([text(REPEATED)]) is None
+        assert condition.last_novelty == 1.0
+        assert await condition([text(REPEATED)]) is None
+        assert await condition([text(REPEATED)]) is None
+        stop = await condition([text(REPEATED)])
+
+        assert isinstance(stop, StopMessage)
+        assert condition.terminated
+        assert condition.last_novelty == 0.0
+        assert await condition([text(REPEATED)]) is None
+
+    async def test_novel_message_resets_the_count(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, patience=2)
+
+        await condition([text(REPEATED)])
+        await condition([text(REPEATED)])
+        assert await condition([text("価格設定は競合より低くしてシェアを取りに行くべきだと思います")]) is None
+        assert await condition([text(REPEATED)]) is None
+        assert await condition([text(REPEATED)]) is not None
+
+    async def test_reset_source_and_user_messages(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, patience=2)
+
+        await condition([text(REPEATED)])
+        await condition([text(REPEATED)])
+        # リフレクションの発言で新しいトピックが始まり、連続回数がリセットされる
+        await condition([text("次の論点に移りましょう", source="reflection_agent")])
+        assert await condition([text(REPEATED, source="user")]) is None
+        assert await condition([text(REPEATED)]) is None
+        assert condition.last_novelty == 1.0
+        assert await condition([text(REPEATED)]) is None
+        assert await condition([text(REPEATED)]) is not None
+
+    async def test_window_limits_comparison(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, window_size=1, patience=2)
+
+        await condition([text(REPEATED)])
+        await condition([text("価格設定は競合より低くしてシェアを取りに行くべきだと思います")])
+        await condition([text(REPEATED)])
+
+        # ウィンドウ外の発言とは比較しないため、繰り返しでも新規とみなされる
+        assert condition.last_novelty == 1.0
+
+    async def test_prime_does_not_stop_but_next_message_does(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, patience=2)
+
+        await condition.prime([text(REPEATED)] * 5)
+        assert not condition.terminated
+        assert await condition([text(REPEATED)]) is not None
+
+    async def test_reset(self):
+        condition = ConvergenceTermination(novelty_threshold=0.2, patience=1)
+        await condition([text(REPEATED)])
+        await condition([text(REPEATED)])
+        assert condition.terminated
+
+        await condition.reset()
+        assert not condition.terminated
+        assert await condition([text(REPEATED)]) is None
+
+    def test_config_round_trip(self):
+        condition = ConvergenceTermination(novelty_threshold=0.3, window_size=4, patience=5, reset_source=None)
+        restored = ConvergenceTermination._from_config(condition._to_config())
+
+        assert restored._to_config() == condition._to_config()
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.event_bus import BACKPRESSURE_BLOCK, BACKPRESSURE_COALESCE, BACKPRESSURE_DROP, EventBus
+
+
+class GatedHook:
+    """gate が開くまで配信を止める非同期フック（blocked に含まれるイベントのみ止める）"""
+
+    def __init__(self, blocked=None):
+        self.gate = asyncio.Event()
+        self.blocked = blocked
+        self.received = []
+        self.started = asyncio.Event()
+
+    async def __call__(self, event):
+        self.started.set()
+        if self.blocked is None or event in self.blocked:
+            await self.gate.wait()
+        self.received.append(event)
+
+
+async def yield_to_workers():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestBackpressure:
+    """キューが満杯になった場合の方針のテスト"""
+
+    async def test_drop_discards_new_events(self):
+        bus = EventBus(queue_size=2, policy=BACKPRESSURE_DROP)
+        hook = GatedHook()
+        subscription = bus.subscribe(hook)
+
+        for event in ["e0", "e1", "e2"]:
+            await bus.publish(event)
+        assert bus.get_lagging() == [subscription.name]
+        hook.gate.set()
+        assert await bus.drain(timeout=1)
+
+        assert hook.received == ["e0", "e1"]
+        stats = bus.get_stats()[0]
+        assert (stats["delivered"], stats["dropped"]) == (2, 1)
+        # 追いついたら遅れの報告を解除する
+        assert bus.get_lagging() == []
+
+    async def test_coalesce_discards_oldest_events(self):
+        bus = EventBus(queue_size=2, policy=BACKPRESSURE_COALESCE)
+        hook = GatedHook()
+        bus.subscribe(hook)
+
+        for event in ["e0", "e1", "e2"]:
+            await bus.publish(event)
+        hook.gate.set()
+        assert await bus.drain(timeout=1)
+
+        assert hook.received == ["e1", "e2"]
+        assert bus.get_stats()[0]["coalesced"] == 1
+
+    async def test_block_waits_for_space(self):
+        bus = EventBus(queue_size=1, policy=BACKPRESSURE_BLOCK)
+        hook = GatedHook()
+        bus.subscribe(hook)
+
+        await bus.publish("e0")
+        await hook.started.wait()
+        await bus.publish("e1")
+        blocked_publish = asyncio.create_task(bus.publish("e2"))
+        await yield_to_workers()
+        assert not blocked_publish.done()
+
+        hook.gate.set()
+        await asyncio.wait_for(blocked_publish, timeout=1)
+        assert await bus.drain(timeout=1)
+        assert hook.received == ["e0", "e1", "e2"]
+        assert bus.get_stats()[0]["dropped"] == 0
+
+    async def test_subscriber_policy_overrides_bus_default(self):
+        bus = EventBus(queue_size=1, policy=BACKPRESSURE_BLOCK)
+        hook = GatedHook()
+        bus.subscribe(hook, policy=BACKPRESSURE_DROP, queue_size=1)
+
+        await bus.publish("e0")
+        await bus.publish("e1")
+        assert bus.get_stats()[0]["dropped"] == 1
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            EventBus(policy="unknown")
+        with pytest.raises(ValueError):
+            EventBus().subscribe(print, policy="unknown")
+
+
+class TestDelivery:
+    """配信と配信完了待ちのテスト"""
+
+    async def test_slow_hook_does_not_block_others(self):
+        bus = EventBus(queue_size=10)
+        slow = GatedHook()
+        fast = GatedHook(blocked=set())
+        bus.subscribe(slow)
+        bus.subscribe(fast)
+
+        await bus.publish("e0")
+        await bus.publish("e1")
+        await yield_to_workers()
+        assert fast.received == ["e0", "e1"]
+        assert slow.received == []
+        assert not await bus.drain(timeout=0.05)
+
+        slow.gate.set()
+        assert await bus.drain(timeout=1)
+
+    async def test_drain_by_key_waits_only_for_that_key(self):
+        bus = EventBus(queue_size=10)
+        hook = GatedHook(blocked={"b0"})
+        bus.subscribe(hook)
+
+        await bus.publish("a0", key="a")
+        await bus.publish("b0", key="b")
+        assert await bus.drain(timeout=1, key="a")
+        assert hook.received == ["a0"]
+        assert not await bus.drain(timeout=0.05, key="b")
+
+        hook.gate.set()
+        assert await bus.drain(timeout=1, key="b")
+        # 発行していないキーは待たない
+        assert await bus.drain(timeout=0.05, key="c")
+
+    async def test_failing_hook_is_counted_and_delivery_continues(self):
+        bus = EventBus(queue_size=10)
+        received = []
+
+        async def hook(event):
+            if event == "bad":
+                raise RuntimeError("hook failed")
+            received.append(event)
+
+        bus.subscribe(hook)
+        for event in ["e0", "bad", "e1"]:
+            await bus.publish(event)
+        assert await bus.drain(timeout=1)
+
+        assert received == ["e0", "e1"]
+        stats = bus.get_stats()[0]
+        assert (stats["delivered"], stats["failed"]) == (2, 1)
+
+    async def test_sync_hook_runs_off_the_event_loop(self):
+        bus = EventBus(queue_size=10)
+        threads = []
+        bus.subscribe(lambda event: threads.append(threading.get_ident()))
+
+        await bus.publish("e0")
+        assert await bus.drain(timeout=1)
+        assert threads and threads[0] != threading.get_ident()
+
+    async def test_unsubscribe_releases_key_waiters(self):
+        bus = EventBus(queue_size=10)
+        hook = GatedHook()
+        bus.subscribe(hook)
+        await bus.publish("e0", key="a")
+        await bus.publish("e1", key="a")
+
+        drain = asyncio.create_task(bus.drain(key="a"))
+        await yield_to_workers()
+        bus.unsubscribe(hook)
+
+        assert await asyncio.wait_for(drain, timeout=1)
+        assert len(bus) == 0
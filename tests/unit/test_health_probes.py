@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from config.settings import Settings
+from core import health_probes as health_probes_module
+from core.health_probes import HealthProbes
+from core.session_manager import SessionManager
+
+
+def make_settings(**overrides) -> Settings:
+    values = dict(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="o3-mini",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+        http_pool_enabled=False,
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(health_probes_module, "time", clock)
+    return clock
+
+
+class FakeModelCheck:
+    """モデルへの呼び出しの代わりに、呼び出し回数を数えて指定した結果を返すチェック"""
+
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return None
+
+
+def make_probes(cache_ttl: float = 30.0, timeout: float = 5.0):
+    probes = HealthProbes(make_settings(), cache_ttl=cache_ttl, timeout=timeout)
+    check = FakeModelCheck()
+    probes._check_model = check
+    return probes, check
+
+
+class TestReadiness:
+    """準備完了確認のキャッシュとバックグラウンド更新のテスト"""
+
+    async def test_result_is_cached_within_ttl(self, clock):
+        probes, check = make_probes()
+
+        first = await probes.readiness()
+        clock.now += 29
+        second = await probes.readiness()
+
+        assert first["ready"] and second["ready"]
+        assert check.calls == 1
+        assert second["age"] == 29
+        assert first["checks"]["cosmosdb"]["skipped"] == "disabled"
+
+    async def test_expired_cache_is_returned_while_refreshing(self, clock):
+        probes, check = make_probes()
+        await probes.readiness()
+        check.error = RuntimeError("deployment not found")
+        check.gate.clear()
+
+        clock.now += 31
+        stale = await probes.readiness()
+        # 更新中の呼び出しは新たな更新を始めない
+        assert (await probes.readiness())["ready"]
+        assert stale["ready"] and stale["age"] == 31
+
+        check.gate.set()
+        await probes._refresh_task
+        refreshed = await probes.readiness()
+
+        assert check.calls == 2
+        assert refreshed["ready"] is False
+        assert refreshed["checks"]["model"]["error"] == "deployment not found"
+        assert refreshed["age"] == 0
+
+    async def test_force_runs_checks(self, clock):
+        probes, check = make_probes()
+        await probes.readiness()
+
+        await probes.readiness(force=True)
+
+        assert check.calls == 2
+
+    async def test_slow_check_times_out(self, clock):
+        probes, check = make_probes(timeout=0.01)
+        check.gate.clear()
+
+        readiness = await probes.readiness()
+
+        assert readiness["ready"] is False
+        assert readiness["checks"]["model"]["error"] == "Timed out after 0.01s"
+
+    async def test_optional_check_failure_keeps_ready(self, clock):
+        probes, _ = make_probes()
+
+        async def broken():
+            raise ConnectionError("cosmos unreachable")
+
+        probes._check_cosmosdb = broken
+        readiness = await probes.readiness()
+
+        assert readiness["ready"] is True
+        assert readiness["checks"]["cosmosdb"]["ok"] is False
+
+    async def test_liveness(self, clock):
+        probes, check = make_probes()
+        clock.now += 5
+
+        liveness = await probes.liveness()
+
+        assert liveness["alive"] and liveness["uptime"] == 5
+        assert check.calls == 0
+
+
+class TestSessionManagerHealthCheck:
+    """SessionManager がプローブを使い回すことのテスト"""
+
+    async def test_health_check_uses_cached_readiness(self, clock):
+        session_manager = SessionManager(make_settings())
+        check = FakeModelCheck()
+        session_manager.health_probes._check_model = check
+
+        assert await session_manager.health_check() is True
+        assert await session_manager.health_check() is True
+
+        assert check.calls == 1
+        assert session_manager.health_probes.client_manager is session_manager.client_manager
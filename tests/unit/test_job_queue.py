@@ -0,0 +1,119 @@
+import pytest
+
+from core import job_queue as job_queue_module
+from core.job_queue import JobQueue, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+class TestJobQueue:
+    """ジョブキューのリース・再試行・回収のテスト"""
+
+    def test_claim_orders_by_priority_then_id(self, queue):
+        low = queue.enqueue("low")
+        high = queue.enqueue("high", priority=5)
+        second_low = queue.enqueue("low 2")
+
+        claimed = [queue.claim("w", 60)["id"] for _ in range(3)]
+        assert claimed == [high, low, second_low]
+        assert queue.claim("w", 60) is None
+
+    def test_claim_leases_job_and_counts_attempt(self, queue, clock):
+        job_id = queue.enqueue("task")
+        job = queue.claim("worker-a", 60)
+
+        assert job["id"] == job_id
+        assert job["status"] == JOB_RUNNING
+        assert job["lease_owner"] == "worker-a"
+        assert job["lease_expires_at"] == clock.now + 60
+        assert job["attempts"] == 1
+
+    def test_running_job_is_not_claimed_before_lease_expires(self, queue, clock):
+        queue.enqueue("task")
+        queue.claim("worker-a", 60)
+
+        clock.now += 59
+        assert queue.claim("worker-b", 60) is None
+
+    def test_expired_lease_is_reclaimed_by_another_worker(self, queue, clock):
+        job_id = queue.enqueue("task")
+        queue.claim("worker-a", 60)
+
+        clock.now += 61
+        job = queue.claim("worker-b", 60)
+        assert job["id"] == job_id
+        assert job["lease_owner"] == "worker-b"
+        assert job["attempts"] == 2
+
+        # 元のワーカーはリースを失っているため延長も完了もできない
+        assert queue.heartbeat(job_id, "worker-a", 60) is False
+        assert queue.complete(job_id, "worker-a") is False
+        assert queue.complete(job_id, "worker-b", {"ok": True}) is True
+        assert queue.get_job(job_id)["result"] == {"ok": True}
+
+    def test_heartbeat_extends_lease(self, queue, clock):
+        job_id = queue.enqueue("task")
+        queue.claim("worker-a", 60)
+
+        clock.now += 50
+        assert queue.heartbeat(job_id, "worker-a", 60) is True
+        clock.now += 50
+        assert queue.claim("worker-b", 60) is None
+
+    def test_expired_lease_without_attempts_left_is_failed(self, queue, clock):
+        job_id = queue.enqueue("task", max_attempts=1)
+        queue.claim("worker-a", 60)
+
+        clock.now += 61
+        assert queue.claim("worker-b", 60) is None
+        job = queue.get_job(job_id)
+        assert job["status"] == JOB_FAILED
+        assert job["last_error"] == "Lease expired"
+
+    def test_fail_requeues_after_delay_until_attempts_run_out(self, queue, clock):
+        job_id = queue.enqueue("task", max_attempts=2)
+
+        queue.claim("w", 60)
+        assert queue.fail(job_id, "w", "boom", retry_delay=30) is True
+        assert queue.get_job(job_id)["status"] == JOB_QUEUED
+        assert queue.claim("w", 60) is None
+
+        clock.now += 30
+        assert queue.claim("w", 60)["attempts"] == 2
+        queue.fail(job_id, "w", "boom again")
+        job = queue.get_job(job_id)
+        assert job["status"] == JOB_FAILED
+        assert job["last_error"] == "boom again"
+
+    def test_fail_by_non_owner_is_ignored(self, queue):
+        job_id = queue.enqueue("task")
+        queue.claim("worker-a", 60)
+
+        assert queue.fail(job_id, "worker-b", "boom") is False
+        assert queue.get_job(job_id)["status"] == JOB_RUNNING
+
+    def test_stats_count_jobs_by_status(self, queue):
+        first = queue.enqueue("a")
+        queue.enqueue("b")
+        queue.claim("w", 60)
+        queue.complete(first, "w")
+
+        assert queue.get_stats() == {JOB_QUEUED: 1, JOB_RUNNING: 0, JOB_COMPLETED: 1, JOB_FAILED: 0}
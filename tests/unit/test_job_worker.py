@@ -0,0 +1,197 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import Settings
+from core import job_worker as job_worker_module
+from core.job_worker import JobWorker
+
+
+def make_settings(**overrides) -> Settings:
+    values = dict(
+        azure_deployment_chat="gpt-4o",
+        azure_deployment_reasoning="o3-mini",
+        azure_endpoint="https://example.openai.azure.com/",
+        azure_api_key="unused",
+        http_pool_enabled=False,
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+class FakeQueue:
+    """ハートビートの結果を指定でき、完了・失敗の書き込みを記録するキュー"""
+
+    def __init__(self, heartbeats=None):
+        self.heartbeats = list(heartbeats or [])
+        self.heartbeat_calls = 0
+        self.completed = []
+        self.failed = []
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        self.heartbeat_calls += 1
+        result = self.heartbeats.pop(0) if self.heartbeats else True
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def complete(self, job_id, worker_id, result=None):
+        self.completed.append((job_id, result))
+        return True
+
+    def fail(self, job_id, worker_id, error, retry_delay=0.0):
+        self.failed.append((job_id, error, retry_delay))
+        return True
+
+
+class FakeCheckpointManager:
+    def __init__(self, saved=()):
+        self.saved = set(saved)
+        self.deleted = []
+
+    async def load(self, session_id):
+        return {"session_id": session_id} if session_id in self.saved else None
+
+    async def delete(self, session_id):
+        self.deleted.append(session_id)
+
+
+class FakeSessionManager:
+    """run_session / resume_session の中身をテストごとに差し替えられる SessionManager"""
+
+    def __init__(self, session=None, saved_checkpoints=()):
+        self.session = session or self._finish
+        self.checkpoint_manager = FakeCheckpointManager(saved_checkpoints)
+        self.contexts = []
+        self.runs = []
+
+    @staticmethod
+    async def _finish():
+        return "context.jsonl"
+
+    def new_context(self, session_id=None):
+        context = SimpleNamespace(session_id=session_id, checkpoint_manager=self.checkpoint_manager)
+        self.contexts.append(context)
+        return context
+
+    async def run_session(self, task, context):
+        self.runs.append(("run", context.session_id, task))
+        return await self.session()
+
+    async def resume_session(self, session_id, context):
+        self.runs.append(("resume", session_id, None))
+        return await self.session()
+
+    def get_session_stats(self, context):
+        return {"total_messages": 8, "execution_time": 1.5}
+
+
+def make_job(attempts: int = 1) -> dict:
+    return {"id": 7, "task": "アイデアを考えてください", "attempts": attempts, "max_attempts": 3}
+
+
+def make_worker(queue: FakeQueue) -> JobWorker:
+    worker = JobWorker(make_settings(), queue=queue, concurrency=1, worker_id="worker-a")
+    worker.heartbeat_interval = 0.01
+    return worker
+
+
+async def hang():
+    await asyncio.Event().wait()
+
+
+class TestExecuteJob:
+    """ジョブ1件の実行結果の書き込みのテスト"""
+
+    async def test_completed_session_completes_job(self):
+        queue = FakeQueue()
+        session_manager = FakeSessionManager()
+
+        await make_worker(queue)._execute_job(make_job(), session_manager)
+
+        assert queue.completed == [(7, {"context_file": "context.jsonl", "total_messages": 8, "execution_time": 1.5})]
+        assert queue.failed == []
+        assert session_manager.runs == [("run", "job_7_attempt_1", "アイデアを考えてください")]
+
+    async def test_lease_lost_writes_neither_complete_nor_fail(self):
+        queue = FakeQueue(heartbeats=[False])
+        session_manager = FakeSessionManager(session=hang)
+        worker = make_worker(queue)
+
+        await asyncio.wait_for(worker._execute_job(make_job(), session_manager), timeout=5)
+
+        assert queue.completed == []
+        assert queue.failed == []
+        assert worker.processed_count == 0
+        assert session_manager.checkpoint_manager.deleted == ["job_7_attempt_1"]
+
+    async def test_session_exception_fails_job_with_retry_delay(self, monkeypatch):
+        monkeypatch.setattr(job_worker_module.random, "uniform", lambda low, high: high)
+
+        async def broken():
+            raise RuntimeError("model unavailable")
+
+        queue = FakeQueue()
+        session_manager = FakeSessionManager(session=broken)
+        worker = make_worker(queue)
+
+        await worker._execute_job(make_job(attempts=2), session_manager)
+
+        assert queue.failed == [(7, "model unavailable", 10.0)]
+        assert queue.completed == []
+        assert worker.processed_count == 1
+        # 例外で失敗した試行のチェックポイントは残さない
+        assert session_manager.checkpoint_manager.deleted == ["job_7_attempt_2"]
+
+    async def test_other_cancellation_is_propagated(self):
+        queue = FakeQueue()
+        session_manager = FakeSessionManager(session=hang)
+        task = asyncio.create_task(make_worker(queue)._execute_job(make_job(), session_manager))
+        await asyncio.sleep(0.05)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert queue.completed == [] and queue.failed == []
+
+
+class TestCrashRecovery:
+    """プロセスごと停止した試行のチェックポイントからの再開のテスト"""
+
+    async def test_retry_resumes_from_previous_attempt_checkpoint(self):
+        queue = FakeQueue()
+        session_manager = FakeSessionManager(saved_checkpoints={"job_7_attempt_1"})
+
+        await make_worker(queue)._execute_job(make_job(attempts=3), session_manager)
+
+        assert session_manager.runs == [("resume", "job_7_attempt_1", None)]
+        assert len(queue.completed) == 1
+
+    async def test_first_attempt_does_not_look_for_checkpoint(self):
+        session_manager = FakeSessionManager(saved_checkpoints={"job_7_attempt_1"})
+
+        await make_worker(FakeQueue())._execute_job(make_job(attempts=1), session_manager)
+
+        assert session_manager.runs[0][0] == "run"
+
+
+class TestHeartbeat:
+    """リースの延長のテスト"""
+
+    async def test_failed_renewal_is_retried(self):
+        queue = FakeQueue(heartbeats=[OSError("database is locked"), True])
+        worker = make_worker(queue)
+        session_task = asyncio.create_task(asyncio.sleep(0.1))
+
+        assert await worker._heartbeat(7, session_task) is False
+        assert queue.heartbeat_calls >= 2
+        assert not session_task.cancelled()
+
+    async def test_lost_lease_cancels_session(self):
+        worker = make_worker(FakeQueue(heartbeats=[True, False]))
+        session_task = asyncio.create_task(hang())
+
+        assert await worker._heartbeat(7, session_task) is True
+        with pytest.raises(asyncio.CancelledError):
+            await session_task
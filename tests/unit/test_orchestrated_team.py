@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from autogen_agentchat.base import Response, TaskResult
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import TextMessage
+
+from core.orchestrated_team import OrchestratedTeam
+
+
+class FakeAgent:
+    """delay 秒後に応答し、受け取ったメッセージを状態として持つエージェント"""
+
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.error = None
+        self.received = []
+        self.turns = 0
+        self.cancelled = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.received.extend(message.content for message in messages)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        self.turns += 1
+        return Response(chat_message=TextMessage(source=self.name, content=f"{self.name}の意見{self.turns}"))
+
+    async def on_reset(self, cancellation_token):
+        self.received = []
+        self.turns = 0
+
+    async def save_state(self):
+        return {"received": list(self.received), "turns": self.turns}
+
+    async def load_state(self, state):
+        self.received = list(state["received"])
+        self.turns = state["turns"]
+
+
+def make_team(max_messages: int = 9, delays=(0.03, 0.0, 0.01)):
+    experts = [FakeAgent(name, delay) for name, delay in zip(("planner", "analyst", "validator"), delays)]
+    reflection = FakeAgent("reflection_agent")
+    team = OrchestratedTeam(experts, reflection_agent=reflection, termination_condition=MaxMessageTermination(max_messages))
+    return team, experts, reflection
+
+
+def sources(messages):
+    return [message.source for message in messages]
+
+
+class TestRounds:
+    """ラウンドの実行と出力順のテスト"""
+
+    async def test_output_order_is_fixed_regardless_of_completion_order(self):
+        team, _, _ = make_team()
+
+        result = await team.run(task="アイデアを考えてください")
+
+        assert sources(result.messages) == [
+            "user", "planner", "analyst", "validator", "reflection_agent",
+            "planner", "analyst", "validator", "reflection_agent",
+        ]
+        assert result.stop_reason is not None
+
+    async def test_agents_receive_others_messages_once(self):
+        team, (planner, _, _), reflection = make_team(max_messages=6)
+
+        await team.run(task="タスク")
+
+        assert planner.received == ["タスク", "analystの意見1", "validatorの意見1", "reflection_agentの意見1"]
+        assert reflection.received == ["タスク", "plannerの意見1", "analystの意見1", "validatorの意見1"]
+
+    async def test_termination_drops_rest_of_round(self):
+        team, _, _ = make_team(max_messages=3)
+
+        messages = [message async for message in team.run_stream(task="タスク")]
+
+        assert isinstance(messages[-1], TaskResult)
+        assert sources(messages[:-1]) == ["user", "planner", "analyst"]
+
+    def test_experts_are_required(self):
+        with pytest.raises(ValueError):
+            OrchestratedTeam([])
+
+
+class TestRollback:
+    """並列実行中の失敗時のキャンセルと状態の巻き戻しのテスト"""
+
+    async def test_failure_cancels_others_and_restores_state(self):
+        team, (planner, analyst, validator), _ = make_team(delays=(0.05, 0.0, 0.05))
+        analyst.error = RuntimeError("model unavailable")
+
+        with pytest.raises(RuntimeError):
+            await team.run(task="タスク")
+
+        assert planner.cancelled == 1 and validator.cancelled == 1
+        for agent in (planner, analyst, validator):
+            assert agent.received == [] and agent.turns == 0
+        assert team._delivered == {name: 0 for name in team._delivered}
+
+    async def test_retry_after_failure_delivers_the_same_messages(self):
+        team, (planner, analyst, _), _ = make_team(max_messages=5)
+        analyst.error = RuntimeError("model unavailable")
+        with pytest.raises(RuntimeError):
+            await team.run(task="タスク")
+
+        analyst.error = None
+        result = await team.run()
+
+        assert sources(result.messages) == ["planner", "analyst", "validator", "reflection_agent"]
+        # 失敗したラウンドのタスクは失われず、重複もしない
+        assert planner.received == ["タスク"]
+        assert analyst.received == ["タスク"]
+        assert planner.turns == analyst.turns == 1
+
+
+class TestState:
+    """状態の保存・復元とリセットのテスト"""
+
+    async def test_save_and_load_continue_from_next_step(self):
+        team, _, _ = make_team(max_messages=4)
+        await team.run(task="タスク")
+        state = await team.save_state()
+
+        restored, experts, reflection = make_team(max_messages=2)
+        await restored.load_state(state)
+        result = await restored.run()
+
+        assert sources(result.messages) == ["reflection_agent", "planner"]
+        assert experts[0].received[-1] == "reflection_agentの意見1"
+        assert experts[0].turns == 2
+
+    async def test_load_state_rejects_other_team_state(self):
+        team, _, _ = make_team()
+        with pytest.raises(ValueError):
+            await team.load_state({"type": "SelectorGroupChatManagerState"})
+
+    async def test_reset(self):
+        team, (planner, _, _), _ = make_team(max_messages=4)
+        await team.run(task="タスク")
+
+        await team.reset()
+        result = await team.run(task="次のタスク")
+
+        assert sources(result.messages) == ["user", "planner", "analyst", "validator"]
+        assert planner.received == ["次のタスク"]
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import TextMessage
+
+from core.team_manager import TeamManager
+from utils import budget_termination as budget_termination_module
+from utils.agent_count_termination import AgentCountTermination
+from utils.budget_termination import DeadlineTermination, TokenBudgetTermination
+from utils.convergence_termination import ConvergenceTermination
+from utils.termination_priming import PrimableTermination
+
+
+def chat_contexts(count: int, source: str = "market_analyst", tokens: int = 10):
+    contexts = [{"source": "user", "content": "タスク"}]
+    for i in range(count):
+        contexts.append({
+            "source": source,
+            "content": f"発言 {i}",
+            "usage": {"prompt_tokens": tokens, "completion_tokens": 0}
+        })
+    return contexts
+
+
+async def prime(condition, contexts, elapsed_time: float = 0.0):
+    # prime_termination はチームの終了条件だけを参照する
+    await TeamManager.prime_termination(SimpleNamespace(termination_condition=condition), contexts, elapsed_time)
+
+
+def next_message(source: str = "market_analyst") -> TextMessage:
+    return TextMessage(content="次の発言", source=source)
+
+
+class TestPrimeTermination:
+    """再開時に終了条件へ既存のメッセージを反映させる処理のテスト"""
+
+    async def test_max_messages_counts_previous_messages(self):
+        condition = MaxMessageTermination(max_messages=10)
+        await prime(condition, chat_contexts(5))
+
+        assert condition._message_count == 6
+        for _ in range(3):
+            assert await condition([next_message()]) is None
+        assert await condition([next_message()]) is not None
+
+    async def test_max_messages_reached_before_interruption_stops_on_next_message(self):
+        condition = MaxMessageTermination(max_messages=4)
+        await prime(condition, chat_contexts(5))
+
+        assert not condition.terminated
+        assert condition._message_count == 3
+        assert await condition([next_message()]) is not None
+
+    async def test_combined_conditions_are_all_primed(self):
+        agent_count = AgentCountTermination("reflection_agent", 2)
+        budget = TokenBudgetTermination(max_total_tokens=100)
+        max_messages = MaxMessageTermination(max_messages=50)
+        await prime(agent_count | budget | max_messages, chat_contexts(1, source="reflection_agent", tokens=60))
+
+        assert budget.total_tokens == 60
+        assert agent_count._count == 1
+        assert max_messages._message_count == 2
+        assert await agent_count([next_message("reflection_agent")]) is not None
+
+    async def test_budget_exceeded_before_interruption_stops_on_next_message(self):
+        budget = TokenBudgetTermination(max_total_tokens=100)
+        await prime(budget | MaxMessageTermination(max_messages=50), chat_contexts(3, tokens=50))
+
+        assert not budget.terminated
+        assert await budget([next_message()]) is not None
+
+    async def test_deadline_receives_elapsed_time(self, monkeypatch):
+        monkeypatch.setattr(budget_termination_module, "time", SimpleNamespace(monotonic=lambda: 1000.0))
+        deadline = DeadlineTermination(deadline_seconds=60)
+        await prime(deadline | MaxMessageTermination(max_messages=50), chat_contexts(2), elapsed_time=45)
+
+        assert deadline._started_at == pytest.approx(955.0)
+
+    async def test_nothing_to_prime(self):
+        condition = MaxMessageTermination(max_messages=10)
+        await prime(condition, [])
+        await prime(None, chat_contexts(1))
+
+        assert condition._message_count == 0
+
+    def test_custom_conditions_share_the_priming_mixin(self):
+        for condition in (
+            AgentCountTermination("reflection_agent", 1),
+            ConvergenceTermination(),
+            TokenBudgetTermination(max_total_tokens=100),
+            DeadlineTermination(deadline_seconds=60),
+        ):
+            assert isinstance(condition, PrimableTermination)
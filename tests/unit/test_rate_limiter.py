@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from core import rate_limiter as rate_limiter_module
+from core.rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """time.time と asyncio.sleep を置き換える時計（sleep は待たずに時刻を進める）
+
+    待ち時間の端数が時刻の桁落ちで消えないよう、0秒から始める。
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    def time(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        await self.gate.wait()
+        self.now += delay
+        await _real_sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module, "time", clock)
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+
+class TestTokenBucket:
+    """トークンバケットの容量計算のテスト"""
+
+    def test_requests_are_limited_per_minute(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=2, tpm=1000)
+
+        assert limiter._try_take(1) == 0.0
+        assert limiter._try_take(1) == 0.0
+        assert limiter._try_take(1) == pytest.approx(30.0)
+
+        clock.now += 30
+        assert limiter._try_take(1) == 0.0
+
+    def test_tokens_refill_at_tpm_rate(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=600)
+
+        assert limiter._try_take(600) == 0.0
+        assert limiter._try_take(60) == pytest.approx(6.0)
+
+        clock.now += 3
+        assert limiter._try_take(60) == pytest.approx(3.0)
+        clock.now += 3
+        assert limiter._try_take(60) == 0.0
+
+    def test_bucket_does_not_exceed_capacity(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=600)
+
+        clock.now += 3600
+        assert limiter._try_take(600) == 0.0
+        assert limiter._try_take(1) > 0
+
+    def test_request_larger_than_bucket_waits_for_full_bucket(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=600)
+
+        assert limiter._try_take(10_000) == 0.0
+        assert limiter._try_take(10_000) == pytest.approx(60.0)
+
+    def test_state_is_shared_through_file(self, clock, tmp_path):
+        state_path = str(tmp_path / "ratelimit.json")
+        first = TokenBucketRateLimiter(rpm=1, tpm=1000, state_path=state_path)
+        second = TokenBucketRateLimiter(rpm=1, tpm=1000, state_path=state_path)
+
+        assert first._try_take(1) == 0.0
+        assert second._try_take(1) == pytest.approx(60.0)
+
+
+class TestAcquire:
+    """呼び出しの順番待ちのテスト"""
+
+    async def test_acquire_waits_for_capacity(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=600)
+        await limiter.acquire(600)
+
+        waited = await limiter.acquire(60)
+        assert waited == pytest.approx(6.0)
+        stats = limiter.get_stats()
+        assert (stats["acquired"], stats["waited"], stats["queued"]) == (2, 1, 0)
+        assert stats["max_wait"] == pytest.approx(6.0)
+
+    async def test_large_request_is_not_overtaken(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=600)
+        await limiter.acquire(600)
+        order = []
+
+        async def call(name, tokens):
+            await limiter.acquire(tokens)
+            order.append(name)
+
+        large = asyncio.create_task(call("large", 600))
+        await _real_sleep(0)
+        small = asyncio.create_task(call("small", 1))
+        await asyncio.gather(large, small)
+
+        assert order == ["large", "small"]
+
+    async def test_calls_are_served_in_arrival_order(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1, tpm=1000)
+        order = []
+
+        async def call(name):
+            await limiter.acquire(1)
+            order.append(name)
+
+        tasks = []
+        for name in ["a", "b", "c", "d"]:
+            tasks.append(asyncio.create_task(call(name)))
+            await _real_sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c", "d"]
+        assert clock.now == pytest.approx(180.0)
+
+    async def test_cancelled_caller_gives_up_its_turn(self, clock):
+        limiter = TokenBucketRateLimiter(rpm=1, tpm=1000)
+        await limiter.acquire(1)
+        clock.gate.clear()
+        order = []
+
+        async def call(name):
+            await limiter.acquire(1)
+            order.append(name)
+
+        first = asyncio.create_task(call("first"))
+        await _real_sleep(0)
+        cancelled = asyncio.create_task(call("cancelled"))
+        last = asyncio.create_task(call("last"))
+        await _real_sleep(0)
+        assert limiter.get_stats()["queued"] == 3
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        clock.gate.set()
+        await asyncio.gather(first, last)
+
+        assert order == ["first", "last"]
+        assert limiter.get_stats()["queued"] == 0
+
+
+class TestRegistry:
+    """リミッターの共有のテスト"""
+
+    def test_limiter_is_shared_per_endpoint_and_deployment(self, monkeypatch):
+        monkeypatch.setattr(rate_limiter_module, "_registry", {})
+
+        chat = get_rate_limiter("https://example", "chat", 60, 1000)
+        assert get_rate_limiter("https://example", "chat", 60, 1000) is chat
+        assert get_rate_limiter("https://example", "reasoning", 60, 1000) is not chat
+        assert get_rate_limiter("https://other", "chat", 60, 1000) is not chat
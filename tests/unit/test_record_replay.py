@@ -0,0 +1,102 @@
+import pytest
+from autogen_core.models import CreateResult, UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from core.record_replay import ModelFixture, RecordingChatCompletionClient, ReplayModelClient
+
+
+def user(content: str):
+    return [UserMessage(content=content, source="user")]
+
+
+async def record(fixture: ModelFixture, prompts, client_name: str = "chat", client_params=None):
+    inner = ReplayChatCompletionClient([f"応答 {i}" for i in range(len(prompts))])
+    recorder = RecordingChatCompletionClient(inner, fixture, client_name, "gpt-test", client_params)
+    for prompt in prompts:
+        await recorder.create(user(prompt))
+    return recorder
+
+
+@pytest.fixture
+def fixture(tmp_path):
+    return ModelFixture(str(tmp_path / "fixture.jsonl"))
+
+
+class TestRecordReplay:
+    """モデル呼び出しの記録と再生のテスト"""
+
+    async def test_recorded_calls_are_stored_per_client(self, fixture):
+        recorder = await record(fixture, ["a", "b"])
+        await record(fixture, ["c"], client_name="reasoning")
+
+        assert recorder.get_stats() == {"recorded_calls": 2}
+        assert [r["result"]["content"] for r in fixture.load("chat")] == ["応答 0", "応答 1"]
+        assert len(fixture.load("reasoning")) == 1
+
+    async def test_replay_matches_request_key_regardless_of_order(self, fixture):
+        await record(fixture, ["a", "b", "c"])
+        replay = ReplayModelClient(fixture, "chat", "gpt-test", fixed_latency=0)
+
+        assert (await replay.create(user("c"))).content == "応答 2"
+        assert (await replay.create(user("a"))).content == "応答 0"
+        assert (await replay.create(user("b"))).content == "応答 1"
+        assert replay.get_stats() == {"replayed_calls": 3, "key_misses": 0}
+
+    async def test_repeated_request_replays_records_in_order(self, fixture):
+        await record(fixture, ["same", "same"])
+        replay = ReplayModelClient(fixture, "chat", "gpt-test", fixed_latency=0)
+
+        assert (await replay.create(user("same"))).content == "応答 0"
+        assert (await replay.create(user("same"))).content == "応答 1"
+
+    async def test_key_miss_falls_back_to_recorded_order(self, fixture):
+        await record(fixture, ["a", "b"])
+        replay = ReplayModelClient(fixture, "chat", "gpt-test", fixed_latency=0)
+
+        assert (await replay.create(user("unknown"))).content == "応答 0"
+        # フォールバックで消費した記録はキー一致でも返さない
+        assert (await replay.create(user("a"))).content == "応答 1"
+        assert replay.key_misses == 2
+        with pytest.raises(LookupError):
+            await replay.create(user("b"))
+
+    async def test_strict_mode_raises_on_key_miss(self, fixture):
+        await record(fixture, ["a"])
+        replay = ReplayModelClient(fixture, "chat", "gpt-test", fixed_latency=0, strict=True)
+
+        with pytest.raises(LookupError):
+            await replay.create(user("unknown"))
+
+    async def test_client_params_are_part_of_the_key(self, fixture):
+        await record(fixture, ["a"], client_params={"max_tokens": 100})
+
+        mismatched = ReplayModelClient(fixture, "chat", "gpt-test", {"max_tokens": 200}, fixed_latency=0, strict=True)
+        with pytest.raises(LookupError):
+            await mismatched.create(user("a"))
+
+        matched = ReplayModelClient(fixture, "chat", "gpt-test", {"max_tokens": 100}, fixed_latency=0, strict=True)
+        assert (await matched.create(user("a"))).content == "応答 0"
+
+    async def test_model_name_defaults_to_recorded_model(self, fixture):
+        await record(fixture, ["a"])
+        replay = ReplayModelClient(fixture, "chat", "", fixed_latency=0, strict=True)
+
+        assert replay.model_name == "gpt-test"
+        assert (await replay.create(user("a"))).content == "応答 0"
+
+    async def test_stream_replays_content_and_usage(self, fixture):
+        await record(fixture, ["a"])
+        replay = ReplayModelClient(fixture, "chat", "gpt-test", fixed_latency=0)
+
+        chunks = [chunk async for chunk in replay.create_stream(user("a"))]
+        assert chunks[0] == "応答 0"
+        assert isinstance(chunks[-1], CreateResult)
+        assert replay.total_usage().completion_tokens == chunks[-1].usage.completion_tokens
+
+    def test_missing_fixture_or_client(self, fixture):
+        with pytest.raises(FileNotFoundError):
+            ReplayModelClient(fixture, "chat", "gpt-test")
+
+        fixture.append({"client": "chat", "model": "gpt-test", "key": "k", "model_info": {}, "result": {}})
+        with pytest.raises(ValueError):
+            ReplayModelClient(fixture, "reasoning", "gpt-test")
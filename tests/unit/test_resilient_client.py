@@ -0,0 +1,227 @@
+import asyncio
+
+import pytest
+from autogen_core.models import UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from core import resilient_client as resilient_client_module
+from core.rate_limiter import TokenBucketRateLimiter
+from core.resilient_client import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CallStats,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientChatCompletionClient,
+    current_call_stats,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FlakyClient(ReplayChatCompletionClient):
+    """最初の failures 回は error を送出し、その後は記録した応答を返すクライアント"""
+
+    def __init__(self, failures: int, error: BaseException):
+        super().__init__(["応答"] * 10)
+        self.failures = failures
+        self.error = error
+        self.attempts = 0
+
+    async def create(self, *args, **kwargs):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        return await super().create(*args, **kwargs)
+
+    async def create_stream(self, *args, **kwargs):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        async for chunk in super().create_stream(*args, **kwargs):
+            yield chunk
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilient_client_module, "time", clock)
+    return clock
+
+
+MESSAGES = [UserMessage(content="こんにちは", source="user")]
+
+
+class TestCircuitBreaker:
+    """サーキットブレーカーの状態遷移のテスト"""
+
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        assert breaker.state == CIRCUIT_CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.get_stats()["opened"] == 1
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_CLOSED
+
+    def test_half_open_allows_a_single_trial(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+
+        clock.now += 30
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CIRCUIT_CLOSED
+        breaker.before_call()
+
+    def test_failed_trial_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        for _ in range(5):
+            breaker.record_failure()
+
+        clock.now += 30
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_OPEN
+        assert breaker.get_stats()["opened"] == 2
+
+        clock.now += 29
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_abandoned_trial_is_replaced_after_timeout(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.now += 30
+        breaker.before_call()
+
+        # 試行の結果が記録されないまま期限が過ぎたら次の試行を許可する
+        clock.now += 30
+        breaker.before_call()
+
+
+class TestResilientChatCompletionClient:
+    """再試行とサーキットブレーカーを適用するクライアントのテスト"""
+
+    async def test_transient_errors_are_retried(self):
+        inner = FlakyClient(failures=2, error=asyncio.TimeoutError())
+        client = ResilientChatCompletionClient(inner, "gpt-test", max_retries=3, backoff_base=0)
+
+        result = await client.create(MESSAGES)
+        assert result.content == "応答"
+        stats = client.get_stats()["resilience"]
+        assert (stats["calls"], stats["retries"], stats["timeouts"], stats["failures"]) == (1, 2, 2, 0)
+
+    async def test_gives_up_after_max_retries(self):
+        inner = FlakyClient(failures=10, error=asyncio.TimeoutError())
+        client = ResilientChatCompletionClient(inner, "gpt-test", max_retries=2, backoff_base=0)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.create(MESSAGES)
+        assert inner.attempts == 3
+        assert client.get_stats()["resilience"]["failures"] == 1
+
+    async def test_non_transient_error_is_not_retried(self):
+        inner = FlakyClient(failures=1, error=ValueError("bad request"))
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = ResilientChatCompletionClient(inner, "gpt-test", backoff_base=0, breaker=breaker)
+
+        with pytest.raises(ValueError):
+            await client.create(MESSAGES)
+        assert inner.attempts == 1
+        assert breaker.state == CIRCUIT_CLOSED
+
+    async def test_open_breaker_short_circuits(self):
+        inner = FlakyClient(failures=10, error=asyncio.TimeoutError())
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client = ResilientChatCompletionClient(inner, "gpt-test", max_retries=5, backoff_base=0, breaker=breaker)
+
+        with pytest.raises(CircuitOpenError):
+            await client.create(MESSAGES)
+        assert inner.attempts == 2
+        stats = client.get_stats()["resilience"]
+        assert stats["short_circuited"] == 1
+        assert stats["circuit_breaker"]["state"] == CIRCUIT_OPEN
+
+    async def test_stream_is_retried_before_first_chunk(self):
+        inner = FlakyClient(failures=1, error=asyncio.TimeoutError())
+        client = ResilientChatCompletionClient(inner, "gpt-test", backoff_base=0)
+
+        chunks = [chunk async for chunk in client.create_stream(MESSAGES)]
+        assert chunks[-1].content == "応答"
+        assert client.get_stats()["resilience"]["retries"] == 1
+
+    async def test_call_stats_are_recorded_per_session(self):
+        client = ResilientChatCompletionClient(
+            FlakyClient(failures=1, error=asyncio.TimeoutError()), "gpt-test", backoff_base=0
+        )
+
+        async def session():
+            call_stats = CallStats()
+            current_call_stats.set(call_stats)
+            await client.create(MESSAGES)
+            return call_stats.get_summary()
+
+        first = await asyncio.create_task(session())
+        second = await asyncio.create_task(session())
+
+        assert first["gpt-test"]["calls"] == 1
+        assert first["gpt-test"]["retries"] == 1
+        assert second["gpt-test"]["calls"] == 1
+        assert second["gpt-test"]["retries"] == 0
+        assert client.get_stats()["resilience"]["calls"] == 2
+
+
+class TestResilientRateLimit:
+    """再試行ごとのレート制限のテスト"""
+
+    async def test_every_attempt_acquires_from_limiter(self):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=100000)
+        inner = FlakyClient(failures=2, error=asyncio.TimeoutError())
+        client = ResilientChatCompletionClient(
+            inner, "gpt-test", max_retries=3, backoff_base=0, limiter=limiter, max_tokens=50
+        )
+
+        await client.create(MESSAGES)
+
+        stats = client.get_stats()
+        assert stats["rate_limit"]["acquired"] == 3
+        assert limiter._state["tokens"] <= 100000 - 3 * 50
+
+    async def test_limiter_wait_is_not_part_of_the_deadline(self, monkeypatch):
+        limiter = TokenBucketRateLimiter(rpm=1000, tpm=100000)
+
+        async def slow_acquire(tokens):
+            await asyncio.sleep(0.2)
+            return 0.2
+
+        monkeypatch.setattr(limiter, "acquire", slow_acquire)
+        client = ResilientChatCompletionClient(
+            FlakyClient(failures=0, error=asyncio.TimeoutError()), "gpt-test", timeout=0.1, max_retries=0, limiter=limiter
+        )
+
+        assert (await client.create(MESSAGES)).content == "応答"
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from autogen_core.models import CreateResult, RequestUsage, UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from core import response_cache as response_cache_module
+from core.response_cache import CachingChatCompletionClient, ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+def make_result(content: str, prompt_tokens: int = 10, completion_tokens: int = 5) -> CreateResult:
+    return CreateResult(
+        finish_reason="stop",
+        content=content,
+        usage=RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        cached=False
+    )
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # 最終アクセス時刻の順序を確定させるため、呼び出しごとに時刻を進める
+    monkeypatch.setattr(response_cache_module, "time", FakeClock())
+    return ResponseCache(str(tmp_path / "cache.db"))
+
+
+def entry_size(result: CreateResult) -> int:
+    return len(json.dumps(result.model_dump(mode="json"), ensure_ascii=False).encode("utf-8"))
+
+
+class TestResponseCache:
+    """応答キャッシュの保存・LRU削除・統計のテスト"""
+
+    def test_get_returns_stored_result_and_counts_hits(self, cache):
+        assert cache.get("a") is None
+        cache.put("a", make_result("応答"))
+
+        result = cache.get("a")
+        assert result.content == "応答"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_tokens"] == 15
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        size = entry_size(make_result("x" * 100))
+        cache.max_bytes = size * 3
+        for key in ("a", "b", "c"):
+            cache.put(key, make_result("x" * 100))
+
+        # a を参照すると b が最も古く使われたエントリになる
+        assert cache.get("a") is not None
+        cache.put("d", make_result("x" * 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("d") is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= cache.max_bytes
+
+    def test_clear(self, cache):
+        cache.put("a", make_result("応答"))
+        cache.clear()
+
+        assert cache.get("a") is None
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestCachingChatCompletionClient:
+    """キャッシュ付きクライアントのテスト"""
+
+    @pytest.fixture
+    def inner(self):
+        return ReplayChatCompletionClient(["1回目", "2回目", "3回目"])
+
+    async def test_identical_request_is_served_from_cache(self, cache, inner):
+        client = CachingChatCompletionClient(inner, cache, "gpt-test")
+        messages = [UserMessage(content="こんにちは", source="user")]
+
+        first = await client.create(messages)
+        second = await client.create(messages)
+
+        assert len(inner.create_calls) == 1
+        assert second.content == first.content == "1回目"
+        assert second.cached is True
+        # キャッシュヒットは実際の消費として数えない
+        assert second.usage == RequestUsage(prompt_tokens=0, completion_tokens=0)
+        assert first.usage.prompt_tokens > 0
+
+    async def test_different_parameters_miss(self, cache, inner):
+        client = CachingChatCompletionClient(inner, cache, "gpt-test", {"max_tokens": 100})
+        messages = [UserMessage(content="こんにちは", source="user")]
+
+        await client.create(messages)
+        await client.create(messages, extra_create_args={"temperature": 0.5})
+        await client.create([UserMessage(content="こんばんは", source="user")])
+
+        assert len(inner.create_calls) == 3
+
+    async def test_stream_hit_yields_content_and_zero_usage(self, cache, inner):
+        client = CachingChatCompletionClient(inner, cache, "gpt-test")
+        messages = [UserMessage(content="こんにちは", source="user")]
+        await client.create(messages)
+
+        chunks = [chunk async for chunk in client.create_stream(messages)]
+        assert chunks[0] == "1回目"
+        assert isinstance(chunks[-1], CreateResult)
+        assert chunks[-1].cached is True
+        assert chunks[-1].usage.completion_tokens == 0
+        assert len(inner.create_calls) == 1
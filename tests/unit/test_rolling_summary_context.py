@@ -0,0 +1,112 @@
+from autogen_core.models import AssistantMessage, UserMessage
+
+from utils.rolling_summary_context import SUMMARY_SOURCE, RollingSummaryChatCompletionContext
+
+
+TASK = UserMessage(content="新しいフィットネスアプリのアイデアを考えてください", source="user")
+
+
+def turn(index: int, source: str = "market_analyst") -> AssistantMessage:
+    return AssistantMessage(content=f"意見{index}です。詳細は省略します。", source=source)
+
+
+async def fill(context: RollingSummaryChatCompletionContext, count: int) -> None:
+    await context.add_message(TASK)
+    for index in range(count):
+        await context.add_message(turn(index))
+
+
+class TestFold:
+    """ウィンドウから外れたメッセージの畳み込みのテスト"""
+
+    async def test_messages_within_window_are_kept(self):
+        context = RollingSummaryChatCompletionContext(window_size=3)
+        await fill(context, 3)
+
+        messages = await context.get_messages()
+        assert messages[0] == TASK
+        assert [message.content for message in messages[1:]] == [turn(i).content for i in range(3)]
+
+    async def test_overflow_is_folded_into_summary(self):
+        context = RollingSummaryChatCompletionContext(window_size=2)
+        await fill(context, 4)
+
+        messages = await context.get_messages()
+        assert messages[0] == TASK
+        summary = messages[1]
+        assert summary.source == SUMMARY_SOURCE
+        # 最初の一文だけを残す
+        assert summary.content.splitlines()[1:] == ["- market_analyst: 意見0です。", "- market_analyst: 意見1です。"]
+        assert [message.content for message in messages[2:]] == [turn(2).content, turn(3).content]
+
+    async def test_summary_drops_oldest_lines_over_limit(self):
+        line_length = len("- market_analyst: 意見0です。") + 1
+        context = RollingSummaryChatCompletionContext(window_size=1, summary_max_chars=line_length * 2)
+        await fill(context, 5)
+
+        summary = (await context.get_messages())[1]
+        assert summary.content.splitlines()[1:] == ["- market_analyst: 意見2です。", "- market_analyst: 意見3です。"]
+
+    async def test_long_sentence_is_truncated(self):
+        context = RollingSummaryChatCompletionContext(window_size=1, line_max_chars=10, keep_first=False)
+        await context.add_message(AssistantMessage(content="あ" * 30, source="creative_planner"))
+        await context.add_message(turn(1))
+
+        summary = (await context.get_messages())[0]
+        assert summary.content.splitlines()[1] == "- creative_planner: " + "あ" * 10 + "…"
+
+
+class TestKeepFirst:
+    """最初のメッセージ（タスク）の保持のテスト"""
+
+    async def test_first_message_is_kept_outside_window(self):
+        context = RollingSummaryChatCompletionContext(window_size=1)
+        await fill(context, 3)
+
+        messages = await context.get_messages()
+        assert messages[0] == TASK
+        assert "- user:" not in messages[1].content
+
+    async def test_first_message_is_folded_when_disabled(self):
+        context = RollingSummaryChatCompletionContext(window_size=1, keep_first=False)
+        await fill(context, 3)
+
+        messages = await context.get_messages()
+        assert messages[0].source == SUMMARY_SOURCE
+        assert messages[0].content.splitlines()[1].startswith("- user: 新しいフィットネスアプリ")
+        assert messages[-1].content == turn(2).content
+
+    async def test_clear_resets_first_message(self):
+        context = RollingSummaryChatCompletionContext(window_size=1)
+        await fill(context, 3)
+        await context.clear()
+
+        assert await context.get_messages() == []
+        await context.add_message(turn(9))
+        assert await context.get_messages() == [turn(9)]
+
+
+class TestState:
+    """状態の保存・復元のテスト"""
+
+    async def test_save_and_load_round_trip(self):
+        context = RollingSummaryChatCompletionContext(window_size=2)
+        await fill(context, 5)
+        state = await context.save_state()
+
+        restored = RollingSummaryChatCompletionContext(window_size=2)
+        await restored.load_state(state)
+
+        assert await restored.get_messages() == await context.get_messages()
+        # 復元後も同じように畳み込みが続く
+        await context.add_message(turn(5))
+        await restored.add_message(turn(5))
+        assert await restored.get_messages() == await context.get_messages()
+
+    def test_component_config_round_trip(self):
+        context = RollingSummaryChatCompletionContext(window_size=4, summary_max_chars=200, keep_first=False)
+        restored = RollingSummaryChatCompletionContext.load_component(context.dump_component())
+
+        assert restored._window_size == 4
+        assert restored._summary_max_chars == 200
+        assert restored._keep_first is False
@@ -0,0 +1,129 @@
+from autogen_core.models import AssistantMessage, UserMessage
+
+from utils.selector_history_context import (
+    DIGEST_SOURCE, STANCE_AGREE, STANCE_DISAGREE, STANCE_NEUTRAL, STANCE_NEW_IDEA,
+    SelectorHistoryChatCompletionContext, classify_stance
+)
+
+
+TASK = UserMessage(content="新しいフィットネスアプリのアイデアを考えてください", source="user")
+
+
+def say(source: str, content: str) -> AssistantMessage:
+    return AssistantMessage(content=content, source=source)
+
+
+class TestClassifyStance:
+    """キーワードによる立場の判定のテスト"""
+
+    def test_single_stance(self):
+        assert classify_stance("その案に賛成です") == STANCE_AGREE
+        assert classify_stance("コスト面の懸念があります") == STANCE_DISAGREE
+        assert classify_stance("別の切り口を提案します") == STANCE_NEW_IDEA
+        assert classify_stance("了解しました") == STANCE_NEUTRAL
+
+    def test_most_hits_wins(self):
+        assert classify_stance("賛成です。同意します。ただしリスクもあります") == STANCE_AGREE
+
+    def test_tie_prefers_earlier_stance(self):
+        # 同数の場合は 反対 → 賛成 → 新しいアイデア の順に優先する
+        assert classify_stance("賛成ですが懸念もあります") == STANCE_DISAGREE
+        assert classify_stance("賛成です。さらに") == STANCE_AGREE
+
+
+class TestWindow:
+    """直近の発言の保持とダイジェストのテスト"""
+
+    async def test_recent_turns_are_kept(self):
+        context = SelectorHistoryChatCompletionContext(recent_turns=2)
+        await context.add_message(TASK)
+        for index in range(4):
+            await context.add_message(say("market_analyst", f"意見{index}"))
+
+        messages = await context.get_messages()
+        assert messages[0] == TASK
+        assert messages[1].source == DIGEST_SOURCE
+        assert messages[1].content.startswith("（全4件の発言のうち直近2件のみ表示）")
+        assert [message.content for message in messages[2:]] == ["意見2", "意見3"]
+
+    async def test_no_digest_while_all_turns_fit(self):
+        context = SelectorHistoryChatCompletionContext(recent_turns=3)
+        await context.add_message(TASK)
+        await context.add_message(say("market_analyst", "意見"))
+
+        assert await context.get_messages() == [TASK, say("market_analyst", "意見")]
+
+    async def test_digest_text(self):
+        context = SelectorHistoryChatCompletionContext(recent_turns=1, stance_window=2)
+        await context.add_message(TASK)
+        await context.add_message(say("creative_planner", "新しいアイデアを提案します"))
+        await context.add_message(say("market_analyst", "市場のリスクが懸念です"))
+        await context.add_message(say("creative_planner", "了解しました"))
+        await context.add_message(say("creative_planner", "その案に賛成です"))
+
+        assert context.build_digest().splitlines() == [
+            "- creative_planner: 発言3回, 最終発言は1ターン前, 直近の立場: 中立→賛成",
+            "- market_analyst: 発言1回, 最終発言は3ターン前, 直近の立場: 反対・懸念",
+            "- 連続した賛成意見: 1回",
+        ]
+
+
+class TestAgreeStreak:
+    """連続した賛成の数のテスト"""
+
+    async def test_streak_counts_consecutive_agreements(self):
+        context = SelectorHistoryChatCompletionContext()
+        await context.add_message(TASK)
+        for source in ("creative_planner", "market_analyst", "user_advocate"):
+            await context.add_message(say(source, "賛成です"))
+        assert context.agree_streak == 3
+
+        await context.add_message(say("technical_validator", "技術的な課題があります"))
+        assert context.agree_streak == 0
+
+    async def test_reset_speaker_resets_streak(self):
+        context = SelectorHistoryChatCompletionContext()
+        await context.add_message(TASK)
+        await context.add_message(say("creative_planner", "賛成です"))
+        await context.add_message(say("market_analyst", "同意します"))
+        await context.add_message(say("reflection_agent", "ここまでの議論に賛成です。次の論点に移ります"))
+
+        assert context.agree_streak == 0
+        # reflection_agent の立場は記録しない
+        assert "- reflection_agent: 発言1回, 最終発言は1ターン前" in context.build_digest().splitlines()
+
+
+class TestState:
+    """状態の保存・復元のテスト"""
+
+    async def test_save_and_load_round_trip(self):
+        context = SelectorHistoryChatCompletionContext(recent_turns=2, stance_window=2)
+        await context.add_message(TASK)
+        for source, content in (
+            ("creative_planner", "新しいアイデアを提案します"),
+            ("market_analyst", "賛成です"),
+            ("user_advocate", "同意します"),
+            ("creative_planner", "賛成です"),
+        ):
+            await context.add_message(say(source, content))
+        state = await context.save_state()
+
+        restored = SelectorHistoryChatCompletionContext(recent_turns=2, stance_window=2)
+        await restored.load_state(state)
+
+        assert await restored.get_messages() == await context.get_messages()
+        assert restored.agree_streak == 3
+        # 復元後も立場の窓の長さが保たれる
+        await context.add_message(say("creative_planner", "懸念があります"))
+        await restored.add_message(say("creative_planner", "懸念があります"))
+        assert restored.build_digest() == context.build_digest()
+
+    async def test_clear(self):
+        context = SelectorHistoryChatCompletionContext()
+        await context.add_message(TASK)
+        await context.add_message(say("creative_planner", "賛成です"))
+        await context.clear()
+
+        assert await context.get_messages() == []
+        assert context.agree_streak == 0
+        assert context.build_digest() == "- 連続した賛成意見: 0回"
@@ -0,0 +1,121 @@
+import pytest
+from autogen_agentchat.messages import TextMessage
+
+from core.speaker_selector import LocalSpeakerSelector
+
+
+AGENTS = ["creative_planner", "market_analyst", "technical_validator", "user_advocate", "reflection_agent"]
+NEUTRAL = "了解しました"
+AGREE = "その案に賛成です"
+
+
+def thread(*turns):
+    """(発言者, 内容) または発言者名の並びからタスク付きのメッセージ列を作る"""
+    messages = [TextMessage(source="user", content="アイデアを考えてください")]
+    for turn in turns:
+        source, content = turn if isinstance(turn, tuple) else (turn, NEUTRAL)
+        messages.append(TextMessage(source=source, content=content))
+    return messages
+
+
+class TestSelection:
+    """発言者の並びに対する選択結果のテスト"""
+
+    @pytest.mark.parametrize("turns, expected", [
+        # 全員が同じだけ発言していない場合は決められない
+        ((), None),
+        (("creative_planner",), None),
+        # 直前の発言者を除き、最も長く発言していないエージェントを選ぶ
+        (("creative_planner", "market_analyst", "technical_validator"), "user_advocate"),
+        (("creative_planner", "market_analyst", "technical_validator", "user_advocate"), "creative_planner"),
+        (("market_analyst", "creative_planner", "technical_validator", "user_advocate"), "market_analyst"),
+        # 賛成が3回続いたら reflection_agent
+        ((("creative_planner", AGREE), ("market_analyst", AGREE), ("technical_validator", AGREE)), "reflection_agent"),
+        # reflection_agent 以降の賛成だけを数える
+        ((("creative_planner", AGREE), "reflection_agent", ("market_analyst", AGREE), ("technical_validator", AGREE)),
+         "user_advocate"),
+        # 賛成以外の発言で連続が途切れる
+        ((("creative_planner", AGREE), ("market_analyst", AGREE), "technical_validator", ("user_advocate", AGREE)),
+         "creative_planner"),
+    ])
+    def test_selection(self, turns, expected):
+        selector = LocalSpeakerSelector(AGENTS, min_confidence=0.1)
+        assert selector(thread(*turns)) == expected
+
+    def test_previous_speaker_is_never_chosen(self):
+        selector = LocalSpeakerSelector(AGENTS, min_confidence=0.0)
+        speakers = []
+        for _ in range(8):
+            speaker = selector(thread(*speakers))
+            assert speakers[-1:] != [speaker]
+            speakers.append(speaker)
+        assert "reflection_agent" not in speakers
+
+
+class TestConfidenceFallback:
+    """確信度が低い場合のLLMへのフォールバックのテスト"""
+
+    @pytest.mark.parametrize("min_confidence, expected", [(0.2, "user_advocate"), (0.3, None)])
+    def test_threshold(self, min_confidence, expected):
+        # 1位 user_advocate (4/9) と 2位 creative_planner (3/9) の確信度は 0.25
+        selector = LocalSpeakerSelector(AGENTS, min_confidence=min_confidence)
+        assert selector(thread("creative_planner", "market_analyst", "technical_validator")) == expected
+
+    def test_stats(self):
+        selector = LocalSpeakerSelector(AGENTS)
+        selector(thread())
+        selector(thread("creative_planner", "market_analyst", "technical_validator"))
+        selector(thread(("creative_planner", AGREE), ("market_analyst", AGREE), ("technical_validator", AGREE)))
+
+        stats = selector.get_stats()
+        assert (stats["local_selections"], stats["llm_fallbacks"], stats["reflection_switches"]) == (2, 1, 1)
+        assert stats["local_ratio"] == pytest.approx(2 / 3)
+
+        selector.reset_stats()
+        assert selector.get_stats()["local_selections"] == 0
+
+
+class TestCandidates:
+    """LLMに渡す候補のテスト"""
+
+    def test_previous_speaker_is_excluded(self):
+        selector = LocalSpeakerSelector(AGENTS)
+        assert "market_analyst" not in selector.candidates(thread("creative_planner", "market_analyst"))
+        assert selector.candidates(thread()) == AGENTS
+
+    def test_repeated_speaker_allowed(self):
+        selector = LocalSpeakerSelector(AGENTS, allow_repeated_speaker=True)
+        assert selector.candidates(thread("market_analyst")) == AGENTS
+
+
+class TestTrain:
+    """発言順の学習のテスト"""
+
+    def test_counts_transitions_of_known_agents(self):
+        selector = LocalSpeakerSelector(AGENTS)
+
+        assert selector.train([
+            ["user", "creative_planner", "market_analyst"],
+            ["creative_planner", "unknown", "market_analyst"],
+        ]) == 2
+        assert selector.transitions == {"": {"creative_planner": 2}, "creative_planner": {"market_analyst": 2}}
+        assert selector.trained_sessions == 2
+
+    def test_learned_transitions_break_ties(self):
+        selector = LocalSpeakerSelector(AGENTS)
+        assert selector(thread("creative_planner")) is None
+
+        selector.train([["creative_planner", "technical_validator"]] * 10)
+        assert selector(thread("creative_planner")) == "technical_validator"
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "model" / "speaker_model.json")
+        selector = LocalSpeakerSelector(AGENTS)
+        selector.train([["creative_planner", "technical_validator"]])
+        selector.save(path)
+
+        loaded = LocalSpeakerSelector(AGENTS)
+        assert loaded.load(path) is True
+        assert loaded.transitions == selector.transitions
+        assert loaded.trained_sessions == 1
+        assert LocalSpeakerSelector(AGENTS).load(str(tmp_path / "missing.json")) is False
@@ -0,0 +1,235 @@
+import asyncio
+
+from autogen_agentchat.messages import TextMessage
+from autogen_core.models import CreateResult, RequestUsage, UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from agents import CreativePlannerAgent, MarketAnalystAgent, UserAdvocateAgent
+from core.speculative import SpeculationGroup, SpeculativeChatCompletionClient, SpeculativeSelector
+
+
+MESSAGES = [UserMessage(content="アイデアを考えてください", source="user")]
+OTHER_MESSAGES = [UserMessage(content="別の依頼です", source="user")]
+
+
+class GatedClient(ReplayChatCompletionClient):
+    """gate が開くまで応答を返さず、呼び出しとキャンセルの回数を記録するクライアント"""
+
+    def __init__(self, error: Exception = None):
+        super().__init__([])
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        call = self.calls
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return CreateResult(
+            finish_reason="stop",
+            content=f"応答{call}",
+            usage=RequestUsage(prompt_tokens=10, completion_tokens=5),
+            cached=False
+        )
+
+    async def create_stream(self, messages, **kwargs):
+        yield await self.create(messages, **kwargs)
+
+    def count_tokens(self, messages, **kwargs):
+        return 10
+
+
+def make_clients(group: SpeculationGroup, *names: str):
+    inner = GatedClient()
+    return inner, [SpeculativeChatCompletionClient(inner, group, name, "gpt-4o") for name in names]
+
+
+class TestSpeculationGroup:
+    """先行生成の採用・キャンセル・無駄になったトークンの集計のテスト"""
+
+    async def test_matching_prefetch_is_used(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (client,) = make_clients(group, "creative_planner")
+
+        assert client.prefetch(MESSAGES) is True
+        result = await client.create(MESSAGES)
+
+        assert result.content == "応答1"
+        assert inner.calls == 1
+        assert group.get_stats()["hits"] == 1
+        assert group.wasted_tokens == 0
+
+    async def test_losers_are_cancelled_and_counted_by_prompt_estimate(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (winner, loser) = make_clients(group, "creative_planner", "market_analyst")
+        inner.gate.clear()
+
+        winner.prefetch(MESSAGES)
+        loser.prefetch(MESSAGES)
+        await asyncio.sleep(0)
+        call = asyncio.create_task(winner.create(MESSAGES))
+        await asyncio.sleep(0)
+        inner.gate.set()
+        result = await call
+
+        assert result.content == "応答1"
+        assert inner.cancelled == 1
+        stats = group.get_stats()
+        assert (stats["hits"], stats["cancelled"], stats["wasted_tokens"]) == (1, 1, 10)
+
+    async def test_finished_loser_is_counted_by_actual_usage(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (winner, loser) = make_clients(group, "creative_planner", "market_analyst")
+
+        winner.prefetch(MESSAGES)
+        loser.prefetch(MESSAGES)
+        await asyncio.sleep(0.01)
+        await winner.create(MESSAGES)
+
+        stats = group.get_stats()
+        assert stats["cancelled"] == 0
+        assert stats["wasted_tokens"] == 15
+
+    async def test_mismatched_request_falls_back_to_normal_call(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (client,) = make_clients(group, "creative_planner")
+        inner.gate.clear()
+
+        client.prefetch(MESSAGES)
+        await asyncio.sleep(0)
+        call = asyncio.create_task(client.create(OTHER_MESSAGES))
+        await asyncio.sleep(0)
+        inner.gate.set()
+        await call
+
+        assert inner.calls == 2
+        stats = group.get_stats()
+        assert (stats["hits"], stats["misses"], stats["cancelled"]) == (0, 1, 1)
+
+    async def test_budget_stops_speculation(self):
+        group = SpeculationGroup(max_wasted_tokens=10)
+        inner, (winner, loser) = make_clients(group, "creative_planner", "market_analyst")
+        inner.gate.clear()
+
+        winner.prefetch(MESSAGES)
+        loser.prefetch(MESSAGES)
+        await asyncio.sleep(0)
+        call = asyncio.create_task(winner.create(MESSAGES))
+        await asyncio.sleep(0)
+        inner.gate.set()
+        await call
+
+        assert group.budget_exhausted
+        assert loser.prefetch(MESSAGES) is False
+        assert group.get_stats()["skipped"] == 1
+        assert inner.calls == 2
+
+    async def test_failed_prefetch_falls_back_to_normal_call(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (client,) = make_clients(group, "creative_planner")
+        inner.error = RuntimeError("boom")
+
+        client.prefetch(MESSAGES)
+        await asyncio.sleep(0.01)
+        inner.error = None
+        result = await client.create(MESSAGES)
+
+        assert result.content == "応答2"
+
+    async def test_stream_returns_prefetched_result_as_one_chunk(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (client,) = make_clients(group, "creative_planner")
+
+        client.prefetch(MESSAGES)
+        chunks = [chunk async for chunk in client.create_stream(MESSAGES)]
+
+        assert chunks[0] == "応答1"
+        assert chunks[1].content == "応答1"
+        assert inner.calls == 1
+
+    async def test_reset_cancels_pending_and_clears_stats(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, (client,) = make_clients(group, "creative_planner")
+        inner.gate.clear()
+
+        client.prefetch(MESSAGES)
+        await asyncio.sleep(0)
+        group.reset()
+        await asyncio.sleep(0)
+
+        assert inner.cancelled == 1
+        assert group.get_stats()["started"] == 0
+
+
+class FixedSelector:
+    """常に同じ発言者を選ぶローカルセレクター"""
+
+    def __init__(self, speaker):
+        self.speaker = speaker
+
+    def __call__(self, thread):
+        return self.speaker
+
+    def score(self, sources):
+        return {"scores": {}}
+
+
+def make_selector(group: SpeculationGroup, local_selector=None, top_k: int = 2):
+    inner = GatedClient()
+    agents = {
+        name: agent_class(SpeculativeChatCompletionClient(inner, group, name, "gpt-4o"))
+        for name, agent_class in (
+            ("creative_planner", CreativePlannerAgent),
+            ("market_analyst", MarketAnalystAgent),
+            ("user_advocate", UserAdvocateAgent),
+        )
+    }
+    for agent in agents.values():
+        agent.create_agent()
+    return inner, agents, SpeculativeSelector(agents, group, top_k=top_k, local_selector=local_selector)
+
+
+THREAD = [
+    TextMessage(source="user", content="アイデアを考えてください"),
+    TextMessage(source="creative_planner", content="新しいアイデアを提案します"),
+]
+
+
+class TestSpeculativeSelector:
+    """候補エージェントの先行生成のテスト"""
+
+    async def test_prefetches_top_k_candidates(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, agents, selector = make_selector(group)
+
+        assert await selector.select(THREAD) is None
+        await asyncio.sleep(0)
+
+        assert group.started == 2
+        assert inner.calls == 2
+        # エージェントのコンテキストは変更しない
+        for agent in agents.values():
+            assert await agent.agent.model_context.get_messages() == []
+
+    async def test_local_selection_skips_speculation(self):
+        group = SpeculationGroup(max_wasted_tokens=100)
+        inner, _, selector = make_selector(group, local_selector=FixedSelector("market_analyst"))
+
+        assert await selector.select(THREAD) == "market_analyst"
+        assert group.started == 0
+
+    async def test_exhausted_budget_skips_speculation(self):
+        group = SpeculationGroup(max_wasted_tokens=0)
+        inner, _, selector = make_selector(group)
+
+        assert await selector.select(THREAD) is None
+        assert group.started == 0
+        assert inner.calls == 0
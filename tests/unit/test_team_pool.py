@@ -0,0 +1,156 @@
+import asyncio
+import os
+
+import pytest
+from autogen_core.models import UserMessage
+
+from config.settings import Settings
+from core import team_pool as team_pool_module
+from core.client_manager import ClientManager
+from core.team_pool import TeamPool
+
+from conftest import FIXTURES_DIRECTORY
+
+
+class FakeTeamManager:
+    """構築回数とリセット回数を記録する TeamManager"""
+
+    instances = []
+
+    def __init__(self, settings, client_manager):
+        self.bound_loop = None
+        self.resets = 0
+        self.reset_error = None
+        FakeTeamManager.instances.append(self)
+
+    async def reset_for_reuse(self):
+        if self.reset_error is not None:
+            raise self.reset_error
+        self.resets += 1
+
+
+@pytest.fixture
+def fake_teams(monkeypatch):
+    monkeypatch.setattr(FakeTeamManager, "instances", [])
+    monkeypatch.setattr(team_pool_module, "TeamManager", FakeTeamManager)
+    return FakeTeamManager.instances
+
+
+def make_pool(max_size: int = 2) -> TeamPool:
+    return TeamPool(settings=None, client_manager=None, max_size=max_size)
+
+
+def stats(pool: TeamPool):
+    s = pool.get_stats()
+    return s["created"], s["reused"], s["discarded"], s["idle"]
+
+
+class TestLease:
+    """貸し出しと返却のテスト"""
+
+    async def test_returned_team_is_reset_and_reused(self, fake_teams):
+        pool = make_pool()
+
+        async with pool.lease() as first:
+            assert first.bound_loop is asyncio.get_running_loop()
+        async with pool.lease() as second:
+            assert second is first
+            assert first.resets == 1
+
+        assert first.resets == 2
+        assert stats(pool) == (1, 1, 0, 1)
+
+    async def test_exhausted_pool_builds_instead_of_waiting(self, fake_teams):
+        pool = make_pool(max_size=1)
+        pool.prewarm(3)
+        assert stats(pool) == (1, 0, 0, 1)
+
+        leased = [pool.checkout() for _ in range(3)]
+
+        assert len({id(team) for team in leased}) == 3
+        assert stats(pool) == (3, 1, 0, 0)
+
+        for team in leased:
+            await pool.checkin(team)
+        # max_size を超えて返却されたチームは破棄する
+        assert stats(pool) == (3, 1, 2, 1)
+
+    async def test_team_that_fails_to_reset_is_discarded(self, fake_teams):
+        pool = make_pool()
+        team = pool.checkout()
+        team.reset_error = RuntimeError("reset failed")
+
+        await pool.checkin(team)
+
+        assert stats(pool) == (1, 0, 1, 0)
+        assert pool.checkout() is not team
+
+
+class TestEventLoopBinding:
+    """イベントループへの紐づけのテスト"""
+
+    async def test_team_bound_to_another_running_loop_is_not_lent(self, fake_teams):
+        pool = make_pool()
+        other_loop = asyncio.new_event_loop()
+        try:
+            pool.prewarm(1)
+            fake_teams[0].bound_loop = other_loop
+
+            team = pool.checkout()
+
+            assert team is not fake_teams[0]
+            assert stats(pool) == (2, 0, 0, 1)
+        finally:
+            other_loop.close()
+
+    async def test_team_bound_to_closed_loop_is_discarded(self, fake_teams):
+        pool = make_pool()
+        pool.prewarm(1)
+        closed_loop = asyncio.new_event_loop()
+        closed_loop.close()
+        fake_teams[0].bound_loop = closed_loop
+
+        team = pool.checkout()
+
+        assert team is not fake_teams[0]
+        assert stats(pool) == (2, 0, 1, 0)
+
+    def test_team_is_rebound_to_the_loop_that_runs_it(self, fake_teams):
+        pool = make_pool()
+
+        async def lease_once():
+            async with pool.lease() as team:
+                return team, asyncio.get_running_loop()
+
+        first, first_loop = asyncio.run(lease_once())
+        # 最初のループは asyncio.run の終了時に閉じるため、次のループでは新たに構築する
+        second, second_loop = asyncio.run(lease_once())
+
+        assert first.bound_loop is first_loop
+        assert second is not first
+        assert second.bound_loop is second_loop
+        assert stats(pool)[:3] == (2, 0, 1)
+
+
+class TestResetForReuse:
+    """実際の TeamManager を返却時にリセットするテスト"""
+
+    async def test_agent_contexts_are_cleared_between_leases(self, tmp_path):
+        settings = Settings(
+            azure_deployment_chat="gpt-4o",
+            azure_deployment_reasoning="gpt-4o",
+            azure_endpoint="https://example.openai.azure.com/",
+            azure_api_key="unused",
+            log_directory=str(tmp_path),
+            model_client_mode="replay",
+            model_fixture_path=os.path.join(FIXTURES_DIRECTORY, "model_fixture.jsonl"),
+        )
+        pool = TeamPool(settings, ClientManager(settings), max_size=1)
+
+        async with pool.lease() as team_manager:
+            agent = team_manager.get_agent("creative_planner").agent
+            await agent.model_context.add_message(UserMessage(content="前のセッションの発言", source="user"))
+
+        async with pool.lease() as reused:
+            assert reused is team_manager
+            assert await reused.get_agent("creative_planner").agent.model_context.get_messages() == []
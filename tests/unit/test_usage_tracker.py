@@ -0,0 +1,71 @@
+from autogen_core.models import RequestUsage
+
+from core.usage_tracker import UsageTracker
+
+
+def usage(prompt_tokens: int, completion_tokens: int = 1) -> RequestUsage:
+    return RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+class TestUsageTracker:
+    """ターン別の使用量集計のテスト"""
+
+    def test_selector_usage_is_attached_to_selected_turn(self):
+        tracker = UsageTracker()
+        tracker.record_message("user", None)
+        tracker.record_selector_call(usage(30), "market_analyst")
+
+        turn = tracker.record_message("market_analyst", usage(100, 20))
+        assert turn == {
+            "prompt_tokens": 100,
+            "completion_tokens": 20,
+            "selector_prompt_tokens": 30,
+            "selector_completion_tokens": 1
+        }
+        summary = tracker.get_summary()
+        assert summary["total"]["total_tokens"] == 151
+        assert summary["turns"] == 2
+
+    def test_selection_must_match_exactly(self):
+        tracker = UsageTracker()
+        # 複数の名前に言及する応答や、名前を含むだけの応答は選択とみなさない
+        tracker.record_selector_call(usage(10), "market_analyst or user_advocate")
+        tracker.record_selector_call(usage(20), "user")
+        tracker.record_selector_call(usage(30), " 'user_advocate'\n")
+
+        turn = tracker.record_message("user_advocate", usage(5))
+        assert turn["selector_prompt_tokens"] == 30
+
+    def test_name_containing_another_name(self):
+        tracker = UsageTracker()
+        tracker.record_selector_call(usage(10), "lead_market_analyst")
+        tracker.record_selector_call(usage(20), "market_analyst")
+
+        assert tracker.record_message("market_analyst", None)["selector_prompt_tokens"] == 20
+        assert "selector_prompt_tokens" not in tracker.record_message("lead_market_analyst", None)
+
+    def test_stale_pending_entries_are_dropped(self):
+        tracker = UsageTracker()
+        tracker.record_selector_call(usage(10), "invalid reply")
+        tracker.record_selector_call(usage(20), "market_analyst")
+        tracker.record_selector_call(usage(30), "user_advocate")
+
+        tracker.record_message("market_analyst", None)
+        assert tracker._pending_selector == [("user_advocate", usage(30))]
+        # 破棄した呼び出しもセレクター全体の使用量には含まれる
+        assert tracker.get_summary()["selector"]["prompt_tokens"] == 60
+
+    def test_restore_from_chat_contexts(self):
+        tracker = UsageTracker()
+        tracker.restore([
+            {"source": "user"},
+            {"source": "market_analyst", "usage": {
+                "prompt_tokens": 100, "completion_tokens": 20,
+                "selector_prompt_tokens": 30, "selector_completion_tokens": 1
+            }}
+        ])
+
+        summary = tracker.get_summary()
+        assert summary["agents"]["market_analyst"]["total_tokens"] == 120
+        assert summary["selector"]["total_tokens"] == 31
+        assert summary["turns"] == 2